@@ -4,13 +4,29 @@ API客户端模块
 """
 
 import os
-import requests
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from .config_manager import ConfigManager
 from .error_handler import GracefulDegradationManager
 from .logger import logger
 from .prompts import get_system_prompt
 
+if TYPE_CHECKING:
+    import requests
+
+
+def _requests():
+    """延迟导入 requests：其依赖链导入耗时明显，命中缓存或无需联网的命令不必承担"""
+    import requests
+
+    return requests
+
+
+def __getattr__(name):
+    # 兼容通过 aicmd.api_client.requests 访问 requests 模块的调用方
+    if name == "requests":
+        return _requests()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class APIClientError(Exception):
     """API客户端异常基类"""
@@ -66,10 +82,10 @@ class OpenRouterAPIClient:
         # 初始化session
         self._session = None
 
-    def _get_session(self) -> requests.Session:
+    def _get_session(self) -> "requests.Session":
         """获取或创建HTTP会话"""
         if self._session is None:
-            self._session = requests.Session()
+            self._session = _requests().Session()
             try:
                 from requests.adapters import HTTPAdapter
                 from urllib3.util.retry import Retry
@@ -155,11 +171,11 @@ class OpenRouterAPIClient:
                     f"API request failed: {response.status_code} - {response.text}"
                 )
 
-        except requests.exceptions.Timeout:
+        except _requests().exceptions.Timeout:
             raise APITimeoutError(f"API request timed out after {request_timeout}s")
-        except requests.exceptions.ConnectionError as e:
+        except _requests().exceptions.ConnectionError as e:
             raise APIClientError(f"Connection error: {e}")
-        except requests.exceptions.RequestException as e:
+        except _requests().exceptions.RequestException as e:
             raise APIClientError(f"Request error: {e}")
 
     def send_chat_with_fallback(self, prompt: str) -> str:
@@ -181,10 +197,10 @@ class OpenRouterAPIClient:
                 # 如果主模型失败且有备用模型，尝试备用模型
                 if self.model_backup:
                     try:
-                        logger.warning(f"Main model failed ({e}), trying backup model")
+                        logger.warning("Main model failed (%s), trying backup model", e)
                         return self.send_chat(prompt, model=self.model_backup)
                     except APIClientError as backup_e:
-                        logger.error(f"Backup model also failed: {backup_e}")
+                        logger.error("Backup model also failed: %s", backup_e)
                         return f"Error: {backup_e}"
                 else:
                     return f"Error: {e}"
@@ -7,9 +7,10 @@ import platform
 import os
 import re
 from typing import Optional, List, Dict, Any, Tuple
-from .database_manager import SafeDatabaseManager
+from .database_manager import SafeDatabaseManager, CACHE_COUNT_SQL
 from .config_manager import ConfigManager
 from .error_handler import GracefulDegradationManager
+from .hash_utils import hash_query
 
 
 class CacheEntry:
@@ -188,6 +189,11 @@ class CacheManager:
 
             result = self.db.execute_query(select_sql, (query_hash,), fetch=True)
 
+            if not result and self._migrate_legacy_hash(query, query_hash):
+                result = self.db.execute_query(
+                    select_sql, (query_hash,), fetch=True
+                )
+
             if result and isinstance(result, list) and len(result) > 0:
                 return CacheEntry.from_db_row(result[0])
             else:
@@ -200,6 +206,30 @@ class CacheManager:
             cache_operation, fallback_operation, "find_exact_match"
         )
 
+    def _migrate_legacy_hash(self, query: str, query_hash: str) -> bool:
+        """
+        blake2 策略下，将旧 simple 哈希的记录迁移到新哈希（读取时一次性迁移）
+
+        Returns:
+            是否迁移了记录
+        """
+        if self.config.get("hash_strategy", "simple") != "blake2":
+            return False
+
+        legacy_hash = hash_query(query, strategy="simple")
+        result = self.db.execute_query(
+            "UPDATE enhanced_cache SET query_hash = ? WHERE query_hash = ?",
+            (query_hash, legacy_hash),
+        )
+        if not (result and isinstance(result, int) and result > 0):
+            return False
+
+        self.db.execute_query(
+            "UPDATE feedback_history SET query_hash = ? WHERE query_hash = ?",
+            (query_hash, legacy_hash),
+        )
+        return True
+
     def update_last_used(self, query_hash: str) -> bool:
         """更新最后使用时间"""
 
@@ -252,9 +282,7 @@ class CacheManager:
             status = {}
 
             # 总缓存条目数
-            result = self.db.execute_query(
-                "SELECT COUNT(*) FROM enhanced_cache", fetch=True
-            )
+            result = self.db.execute_query(CACHE_COUNT_SQL, fetch=True)
             if result and isinstance(result, list) and len(result) > 0:
                 status["total_entries"] = result[0][0]
             else:
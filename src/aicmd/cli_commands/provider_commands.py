@@ -199,7 +199,7 @@ def list_api_keys_command():
             print("\nTo set an API key:")
             print("  aicmd --set-api-key <provider> <your_api_key>")
             print("\nSupported providers:")
-            print("  openrouter, openai, deepseek, xai, gemini, qwen")
+            print(f"  {', '.join(KeyringManager.KNOWN_PROVIDERS)}")
 
     except Exception as e:
         print(f"Error listing API keys: {e}")
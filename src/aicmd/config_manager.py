@@ -4,12 +4,124 @@
 支持环境变量和JSON配置文件的多层配置源
 """
 
-from importlib import resources
 import os
+import sys
+import copy
 import json
 from pathlib import Path
 from .logger import logger
 
+try:
+    import orjson as _json_fast
+except ImportError:  # orjson 为可选依赖，未安装时回退到标准库 json
+    _json_fast = None
+
+# 默认 JSON 配置结构（模块级常量，只读使用）
+_DEFAULT_JSON_CONFIG = {
+    "version": "1.0.2",
+    "description": "AI Command Line Tool Configuration",
+    "_note": "API keys are now stored securely in system keyring. Use 'aicmd --set-api-key <provider> <key>' to configure.",
+    "basic": {
+        "interactive_mode": False,
+        "cache_enabled": True,
+        "auto_copy_threshold": 0.9,
+        "manual_confirmation_threshold": 0.8,
+    },
+    "api": {
+        "timeout_seconds": 30,
+        "max_retries": 3,
+        "default_provider": "",
+    },
+    "providers": {
+        "openrouter": {
+            "model": "",
+            "base_url": "https://openrouter.ai/api/v1/chat/completions",
+        },
+        "openai": {
+            "model": "gpt-3.5-turbo",
+            "base_url": "https://api.openai.com/v1/chat/completions",
+        },
+        "deepseek": {
+            "model": "deepseek-chat",
+            "base_url": "https://api.deepseek.com/v1/chat/completions",
+        },
+        "xai": {
+            "model": "grok-beta",
+            "base_url": "https://api.x.ai/v1/chat/completions",
+        },
+        "gemini": {
+            "model": "gemini-pro",
+            "base_url": "https://generativelanguage.googleapis.com/v1beta/models",
+        },
+        "qwen": {
+            "model": "qwen-turbo",
+            "base_url": "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation",
+        },
+    },
+    "cache": {
+        "cache_directory": "~/.ai-cmd",
+        "database_file": "cache.db",
+        "max_cache_age_days": 30,
+        "cache_size_limit": 1000,
+    },
+    "interaction": {
+        "interaction_timeout_seconds": 30,
+        "positive_weight": 0.2,
+        "negative_weight": 0.6,
+        "similarity_threshold": 0.7,
+        "confidence_threshold": 0.8,
+        "single_key_confirm": False,
+    },
+    "display": {
+        "show_confidence": False,
+        "show_source": False,
+        "colored_output": True,
+    },
+    "logging": {
+        "log_level": "INFO",
+        "file_log_level": "DEBUG",
+        "log_dir": "~/.ai-cmd/logs",
+    },
+}
+
+# 数值配置校验表：(键, 类型, 最小值, 最大值)
+_VALIDATION = (
+    ("confidence_threshold", float, 0.0, 1.0),
+    ("auto_copy_threshold", float, 0.0, 1.0),
+    ("manual_confirmation_threshold", float, 0.0, 1.0),
+    ("similarity_threshold", float, 0.0, 1.0),
+    ("positive_weight", float, 0.0, 1.0),
+    ("negative_weight", float, 0.0, 1.0),
+    ("cache_size_limit", int, 1, 100000),
+    ("max_cache_age_days", int, 1, 365),
+    ("interaction_timeout_seconds", int, 1, 300),
+    ("api_timeout_seconds", int, 1, 300),
+    ("max_retries", int, 0, 10),
+)
+
+
+
+def _json_loads(data):
+    """解析 JSON 字节串，优先使用 orjson"""
+    if _json_fast is not None:
+        return _json_fast.loads(data)
+    return json.loads(data)
+
+
+def _json_dump_file(data, path):
+    """以 2 空格缩进写入 JSON 文件，优先使用 orjson"""
+    if _json_fast is not None:
+        with open(path, "wb") as f:
+            f.write(
+                _json_fast.dumps(
+                    data,
+                    option=_json_fast.OPT_INDENT_2 | _json_fast.OPT_NON_STR_KEYS,
+                )
+            )
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
 
 class ConfigManager:
     """
@@ -60,6 +172,7 @@ class ConfigManager:
             "negative_weight": 0.6,
             "similarity_threshold": 0.7,
             "confidence_threshold": 0.8,
+            "single_key_confirm": False,  # 终端中单键（无需回车）回答 Y/n 确认
             # 显示配置
             "show_confidence": False,
             "show_source": False,
@@ -69,17 +182,28 @@ class ConfigManager:
             "file_log_level": "DEBUG",
             "log_dir": "~/.ai-cmd/logs",
             # 哈希策略配置
-            "hash_strategy": "simple",  # simple | normalized
+            "hash_strategy": "simple",  # simple | normalized | blake2
             # 兼容性配置（旧版本）
             "cache_dir": None,
         }
 
+        # 缓存用户配置文件路径字符串，避免热路径上重复构造 Path 对象
+        self._user_config_file = os.path.join(
+            Path.home(), ".ai-cmd", "settings.json"
+        )
+
         # 预加载默认 JSON 结构，用于键路径解析与类型推断
-        self.default_json_structure = self._get_default_json_config()
+        self.default_json_structure = _DEFAULT_JSON_CONFIG
         self._simple_key_paths = self._build_simple_key_paths(
             self.default_json_structure
         )
 
+        # 已解析的 JSON 配置（首次加载后常驻内存，供 set_config 等复用）
+        self._json_config = None
+
+        # 配置修订号，每次运行时修改后递增，供调用方判断派生缓存是否过期
+        self.revision = 0
+
         # 加载配置
         self.config = self._load_configuration()
 
@@ -88,23 +212,22 @@ class ConfigManager:
         config = self.default_config.copy()
 
         # 加载JSON配置文件
-        json_config = self._load_json_config()
+        json_config = self._get_json_config()
         if json_config:
-            config.update(self._flatten_json_config(json_config))
+            config.update(self._config_from_json(json_config))
 
         return config
 
     def _get_config_file_path(self):
         """获取配置文件路径"""
         # 优先查找用户配置
-        user_config = Path.home() / ".ai-cmd" / "settings.json"
-        if user_config.exists():
-            return user_config
+        if os.path.exists(self._user_config_file):
+            return Path(self._user_config_file)
 
         # 查找项目配置
-        project_config = Path.cwd() / ".ai-cmd.json"
-        if project_config.exists():
-            return project_config
+        project_config = os.path.join(os.getcwd(), ".ai-cmd.json")
+        if os.path.exists(project_config):
+            return Path(project_config)
 
         return None
 
@@ -115,12 +238,41 @@ class ConfigManager:
             return {}
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                json_config = json.load(f)
-            return json_config
+            with open(config_path, "rb") as f:
+                json_config = _json_loads(f.read())
         except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
-            print(f"Warning: Failed to load config file {config_path}: {e}")
+            logger.warning("Failed to load config file %s: %s", config_path, e)
+            return {}
+
+        # 顶层不是对象（如列表）时忽略该文件，使用默认配置
+        if not isinstance(json_config, dict):
+            logger.warning(
+                "Ignoring config file %s: top-level value must be an object", config_path
+            )
             return {}
+        return json_config
+
+    def _get_json_config(self):
+        """获取内存中的 JSON 配置，仅在首次访问时读取文件"""
+        if self._json_config is None:
+            self._json_config = self._load_json_config()
+        return self._json_config
+
+    def _config_from_json(self, json_config):
+        """将 JSON 配置转换为扁平配置，已是扁平写法时跳过嵌套解析"""
+        default_config = self.default_config
+        flat = {
+            k: v
+            for k, v in json_config.items()
+            if k in default_config and v is not None
+        }
+        if len(flat) == len(json_config):
+            return flat
+
+        # 嵌套结构（兼容顶层混用扁平键的写法）
+        flattened = self._flatten_json_config(json_config)
+        flattened.update(flat)
+        return flattened
 
     def _flatten_json_config(self, json_config):
         """将嵌套的JSON配置扁平化为ConfigManager格式"""
@@ -176,6 +328,7 @@ class ConfigManager:
                     "negative_weight": interaction.get("negative_weight"),
                     "similarity_threshold": interaction.get("similarity_threshold"),
                     "confidence_threshold": interaction.get("confidence_threshold"),
+                    "single_key_confirm": interaction.get("single_key_confirm"),
                 }
             )
 
@@ -216,6 +369,7 @@ class ConfigManager:
     def set(self, key, value):
         """设置配置项的值（运行时）"""
         self.config[key] = value
+        self.revision += 1
 
     def get_config_source(self, key):
         """获取配置项的来源"""
@@ -226,10 +380,15 @@ class ConfigManager:
 
         return "Default"
 
+    def _compute_sources(self, keys):
+        """一次性计算多个配置项的来源，避免逐键重复查找配置文件"""
+        config_path = self._get_config_file_path()
+        source = f"JSON Config ({config_path})" if config_path else "Default"
+        return dict.fromkeys(keys, source)
+
     def create_user_config(self, config_data=None, is_force=False):
-        config_dir = Path.home() / ".ai-cmd"
-        config_dir.mkdir(exist_ok=True)
-        config_file = config_dir / "settings.json"
+        config_file = Path(self._user_config_file)
+        config_file.parent.mkdir(exist_ok=True)
         if not is_force and config_file.exists():
             print(f"Config file already exists: {config_file}")
             print("Use --create-config-force to overwrite the existing file.")
@@ -237,7 +396,9 @@ class ConfigManager:
 
         if config_data is None:
             try:
-                # 读取包内资源
+                # 读取包内资源（按需导入 importlib.resources）
+                from importlib import resources
+
                 with (
                     resources.files("aicmd")
                     .joinpath("setting_template.json")
@@ -245,11 +406,12 @@ class ConfigManager:
                 ):
                     config_data = json.load(f)
             except Exception:
-                config_data = self._get_default_json_config()
+                config_data = _DEFAULT_JSON_CONFIG
 
         try:
-            with open(config_file, "w", encoding="utf-8") as f:
-                json.dump(config_data, f, indent=2, ensure_ascii=False)
+            _json_dump_file(config_data, config_file)
+            # 下次访问时重新读取刚写入的文件，避免与模板常量共享引用
+            self._json_config = None
 
             print(f"✓ User configuration file created: {config_file}")
             print("You can now edit this file to customize your settings.")
@@ -260,72 +422,8 @@ class ConfigManager:
             return None
 
     def _get_default_json_config(self):
-        """获取默认JSON配置结构"""
-        return {
-            "version": "1.0.2",
-            "description": "AI Command Line Tool Configuration",
-            "_note": "API keys are now stored securely in system keyring. Use 'aicmd --set-api-key <provider> <key>' to configure.",
-            "basic": {
-                "interactive_mode": False,
-                "cache_enabled": True,
-                "auto_copy_threshold": 0.9,
-                "manual_confirmation_threshold": 0.8,
-            },
-            "api": {
-                "timeout_seconds": 30,
-                "max_retries": 3,
-                "default_provider": "",
-            },
-            "providers": {
-                "openrouter": {
-                    "model": "",
-                    "base_url": "https://openrouter.ai/api/v1/chat/completions",
-                },
-                "openai": {
-                    "model": "gpt-3.5-turbo",
-                    "base_url": "https://api.openai.com/v1/chat/completions",
-                },
-                "deepseek": {
-                    "model": "deepseek-chat",
-                    "base_url": "https://api.deepseek.com/v1/chat/completions",
-                },
-                "xai": {
-                    "model": "grok-beta",
-                    "base_url": "https://api.x.ai/v1/chat/completions",
-                },
-                "gemini": {
-                    "model": "gemini-pro",
-                    "base_url": "https://generativelanguage.googleapis.com/v1beta/models",
-                },
-                "qwen": {
-                    "model": "qwen-turbo",
-                    "base_url": "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation",
-                },
-            },
-            "cache": {
-                "cache_directory": "~/.ai-cmd",
-                "database_file": "cache.db",
-                "max_cache_age_days": 30,
-                "cache_size_limit": 1000,
-            },
-            "interaction": {
-                "interaction_timeout_seconds": 30,
-                "positive_weight": 0.2,
-                "negative_weight": 0.6,
-                "similarity_threshold": 0.7,
-                "confidence_threshold": 0.8,
-            },
-            "display": {
-                "show_confidence": False,
-                "show_source": False,
-                "colored_output": True,
-            },
-            "logging": {
-                "log_level": "INFO",
-                "file_log_level": "DEBUG",
-                "log_dir": "~/.ai-cmd/logs",
-            },
-        }
+        """获取默认JSON配置结构（返回副本，调用方可安全修改）"""
+        return copy.deepcopy(_DEFAULT_JSON_CONFIG)
 
     def _build_simple_key_paths(self, data):
         """为扁平键生成默认 JSON 路径映射，忽略重复键"""
@@ -351,15 +449,18 @@ class ConfigManager:
             mapping.pop(key, None)
         return mapping
 
-    def is_valid_config_key(self, key: str) -> bool:
+    def validate_config(self):
         """验证配置的合理性和完整性"""
         warnings = []
         errors = []
+        # 绑定为局部变量，减少循环内的属性查找
+        cfg_get = self.config.get
+        append_error = errors.append
 
         # 检查阈值的合理性
-        confidence_threshold = self.get("confidence_threshold")
-        auto_copy_threshold = self.get("auto_copy_threshold")
-        manual_confirmation_threshold = self.get("manual_confirmation_threshold")
+        confidence_threshold = cfg_get("confidence_threshold")
+        auto_copy_threshold = cfg_get("auto_copy_threshold")
+        manual_confirmation_threshold = cfg_get("manual_confirmation_threshold")
 
         if confidence_threshold is not None and auto_copy_threshold is not None:
             if auto_copy_threshold <= confidence_threshold:
@@ -377,8 +478,8 @@ class ConfigManager:
                 )
 
         # 检查权重的合理性
-        positive_weight = self.get("positive_weight")
-        negative_weight = self.get("negative_weight")
+        positive_weight = cfg_get("positive_weight")
+        negative_weight = cfg_get("negative_weight")
 
         if positive_weight is not None and negative_weight is not None:
             if positive_weight >= negative_weight:
@@ -386,46 +487,31 @@ class ConfigManager:
                     f"negative_weight ({negative_weight}) should typically be higher than positive_weight ({positive_weight}) for better learning"
                 )
 
-        # 检查数值范围
-        range_checks = [
-            ("confidence_threshold", 0.0, 1.0),
-            ("auto_copy_threshold", 0.0, 1.0),
-            ("manual_confirmation_threshold", 0.0, 1.0),
-            ("similarity_threshold", 0.0, 1.0),
-            ("positive_weight", 0.0, 1.0),
-            ("negative_weight", 0.0, 1.0),
-        ]
-
-        for key, min_val, max_val in range_checks:
-            value = self.get(key)
-            if value is not None and not (min_val <= value <= max_val):
-                errors.append(
-                    f"{key} ({value}) must be between {min_val} and {max_val}"
-                )
-
-        # 检查整数值
-        int_checks = [
-            ("cache_size_limit", 1, 100000),
-            ("max_cache_age_days", 1, 365),
-            ("interaction_timeout_seconds", 1, 300),
-            ("api_timeout_seconds", 1, 300),
-            ("max_retries", 0, 10),
-        ]
-
-        for key, min_val, max_val in int_checks:
-            value = self.get(key)
-            if value is not None:
+        # 检查数值范围（单次遍历校验表）
+        for key, value_type, min_val, max_val in _VALIDATION:
+            value = cfg_get(key)
+            if value is None:
+                continue
+            if value_type is int:
                 if not isinstance(value, int) or not (min_val <= value <= max_val):
-                    errors.append(
+                    append_error(
                         f"{key} ({value}) must be an integer between {min_val} and {max_val}"
                     )
+            elif not isinstance(value, (int, float)) or not (
+                min_val <= value <= max_val
+            ):
+                append_error(
+                    f"{key} ({value}) must be between {min_val} and {max_val}"
+                )
 
         # 检查目录路径
-        cache_directory = self.get("cache_directory")
+        cache_directory = cfg_get("cache_directory")
         if cache_directory:
             try:
-                expanded_path = Path(cache_directory).expanduser()
-                if not expanded_path.parent.exists():
+                expanded_path = os.path.normpath(os.path.expanduser(cache_directory))
+                # 相对路径的父目录为空字符串，按当前目录处理
+                parent_dir = os.path.dirname(expanded_path) or os.curdir
+                if not os.path.exists(parent_dir):
                     warnings.append(
                         f"Parent directory of cache_directory ({cache_directory}) does not exist"
                     )
@@ -445,7 +531,7 @@ class ConfigManager:
         """打印当前配置摘要（用于调试）"""
         from .keyring_manager import KeyringManager
 
-        print("=== Configuration Summary ===")
+        lines = ["=== Configuration Summary ==="]
 
         # 按类别显示配置
         categories = {
@@ -472,6 +558,7 @@ class ConfigManager:
                 "negative_weight",
                 "similarity_threshold",
                 "confidence_threshold",
+                "single_key_confirm",
             ],
             "Display Configuration": [
                 "show_confidence",
@@ -485,52 +572,56 @@ class ConfigManager:
             ],
         }
 
+        sources = self._compute_sources(
+            key for keys in categories.values() for key in keys
+        )
         for category, keys in categories.items():
-            print(f"\n{category}:")
+            lines.append(f"\n{category}:")
             for key in keys:
                 value = self.get(key)
-                source = self.get_config_source(key)
-                print(f"  {key}: {value} ({source})")
+                lines.append(f"  {key}: {value} ({sources[key]})")
 
         # 显示提供商配置
         providers = self.get("providers", {})
         if providers:
-            print(f"\nProvider Configurations:")
+            lines.append(f"\nProvider Configurations:")
             for provider_name, provider_config in providers.items():
-                print(f"  {provider_name}:")
+                lines.append(f"  {provider_name}:")
 
                 # 从 keyring 读取 API key 状态
                 has_api_key = KeyringManager.has_api_key(provider_name)
                 model = provider_config.get("model", "")
                 base_url = provider_config.get("base_url", "")
 
-                print(
+                lines.append(
                     f"    api_key: {'✓ Set (in keyring)' if has_api_key else '✗ Not set'}"
                 )
-                print(f"    model: {model or 'Not set'}")
-                print(f"    base_url: {base_url or 'Not set'}")
+                lines.append(f"    model: {model or 'Not set'}")
+                lines.append(f"    base_url: {base_url or 'Not set'}")
 
         # 显示配置文件路径
         config_path = self._get_config_file_path()
-        print(f"\nConfiguration Sources:")
-        print(f"  JSON Config File: {config_path or 'Not found'}")
-        print(f"  API Keys: System Keyring")
-        print(f"  Default Values: Fallback")
+        lines.append(f"\nConfiguration Sources:")
+        lines.append(f"  JSON Config File: {config_path or 'Not found'}")
+        lines.append(f"  API Keys: System Keyring")
+        lines.append(f"  Default Values: Fallback")
 
         # 显示验证结果
         validation_result = self.validate_config()
         if validation_result["warnings"]:
-            print(f"\nConfiguration Warnings:")
+            lines.append(f"\nConfiguration Warnings:")
             for warning in validation_result["warnings"]:
-                print(f"  ⚠ {warning}")
+                lines.append(f"  ⚠ {warning}")
 
         if validation_result["errors"]:
-            print(f"\nConfiguration Errors:")
+            lines.append(f"\nConfiguration Errors:")
             for error in validation_result["errors"]:
-                print(f"  ✗ {error}")
+                lines.append(f"  ✗ {error}")
 
         if not validation_result["warnings"] and not validation_result["errors"]:
-            print(f"\n✓ Configuration is valid with no issues.")
+            lines.append(f"\n✓ Configuration is valid with no issues.")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
     # 设置配置属性 只有当配置有效时（也就是配置文件存在的时候）
     def _get_nested_value(self, data, key):
@@ -571,10 +662,14 @@ class ConfigManager:
             )
             return False
 
-        json_config = self._load_json_config() or {}
+        # 在副本上修改，写入成功后再替换缓存，写入失败不会残留被拒绝的值
+        json_config = copy.deepcopy(self._get_json_config())
         path_parts = []
         if "." in key:
             path_parts = key.split(".")
+        elif key in json_config:
+            # 扁平写法的配置文件直接更新顶层键
+            path_parts = [key]
         else:
             path_parts = list(self._simple_key_paths.get(key, (key,)))
 
@@ -590,14 +685,15 @@ class ConfigManager:
         container[path_parts[-1]] = value
 
         try:
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(json_config, f, indent=2, ensure_ascii=False)
+            _json_dump_file(json_config, config_path)
             print(f"✓ Configuration updated: {key} = {value}")
         except Exception as e:
             print(f"Error saving configuration: {e}")
             return False
 
-        self.config.update(self._flatten_json_config(json_config))
+        self._json_config = json_config
+        self.config.update(self._config_from_json(json_config))
+        self.revision += 1
         return True
 
     def is_valid_config_key(self, key: str) -> bool:
@@ -610,7 +706,7 @@ class ConfigManager:
 
         path_parts = key.split(".")
 
-        current_config = self._load_json_config()
+        current_config = self._get_json_config()
         if current_config and self._path_exists(current_config, path_parts):
             return True
 
@@ -630,7 +726,7 @@ class ConfigManager:
             expected_type = None
 
             if "." in key:
-                json_config = self._load_json_config() or {}
+                json_config = self._get_json_config()
                 expected_value = self._get_nested_value(json_config, key)
                 if expected_value is None:
                     expected_value = self._get_nested_value(
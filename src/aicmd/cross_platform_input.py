@@ -1,10 +1,9 @@
 """
 跨平台用户输入超时处理模块
-替代Unix专用的signal.alarm，提供Windows兼容的超时机制
+Unix终端上使用 selectors 等待输入，其他情况使用后台读取线程
 """
 
 import sys
-import threading
 from typing import Optional, Callable, Any
 
 
@@ -14,13 +13,40 @@ class InputTimeoutError(Exception):
 
 
 class CrossPlatformInput:
-    """跨平台的带超时用户输入处理器"""
-    
-    def __init__(self):
-        self.input_result = None
-        self.input_exception = None
-        self.input_thread = None
-        
+    """跨平台的带超时用户输入处理器
+
+    所有实例共享一个常驻的后台读取线程，超时后未消费的输入行会留给下一次
+    提示读取，避免每次超时都遗留一个阻塞在 input() 上的线程。
+    """
+
+    # 共享的 stdin 读取线程与行队列（首次使用时创建）
+    _line_queue = None
+    _reader_thread = None
+
+    @classmethod
+    def _ensure_reader(cls):
+        """确保后台读取线程正在运行，返回行队列"""
+        if cls._reader_thread is None or not cls._reader_thread.is_alive():
+            import queue
+            import threading
+
+            line_queue = queue.Queue()
+
+            def read_lines():
+                """持续读取 stdin，直到输入流结束"""
+                while True:
+                    line = sys.stdin.readline()
+                    line_queue.put(line)
+                    if not line:
+                        break
+
+            cls._line_queue = line_queue
+            cls._reader_thread = threading.Thread(
+                target=read_lines, name="aicmd-stdin-reader", daemon=True
+            )
+            cls._reader_thread.start()
+        return cls._line_queue
+
     def input_with_timeout(self, prompt: str = "", timeout: int = 30) -> str:
         """
         跨平台的带超时输入函数
@@ -37,38 +63,21 @@ class CrossPlatformInput:
             KeyboardInterrupt: 用户中断（Ctrl+C）
             EOFError: 输入流结束（Ctrl+D）
         """
-        self.input_result = None
-        self.input_exception = None
-        
-        def get_input():
-            """在单独线程中获取用户输入"""
-            try:
-                self.input_result = input(prompt)
-            except Exception as e:
-                self.input_exception = e
-        
-        # 启动输入线程
-        self.input_thread = threading.Thread(target=get_input)
-        self.input_thread.daemon = True
-        self.input_thread.start()
-        
-        # 等待输入或超时
-        self.input_thread.join(timeout)
-        
-        if self.input_thread.is_alive():
-            # 超时了，但线程仍在运行
-            # 注意：我们不能强制终止线程，但可以忽略结果
+        import queue
+
+        line_queue = self._ensure_reader()
+
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+
+        try:
+            line = line_queue.get(timeout=timeout)
+        except queue.Empty:
             raise InputTimeoutError(f"Input timed out after {timeout} seconds")
-        
-        # 检查是否有异常
-        if self.input_exception:
-            raise self.input_exception
-        
-        # 返回结果
-        if self.input_result is not None:
-            return self.input_result
-        else:
-            raise InputTimeoutError("Input failed without specific error")
+
+        if not line:
+            raise EOFError("End of input stream")
+        return line.rstrip("\n")
 
 
 def input_with_timeout(prompt: str = "", timeout: int = 30) -> str:
@@ -91,16 +100,16 @@ def input_with_timeout(prompt: str = "", timeout: int = 30) -> str:
     return cross_input.input_with_timeout(prompt, timeout)
 
 
-# 为了向后兼容，如果在Unix系统上，优先使用signal方式
-# 这样可以提供更好的用户体验（可以中断正在等待的input）
+# 在Unix系统上优先使用 selectors 等待终端输入：无需安装 SIGALRM 处理器，
+# 每次提示只需一次 select() 调用
 def get_best_input_method():
     """获取当前平台最佳的输入超时方法"""
-    try:
-        import signal
-        if hasattr(signal, 'SIGALRM') and sys.platform != 'win32':
-            return 'signal'
-    except ImportError:
-        pass
+    if sys.platform != 'win32':
+        try:
+            import selectors  # noqa: F401
+            return 'selector'
+        except ImportError:
+            pass
     return 'threading'
 
 
@@ -126,39 +135,80 @@ class UniversalInputTimeout:
             KeyboardInterrupt: 用户中断（Ctrl+C）
             EOFError: 输入流结束（Ctrl+D）
         """
-        if self.method == 'signal':
-            return self._input_with_signal(prompt, timeout)
+        # 只对终端使用 select：终端规范模式下每次读取最多返回一行，
+        # 不会有数据滞留在 Python 的缓冲区里而 select 却看不到
+        if self.method == 'selector' and _stdin_is_tty():
+            return self._input_with_selector(prompt, timeout)
         else:
             return self._input_with_threading(prompt, timeout)
     
-    def _input_with_signal(self, prompt: str, timeout: int) -> str:
-        """使用Unix signal的超时输入"""
-        import signal
-        
-        def timeout_handler(signum, frame):
-            raise InputTimeoutError(f"Input timed out after {timeout} seconds")
-        
-        # 设置超时处理器
-        original_handler = signal.signal(signal.SIGALRM, timeout_handler)
-        signal.alarm(timeout)
+    def _input_with_selector(self, prompt: str, timeout: int) -> str:
+        """使用 selectors 等待 stdin 可读的超时输入"""
+        import selectors
+
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(sys.stdin, selectors.EVENT_READ)
+            if not selector.select(timeout):
+                raise InputTimeoutError(f"Input timed out after {timeout} seconds")
+
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError("End of input stream")
+        return line.rstrip("\n")
+    
+    def read_key_with_timeout(self, prompt: str = "", timeout: int = 30) -> str:
+        """
+        读取单个按键（终端 cbreak 模式，无需回车），非 Unix 终端时退回整行输入
         
+        Args:
+            prompt: 输入提示信息
+            timeout: 超时时间（秒）
+            
+        Returns:
+            按下的字符；直接回车时返回空字符串
+            
+        Raises:
+            InputTimeoutError: 输入超时
+            KeyboardInterrupt: 用户中断（Ctrl+C）
+            EOFError: 输入流结束（Ctrl+D）
+        """
+        if self.method != 'selector' or not _stdin_is_tty():
+            return self.input_with_timeout(prompt, timeout)
+
+        import os
+        import selectors
+        import termios
+        import tty
+
+        fd = sys.stdin.fileno()
+        original_attrs = termios.tcgetattr(fd)
         try:
-            result = input(prompt)
-            signal.alarm(0)  # 取消超时
-            signal.signal(signal.SIGALRM, original_handler)  # 恢复原处理器
-            return result
-        except InputTimeoutError:
-            signal.alarm(0)
-            signal.signal(signal.SIGALRM, original_handler)
-            raise
-        except (KeyboardInterrupt, EOFError):
-            signal.alarm(0)
-            signal.signal(signal.SIGALRM, original_handler)
-            raise
-        except Exception as e:
-            signal.alarm(0)
-            signal.signal(signal.SIGALRM, original_handler)
-            raise
+            # TCSANOW：保留用户提前键入的内容，与整行输入的行为一致
+            tty.setcbreak(fd, termios.TCSANOW)
+            sys.stdout.write(prompt)
+            sys.stdout.flush()
+
+            with selectors.DefaultSelector() as selector:
+                selector.register(fd, selectors.EVENT_READ)
+                if not selector.select(timeout):
+                    raise InputTimeoutError(f"Input timed out after {timeout} seconds")
+
+            # 一次最多读 4 字节，完整接收输入法提交的单个多字节字符
+            key = os.read(fd, 4).decode("utf-8", errors="ignore")
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, original_attrs)
+
+        if not key or key == "\x04":
+            raise EOFError("End of input stream")
+
+        key = key.rstrip("\r\n")
+        # cbreak 模式关闭了回显，手动回显按键并换行
+        sys.stdout.write(key + "\n")
+        sys.stdout.flush()
+        return key
     
     def _input_with_threading(self, prompt: str, timeout: int) -> str:
         """使用线程的超时输入"""
@@ -166,5 +216,13 @@ class UniversalInputTimeout:
         return cross_input.input_with_timeout(prompt, timeout)
 
 
+def _stdin_is_tty() -> bool:
+    """stdin 是否为可 select 的终端"""
+    try:
+        return sys.stdin.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
 # 创建全局实例
 universal_input = UniversalInputTimeout()
\ No newline at end of file
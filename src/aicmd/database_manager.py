@@ -1,122 +1,60 @@
 """
 数据库管理器模块
 负责 SQLite 数据库的创建、初始化和安全管理
-支持连接池、批量操作和性能优化
+支持线程级连接复用、批量操作和性能优化
 """
 
 import sqlite3
 import os
 import threading
+import functools
 import time
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, List, Tuple, Any, Dict
-from queue import Queue, Empty
-from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple, Any, Dict
+from contextlib import nullcontext
 from .config_manager import ConfigManager
-from .hash_utils import hash_query
+from .hash_utils import hash_query, hash_query_batch
+from .logger import logger
 
 
-# =============================================================================
-# 连接池实现
-# =============================================================================
+# 数据库 schema 版本，校验通过后写入 PRAGMA user_version
+SCHEMA_VERSION = 2
 
-class DatabaseConnectionPool:
-    """SQLite 连接池管理器"""
-    
-    def __init__(
-        self,
-        db_path: str,
-        pool_size: int = 5,
-        timeout: float = 10.0
-    ):
-        """
-        初始化连接池
-        
-        Args:
-            db_path: 数据库文件路径
-            pool_size: 连接池大小
-            timeout: 获取连接的超时时间（秒）
-        """
-        self.db_path = db_path
-        self.pool_size = pool_size
-        self.timeout = timeout
-        self._pool: Queue = Queue(maxsize=pool_size)
-        self._lock = threading.Lock()
-        self._initialized = False
-        
-        # 延迟初始化
-        self._initialize_pool()
-    
-    def _initialize_pool(self):
-        """初始化连接池"""
-        if self._initialized:
-            return
-        
-        with self._lock:
-            if self._initialized:
-                return
-            
-            try:
-                for _ in range(self.pool_size):
-                    conn = self._create_connection()
-                    if conn:
-                        self._pool.put(conn)
-                self._initialized = True
-            except Exception as e:
-                print(f"Warning: Failed to initialize connection pool: {e}")
-    
-    def _create_connection(self) -> Optional[sqlite3.Connection]:
-        """创建新的数据库连接"""
-        try:
-            conn = sqlite3.connect(
-                self.db_path,
-                timeout=self.timeout,
-                check_same_thread=False  # 允许跨线程使用
-            )
-            # 启用 WAL 模式以提高并发性能
-            conn.execute("PRAGMA journal_mode=WAL")
-            # 启用外键约束
-            conn.execute("PRAGMA foreign_keys=ON")
-            # 优化同步模式
-            conn.execute("PRAGMA synchronous=NORMAL")
-            # 增加缓存大小
-            conn.execute("PRAGMA cache_size=-10000")  # 约 10MB
-            return conn
-        except Exception as e:
-            print(f"Warning: Failed to create database connection: {e}")
-            return None
-    
-    @contextmanager
-    def get_connection(self):
-        """获取数据库连接（上下文管理器）"""
-        conn = None
-        try:
-            conn = self._pool.get(timeout=self.timeout)
-            yield conn
-        except Empty:
-            # 池中没有可用连接，创建临时连接
-            conn = self._create_connection()
-            yield conn
-            if conn:
-                conn.close()
-            conn = None
-        finally:
-            if conn is not None:
-                try:
-                    self._pool.put_nowait(conn)
-                except:
-                    conn.close()
-    
-    def close_all(self):
-        """关闭所有连接"""
-        while not self._pool.empty():
-            try:
-                conn = self._pool.get_nowait()
-                conn.close()
-            except:
-                pass
-        self._initialized = False
+# 读取 enhanced_cache 行数：由触发器维护的计数器，避免 COUNT(*) 全表扫描
+CACHE_COUNT_SQL = "SELECT v FROM cache_meta WHERE k = 'count'"
+
+# 每个线程连接上缓存的游标数量上限
+_MAX_CACHED_CURSORS = 64
+
+# 每个连接的预编译语句缓存容量（sqlite3 默认 128），足以覆盖本模块的全部 SQL
+_CACHED_STATEMENTS = 256
+
+# 在线备份每一步复制的页数，分步复制避免长时间持有读锁
+_BACKUP_PAGES_PER_STEP = 1000
+
+# execute_batch 每次 executemany 处理的记录数，限制单次绑定的参数列表大小
+_EXECUTE_BATCH_SIZE = 10000
+
+# 每个新连接执行的 PRAGMA 调优脚本
+# journal_mode=WAL 会持久化到数据库文件，只在初始化时设置一次；
+# 忙等待时长由 sqlite3.connect 的 timeout 参数控制；
+# recursive_triggers 使 INSERT OR REPLACE 删除冲突行时也触发计数触发器
+_CONNECTION_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-20000;
+PRAGMA recursive_triggers=ON;
+"""
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_db_path(base_directory: str, database_file: str) -> str:
+    """解析数据库文件路径，目录不存在时才创建（结果按参数缓存）"""
+    base_dir = Path(base_directory).expanduser()
+    if not base_dir.is_dir():
+        base_dir.mkdir(parents=True, exist_ok=True)
+    return str(base_dir / database_file)
 
 
 class SafeDatabaseManager:
@@ -130,6 +68,11 @@ class SafeDatabaseManager:
         self.lock = threading.Lock()
         self.is_available = False
 
+        # 线程级连接缓存：每个线程复用一个长连接，避免每次查询重新打开数据库
+        self._tls = threading.local()
+        self._open_conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+
         # 尝试初始化数据库
         self._initialize_database()
 
@@ -141,14 +84,11 @@ class SafeDatabaseManager:
             )
             database_file = self.config.get("database_file") or "cache.db"
 
-            base_dir = Path(cache_directory or (Path.home() / ".ai-cmd")).expanduser()
-            base_dir.mkdir(parents=True, exist_ok=True)
-
-            new_db_path = base_dir / database_file
-            return str(new_db_path)
+            base_directory = str(cache_directory or (Path.home() / ".ai-cmd"))
+            return _resolve_db_path(base_directory, database_file)
 
         except Exception as e:
-            print(f"Warning: Failed to determine database path: {e}")
+            logger.warning("Failed to determine database path: %s", e)
             # 降级到临时目录
             try:
                 import tempfile
@@ -157,26 +97,68 @@ class SafeDatabaseManager:
                 temp_dir.mkdir(parents=True, exist_ok=True)
                 return str(temp_dir / "cache.db")
             except Exception as e2:
-                print(f"Warning: Failed to create temp database path: {e2}")
+                logger.warning("Failed to create temp database path: %s", e2)
                 return None
 
+    def _connect(self, timeout: float = 5.0) -> sqlite3.Connection:
+        """创建应用了 PRAGMA 调优的数据库连接"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=timeout,
+            check_same_thread=False,
+            cached_statements=_CACHED_STATEMENTS,
+        )
+        conn.executescript(_CONNECTION_PRAGMAS)
+        return conn
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """获取当前线程复用的数据库连接（首次访问时创建）"""
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._tls.conn = conn
+            self._tls.cursors = {}
+            with self._conns_lock:
+                self._open_conns.append(conn)
+        return conn
+
+    def _cursor(self, conn: sqlite3.Connection, sql: str) -> sqlite3.Cursor:
+        """获取当前线程连接上为该 SQL 复用的游标，避免每次查询重新分配"""
+        cursors = self._tls.cursors
+        cursor = cursors.get(sql)
+        if cursor is None:
+            if len(cursors) >= _MAX_CACHED_CURSORS:
+                cursors.clear()
+            cursor = cursors[sql] = conn.cursor()
+        return cursor
+
+    def close(self):
+        """关闭所有线程缓存的数据库连接"""
+        with self._conns_lock:
+            conns, self._open_conns = self._open_conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._tls = threading.local()
+
     def _initialize_database(self):
         """安全初始化数据库"""
         try:
             # 检查是否启用缓存
             if not self.config.get("cache_enabled", True):
-                print("Cache is disabled by configuration")
+                logger.info("Cache is disabled by configuration")
                 return
 
             # 获取数据库路径
             self.db_path = self._get_database_path()
             if not self.db_path:
-                print("Warning: Cannot initialize database, running without cache")
+                logger.warning("Cannot initialize database, running without cache")
                 return
 
-            # 测试数据库连接
-            with sqlite3.connect(self.db_path, timeout=5.0) as conn:
-                conn.execute("SELECT 1").fetchone()
+            # 测试数据库连接，并启用持久化的 WAL 日志模式
+            self._get_conn().execute("PRAGMA journal_mode=WAL").fetchone()
 
             # 创建表结构
             self._create_tables()
@@ -187,11 +169,11 @@ class SafeDatabaseManager:
                 # 降低噪音，避免常规路径打印
                 # print(f"Database initialized successfully: {self.db_path}")
             else:
-                print("Warning: Database table verification failed")
+                logger.warning("Database table verification failed")
 
         except Exception as e:
-            print(f"Warning: Database initialization failed: {e}")
-            print("Running without cache functionality")
+            logger.warning("Database initialization failed: %s", e)
+            logger.warning("Running without cache functionality")
 
     def _create_tables(self):
         """创建数据库表结构"""
@@ -225,29 +207,48 @@ class SafeDatabaseManager:
         );
         """
 
+        # 缓存条目计数器：首次创建时以现有行数初始化，之后由触发器增减
+        cache_meta_sql = """
+        CREATE TABLE IF NOT EXISTS cache_meta (
+            k TEXT PRIMARY KEY,
+            v INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO cache_meta (k, v)
+            SELECT 'count', COUNT(*) FROM enhanced_cache;
+        CREATE TRIGGER IF NOT EXISTS trg_enhanced_cache_insert
+            AFTER INSERT ON enhanced_cache
+        BEGIN
+            UPDATE cache_meta SET v = v + 1 WHERE k = 'count';
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_enhanced_cache_delete
+            AFTER DELETE ON enhanced_cache
+        BEGIN
+            UPDATE cache_meta SET v = v - 1 WHERE k = 'count';
+        END;
+        """
+
         # 创建索引以提高查询性能
         indexes_sql = [
             "CREATE INDEX IF NOT EXISTS idx_query_hash ON enhanced_cache (query_hash);",
+            # id 是 rowid 别名，索引已隐式包含 rowid，因此该索引对
+            # "SELECT id ... ORDER BY last_used" 已是覆盖索引，无需 (last_used, id) 复合索引
             "CREATE INDEX IF NOT EXISTS idx_last_used ON enhanced_cache (last_used);",
             "CREATE INDEX IF NOT EXISTS idx_confidence_score ON enhanced_cache (confidence_score);",
+            "CREATE INDEX IF NOT EXISTS idx_created_at ON enhanced_cache (created_at);",
             "CREATE INDEX IF NOT EXISTS idx_feedback_query_hash ON feedback_history (query_hash);",
             "CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback_history (timestamp);",
         ]
 
-        try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                # 创建表
-                conn.execute(enhanced_cache_sql)
-                conn.execute(feedback_history_sql)
+        # 合并为单个 DDL 脚本，一次性执行（executescript 自动提交）
+        ddl_script = "\n".join(
+            [enhanced_cache_sql, feedback_history_sql, cache_meta_sql, *indexes_sql]
+        )
 
-                # 创建索引
-                for index_sql in indexes_sql:
-                    conn.execute(index_sql)
-
-                conn.commit()
+        try:
+            self._get_conn().executescript(ddl_script)
 
         except Exception as e:
-            print(f"Warning: Failed to create database tables: {e}")
+            logger.warning("Failed to create database tables: %s", e)
             raise
 
     def _verify_tables(self):
@@ -256,52 +257,48 @@ class SafeDatabaseManager:
             return False
 
         try:
-            with sqlite3.connect(self.db_path, timeout=5.0) as conn:
-                cursor = conn.cursor()
+            conn = self._get_conn()
+
+            # 已通过校验的数据库会记录 schema 版本，直接跳过后续检查
+            if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return True
 
-                # 检查 enhanced_cache 表
-                cursor.execute(
-                    """
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name='enhanced_cache'
+            # 一次查询确认所有表都存在
+            tables = conn.execute(
                 """
-                )
-                if not cursor.fetchone():
-                    return False
-
-                # 检查 feedback_history 表
-                cursor.execute(
-                    """
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name='feedback_history'
+                SELECT name FROM sqlite_master 
+                WHERE type='table'
+                  AND name IN ('enhanced_cache', 'feedback_history', 'cache_meta')
                 """
-                )
-                if not cursor.fetchone():
-                    return False
-
-                # 验证关键列存在
-                cursor.execute("PRAGMA table_info(enhanced_cache)")
-                cache_columns = {row[1] for row in cursor.fetchall()}
-                required_cache_columns = {
-                    "id",
-                    "query",
-                    "query_hash",
-                    "command",
-                    "confidence_score",
-                    "confirmation_count",
-                    "rejection_count",
-                    "last_used",
-                    "created_at",
-                }
-
-                if not required_cache_columns.issubset(cache_columns):
-                    print(f"Warning: Missing required columns in enhanced_cache table")
-                    return False
+            ).fetchall()
+            if len(tables) != 3:
+                return False
 
-                return True
+            # 验证关键列存在
+            cache_columns = {
+                row[1] for row in conn.execute("PRAGMA table_info(enhanced_cache)")
+            }
+            required_cache_columns = {
+                "id",
+                "query",
+                "query_hash",
+                "command",
+                "confidence_score",
+                "confirmation_count",
+                "rejection_count",
+                "last_used",
+                "created_at",
+            }
+
+            if not required_cache_columns.issubset(cache_columns):
+                logger.warning("Missing required columns in enhanced_cache table")
+                return False
+
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            return True
 
         except Exception as e:
-            print(f"Warning: Database verification failed: {e}")
+            logger.warning("Database verification failed: %s", e)
             return False
 
     def get_connection(self):
@@ -310,9 +307,9 @@ class SafeDatabaseManager:
             return None
 
         try:
-            return sqlite3.connect(self.db_path, timeout=5.0)
+            return self._connect()
         except Exception as e:
-            print(f"Warning: Failed to get database connection: {e}")
+            logger.warning("Failed to get database connection: %s", e)
             return None
 
     def execute_query(self, query, params=None, fetch=False):
@@ -320,24 +317,26 @@ class SafeDatabaseManager:
         if not self.is_available or not self.db_path:
             return None
 
-        with self.lock:
-            try:
-                with sqlite3.connect(self.db_path, timeout=5.0) as conn:
-                    cursor = conn.cursor()
+        # WAL 模式下读写可以并发：只读 SELECT 直接使用线程自己的连接，
+        # 只有写操作才需要 self.lock 串行化
+        if fetch and query.lstrip()[:6].upper() == "SELECT":
+            lock = nullcontext()
+        else:
+            lock = self.lock
 
-                    if params:
-                        cursor.execute(query, params)
-                    else:
-                        cursor.execute(query)
+        with lock:
+            try:
+                conn = self._get_conn()
+                cursor = self._cursor(conn, query)
+                with conn:
+                    cursor.execute(query, params or ())
 
                     if fetch:
                         return cursor.fetchall()
-                    else:
-                        conn.commit()
-                        return cursor.rowcount
+                    return cursor.rowcount
 
             except Exception as e:
-                print(f"Warning: Database query failed: {e}")
+                logger.warning("Database query failed: %s", e)
                 return None
 
     def generate_query_hash(self, query):
@@ -345,68 +344,70 @@ class SafeDatabaseManager:
         hash_strategy = self.config.get("hash_strategy", "simple")
         return hash_query(query, strategy=hash_strategy)
 
+    def generate_query_hashes(self, queries):
+        """批量生成查询哈希，与 generate_query_hash 结果一致"""
+        hash_strategy = self.config.get("hash_strategy", "simple")
+        return hash_query_batch(queries, strategy=hash_strategy)
+
     def cleanup_old_entries(self):
         """清理过期的缓存条目（基于配置的限制和TTL）"""
         if not self.is_available:
             return 0
 
         total_deleted = 0
+        max_age_days = self.config.get("max_cache_age_days", 30)
+        cache_limit = self.config.get("cache_size_limit", 1000)
 
-        try:
-            # 1. 先清理基于时间的TTL过期条目
-            max_age_days = self.config.get("max_cache_age_days", 30)
-            if max_age_days > 0:
-                ttl_result = self.execute_query(
-                    """
-                    DELETE FROM enhanced_cache 
-                    WHERE created_at < datetime('now', '-' || ? || ' days')
-                    """,
-                    (max_age_days,),
-                )
-
-                if ttl_result and isinstance(ttl_result, int):
-                    total_deleted += ttl_result
-                    if ttl_result > 0:
-                        print(
-                            f"Cleaned up {ttl_result} expired cache entries (older than {max_age_days} days)"
-                        )
-
-            # 2. 然后清理基于大小限制的条目
-            cache_limit = self.config.get("cache_size_limit", 1000)
-            if cache_limit > 0:
-                # 获取当前缓存条目数
-                result = self.execute_query(
-                    "SELECT COUNT(*) FROM enhanced_cache", fetch=True
-                )
+        # TTL 清理与容量裁剪在同一连接、同一事务中完成
+        with self.lock:
+            try:
+                conn = self._get_conn()
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+
+                    # 1. 先清理基于时间的TTL过期条目
+                    if max_age_days > 0:
+                        # created_at 以 UTC "YYYY-MM-DD HH:MM:SS" 存储，直接按字符串比较
+                        cutoff = (
+                            datetime.now(timezone.utc) - timedelta(days=max_age_days)
+                        ).strftime("%Y-%m-%d %H:%M:%S")
+                        ttl_result = conn.execute(
+                            "DELETE FROM enhanced_cache WHERE created_at < ?",
+                            (cutoff,),
+                        ).rowcount
+                        if ttl_result > 0:
+                            total_deleted += ttl_result
+                            logger.info(
+                                "Cleaned up %d expired cache entries (older than %s days)",
+                                ttl_result,
+                                max_age_days,
+                            )
 
-                if result and isinstance(result, list) and len(result) > 0:
-                    count = result[0][0]
-                    if count > cache_limit:
-                        # 删除最老的条目
-                        delete_count = (
-                            count - cache_limit + 100
-                        )  # 多删除一些以避免频繁清理
-                        size_result = self.execute_query(
+                    # 2. 超出容量时只保留最近使用的条目，多删除 100 条以避免频繁清理
+                    if cache_limit > 0:
+                        size_result = conn.execute(
                             """
                             DELETE FROM enhanced_cache 
-                            WHERE id IN (
+                            WHERE (SELECT v FROM cache_meta WHERE k = 'count') > ?
+                              AND id IN (
                                 SELECT id FROM enhanced_cache 
-                                ORDER BY last_used ASC 
-                                LIMIT ?
-                            )
-                        """,
-                            (delete_count,),
-                        )
-
-                        if size_result and isinstance(size_result, int):
+                                ORDER BY last_used DESC 
+                                LIMIT -1 OFFSET ?
+                              )
+                            """,
+                            (cache_limit, max(cache_limit - 100, 0)),
+                        ).rowcount
+                        if size_result > 0:
                             total_deleted += size_result
-                            if size_result > 0:
-                                print(
-                                    f"Cleaned up {size_result} old cache entries (size limit: {cache_limit})"
-                                )
+                            logger.info(
+                                "Cleaned up %d old cache entries (size limit: %s)",
+                                size_result,
+                                cache_limit,
+                            )
 
-        except Exception as e:
-            print(f"Warning: Cache cleanup failed: {e}")
+            except Exception as e:
+                logger.warning("Cache cleanup failed: %s", e)
+                return 0
 
         return total_deleted
 
@@ -418,25 +419,17 @@ class SafeDatabaseManager:
         try:
             status = {}
 
-            # 缓存条目统计
+            # 缓存条目与反馈历史统计，一次查询取回
             result = self.execute_query(
-                "SELECT COUNT(*) FROM enhanced_cache", fetch=True
-            )
-            status["cache_entries"] = (
-                result[0][0]
-                if result and isinstance(result, list) and len(result) > 0
-                else 0
-            )
-
-            # 反馈历史统计
-            result = self.execute_query(
-                "SELECT COUNT(*) FROM feedback_history", fetch=True
-            )
-            status["feedback_entries"] = (
-                result[0][0]
-                if result and isinstance(result, list) and len(result) > 0
-                else 0
+                f"SELECT ({CACHE_COUNT_SQL}), (SELECT COUNT(*) FROM feedback_history)",
+                fetch=True,
             )
+            if result and isinstance(result, list) and len(result) > 0:
+                cache_entries, feedback_entries = result[0]
+            else:
+                cache_entries = feedback_entries = 0
+            status["cache_entries"] = cache_entries or 0
+            status["feedback_entries"] = feedback_entries or 0
 
             # 数据库文件大小
             if self.db_path and os.path.exists(self.db_path):
@@ -450,11 +443,11 @@ class SafeDatabaseManager:
             return status
 
         except Exception as e:
-            print(f"Warning: Failed to get database status: {e}")
+            logger.warning("Failed to get database status: %s", e)
             return {"status": "error", "error": str(e)}
 
     def backup_database(self, backup_path=None):
-        """备份数据库文件"""
+        """使用在线备份 API 备份数据库"""
         if not self.is_available or not self.db_path:
             return False
 
@@ -464,14 +457,19 @@ class SafeDatabaseManager:
                     f"{self.db_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                 )
 
-            import shutil
-
-            shutil.copy2(self.db_path, backup_path)
-            print(f"Database backed up to: {backup_path}")
+            # 使用 SQLite 在线备份 API，可正确包含 WAL 中已提交的数据
+            with self.lock:
+                src = self._get_conn()
+                dst = sqlite3.connect(backup_path)
+                try:
+                    src.backup(dst, pages=_BACKUP_PAGES_PER_STEP)
+                finally:
+                    dst.close()
+            logger.info("Database backed up to: %s", backup_path)
             return True
 
         except Exception as e:
-            print(f"Warning: Database backup failed: {e}")
+            logger.warning("Database backup failed: %s", e)
             return False
 
     # =========================================================================
@@ -482,7 +480,7 @@ class SafeDatabaseManager:
         self,
         query: str,
         params_list: List[Tuple],
-        batch_size: int = 100
+        batch_size: int = _EXECUTE_BATCH_SIZE
     ) -> int:
         """
         批量执行数据库插入/更新操作
@@ -490,7 +488,7 @@ class SafeDatabaseManager:
         Args:
             query: SQL 查询语句（带占位符）
             params_list: 参数列表
-            batch_size: 每批处理的记录数
+            batch_size: 每次 executemany 处理的记录数（全部批次在同一事务中提交）
             
         Returns:
             成功处理的记录数
@@ -502,29 +500,29 @@ class SafeDatabaseManager:
         
         with self.lock:
             try:
-                with sqlite3.connect(self.db_path, timeout=30.0) as conn:
-                    cursor = conn.cursor()
-                    
-                    # 启用事务优化
-                    conn.execute("PRAGMA synchronous=OFF")
-                    conn.execute("BEGIN TRANSACTION")
-                    
-                    try:
-                        for i in range(0, len(params_list), batch_size):
-                            batch = params_list[i:i + batch_size]
-                            cursor.executemany(query, batch)
-                            total_affected += cursor.rowcount
-                        
-                        conn.commit()
-                    except Exception as e:
-                        conn.rollback()
-                        raise e
-                    finally:
-                        # 恢复正常同步模式
-                        conn.execute("PRAGMA synchronous=NORMAL")
-                        
+                conn = self._get_conn()
+                cursor = self._cursor(conn, query)
+
+                # 启用事务优化：整批数据只提交一次
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute("BEGIN IMMEDIATE")
+
+                try:
+                    for i in range(0, len(params_list), batch_size):
+                        batch = params_list[i:i + batch_size]
+                        cursor.executemany(query, batch)
+                        total_affected += cursor.rowcount
+
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    raise e
+                finally:
+                    # 恢复正常同步模式
+                    conn.execute("PRAGMA synchronous=NORMAL")
+
             except Exception as e:
-                print(f"Warning: Batch execution failed: {e}")
+                logger.warning("Batch execution failed: %s", e)
                 return 0
         
         return total_affected
@@ -551,12 +549,14 @@ class SafeDatabaseManager:
         VALUES (?, ?, ?, ?, ?, ?)
         """
         
+        query_texts = [entry.get("query", "") for entry in entries]
+        query_hashes = self.generate_query_hashes(query_texts)
+
         params_list = []
-        for entry in entries:
-            query_text = entry.get("query", "")
+        for entry, query_text, query_hash in zip(entries, query_texts, query_hashes):
             params_list.append((
                 query_text,
-                self.generate_query_hash(query_text),
+                query_hash,
                 entry.get("command", ""),
                 entry.get("confidence_score", 0.5),
                 entry.get("os_type"),
@@ -580,17 +580,16 @@ class SafeDatabaseManager:
         
         with self.lock:
             try:
-                with sqlite3.connect(self.db_path, timeout=10.0) as conn:
-                    placeholders = ",".join("?" * len(ids))
-                    cursor = conn.cursor()
-                    cursor.execute(
+                conn = self._get_conn()
+                placeholders = ",".join("?" * len(ids))
+                with conn:
+                    cursor = conn.execute(
                         f"DELETE FROM enhanced_cache WHERE id IN ({placeholders})",
                         ids
                     )
-                    conn.commit()
-                    return cursor.rowcount
+                return cursor.rowcount
             except Exception as e:
-                print(f"Warning: Bulk delete failed: {e}")
+                logger.warning("Bulk delete failed: %s", e)
                 return 0
 
     # =========================================================================
@@ -609,12 +608,12 @@ class SafeDatabaseManager:
         
         with self.lock:
             try:
-                with sqlite3.connect(self.db_path, timeout=60.0) as conn:
+                with self._connect(timeout=60.0) as conn:
                     conn.execute("VACUUM")
-                print("Database vacuum completed successfully")
+                logger.info("Database vacuum completed successfully")
                 return True
             except Exception as e:
-                print(f"Warning: Database vacuum failed: {e}")
+                logger.warning("Database vacuum failed: %s", e)
                 return False
 
     def analyze_database(self) -> bool:
@@ -629,11 +628,11 @@ class SafeDatabaseManager:
         
         with self.lock:
             try:
-                with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+                with self._connect(timeout=30.0) as conn:
                     conn.execute("ANALYZE")
                 return True
             except Exception as e:
-                print(f"Warning: Database analyze failed: {e}")
+                logger.warning("Database analyze failed: %s", e)
                 return False
 
     def check_integrity(self) -> Dict[str, Any]:
@@ -655,7 +654,7 @@ class SafeDatabaseManager:
             return result
         
         try:
-            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            with self._connect(timeout=30.0) as conn:
                 cursor = conn.cursor()
                 
                 # 完整性检查
@@ -710,7 +709,7 @@ class SafeDatabaseManager:
             report["integrity"] = self.check_integrity()
             
             # 性能指标
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
+            with self._connect(timeout=10.0) as conn:
                 cursor = conn.cursor()
                 
                 # 检查索引使用情况
@@ -785,3 +784,4 @@ class SafeDatabaseManager:
         """清理资源"""
         if self.connection:
             self.connection.close()
+        self.close()
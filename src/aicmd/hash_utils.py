@@ -4,6 +4,52 @@
 """
 
 import hashlib
+import re
+from typing import Iterable, List
+
+# normalized 策略使用的同义词映射
+_SYNONYMS = {
+    "show": "list",
+    "display": "list",
+    "print": "list",
+    "find": "search",
+    "locate": "search",
+    "remove": "delete",
+    "del": "delete",
+    "rm": "delete",
+    "create": "make",
+    "generate": "make",
+    "build": "make",
+}
+
+# 预编译的同义词替换模式（导入时构建一次）
+# 只匹配以空白分隔的完整单词，与按空白切分后逐词替换的结果保持一致
+_SYNONYMS_RE = re.compile(
+    r"(?<!\S)(" + "|".join(map(re.escape, _SYNONYMS)) + r")(?!\S)"
+)
+
+
+def _replace_synonym(match) -> str:
+    return _SYNONYMS[match.group(1)]
+
+
+def _normalize_simple(query) -> str:
+    """小写并折叠多余空白为单空格（str.split 在 C 层完成切分，比正则替换更快）"""
+    # 不走 ASCII bytes 快速路径：bytes.split 不把 \x1c-\x1f 视为空白，补齐后
+    # 与 str 路径的耗时已无可测差异，且会产生第二套需要保持一致的实现
+    if not isinstance(query, str):
+        query = str(query)
+    return " ".join(query.lower().split())
+
+
+def _normalize_synonyms(query) -> str:
+    """在 simple 标准化的基础上替换常见同义词"""
+    return _SYNONYMS_RE.sub(_replace_synonym, _normalize_simple(query))
+
+
+def _digest(normalized_query: str) -> str:
+    """sha256 后取前 16 位"""
+    return hashlib.sha256(normalized_query.encode("utf-8")).hexdigest()[:16]
 
 
 def hash_query_simple(query: str) -> str:
@@ -15,10 +61,7 @@ def hash_query_simple(query: str) -> str:
     - 折叠多余空白为单空格
     - sha256 后取前 16 位
     """
-    if not isinstance(query, str):
-        query = str(query)
-    normalized_query = " ".join(query.lower().split())
-    return hashlib.sha256(normalized_query.encode("utf-8")).hexdigest()[:16]
+    return _digest(_normalize_simple(query))
 
 
 def hash_query_normalized(query: str) -> str:
@@ -31,36 +74,19 @@ def hash_query_normalized(query: str) -> str:
     - 移除常见停用词和变体
     - sha256 后取前 16 位
     """
-    if not isinstance(query, str):
-        query = str(query)
+    return _digest(_normalize_synonyms(query))
 
-    # 基本标准化
-    normalized_query = " ".join(query.lower().split())
-
-    # 移除常见的变体表达
-    synonyms = {
-        "show": "list",
-        "display": "list",
-        "print": "list",
-        "find": "search",
-        "locate": "search",
-        "remove": "delete",
-        "del": "delete",
-        "rm": "delete",
-        "create": "make",
-        "generate": "make",
-        "build": "make",
-    }
-
-    words = normalized_query.split()
-    normalized_words = []
-    for word in words:
-        # 替换同义词
-        word = synonyms.get(word, word)
-        normalized_words.append(word)
-
-    final_query = " ".join(normalized_words)
-    return hashlib.sha256(final_query.encode("utf-8")).hexdigest()[:16]
+
+def hash_query_blake2(query: str) -> str:
+    """
+    BLAKE2b 查询哈希函数 (更快的非安全用途哈希)
+
+    规则：
+    - 与 simple 相同的标准化
+    - blake2b(digest_size=8)，输出 16 位十六进制
+    """
+    normalized_query = _normalize_simple(query)
+    return hashlib.blake2b(normalized_query.encode("utf-8"), digest_size=8).hexdigest()
 
 
 def hash_query(query: str, strategy: str = "simple") -> str:
@@ -69,7 +95,7 @@ def hash_query(query: str, strategy: str = "simple") -> str:
 
     Args:
         query: 查询字符串
-        strategy: 哈希策略 ("simple" | "normalized")
+        strategy: 哈希策略 ("simple" | "normalized" | "blake2")
 
     Returns:
         哈希值字符串
@@ -78,5 +104,29 @@ def hash_query(query: str, strategy: str = "simple") -> str:
     """
     if strategy == "normalized":
         return hash_query_normalized(query)
+    elif strategy == "blake2":
+        return hash_query_blake2(query)
     else:  # 默认使用 simple 策略保持兼容性
         return hash_query_simple(query)
+
+
+def hash_query_batch(queries: Iterable[str], strategy: str = "simple") -> List[str]:
+    """
+    批量计算查询哈希，结果与逐条调用 hash_query 一致
+
+    Args:
+        queries: 查询字符串序列
+        strategy: 哈希策略 ("simple" | "normalized" | "blake2")
+
+    Returns:
+        与输入顺序对应的哈希值列表
+    """
+    if strategy == "blake2":
+        blake2b = hashlib.blake2b
+        return [
+            blake2b(_normalize_simple(q).encode("utf-8"), digest_size=8).hexdigest()
+            for q in queries
+        ]
+    normalize = _normalize_synonyms if strategy == "normalized" else _normalize_simple
+    sha256 = hashlib.sha256
+    return [sha256(normalize(q).encode("utf-8")).hexdigest()[:16] for q in queries]
@@ -5,12 +5,44 @@
 
 import sys
 import os
+import functools
 from typing import Optional, Tuple, Dict, Any
 from enum import Enum
 from .config_manager import ConfigManager
 from .error_handler import GracefulDegradationManager
 from .cross_platform_input import universal_input, InputTimeoutError
 
+# ANSI 颜色码
+_ANSI = {
+    "green": "\033[92m",
+    "yellow": "\033[93m",
+    "red": "\033[91m",
+    "blue": "\033[94m",
+    "cyan": "\033[96m",
+    "bold": "\033[1m",
+    "reset": "\033[0m",
+}
+_ANSI_RESET = _ANSI["reset"]
+
+# 确认 / 拒绝的响应（用户输入经 strip().casefold() 后比较，集合内容须已是 casefold 形式）
+_YES_RESPONSES = frozenset(
+    ("", "y", "yes", "ok", "sure", "是", "好", "确认", "1", "true")
+)
+_NO_RESPONSES = frozenset(
+    ("n", "no", "nope", "cancel", "否", "不", "取消", "0", "false")
+)
+# quick_confirm 中视为确认的非空响应
+_QUICK_YES_RESPONSES = frozenset(("y", "yes", "是", "好"))
+
+# 固定不变的提示文本：属性名 -> (文本, 颜色)，颜色设置变化时预先着色
+_STATIC_MESSAGES = {
+    "_prompt_str": ("Copy to clipboard? [Y/n]: ", "blue"),
+    "_cancelled_str": ("\n✗ Cancelled", "red"),
+    "_success_copied_str": ("✓ Copied to clipboard!", "green"),
+    "_success_ready_str": ("✓ Command ready", "green"),
+    "_rejected_str": ("✗ Not copied", "red"),
+}
+
 
 class ConfirmationResult(Enum):
     """确认结果枚举"""
@@ -22,6 +54,41 @@ class ConfirmationResult(Enum):
     ERROR = "error"
 
 
+# 交互统计初始值
+_ZERO_STATS = {
+    "total_prompts": 0,
+    "confirmed": 0,
+    "rejected": 0,
+    "timeouts": 0,
+    "cancelled": 0,
+    "errors": 0,
+}
+
+# 确认结果到 interaction_stats 计数键的映射
+_RESULT_TO_STAT = {
+    ConfirmationResult.CONFIRMED: "confirmed",
+    ConfirmationResult.REJECTED: "rejected",
+    ConfirmationResult.TIMEOUT: "timeouts",
+    ConfirmationResult.CANCELLED: "cancelled",
+    ConfirmationResult.ERROR: "errors",
+}
+
+
+def _plain_text(text: str, color: str) -> str:
+    """禁用颜色时的 _colorize 实现：原样返回文本"""
+    return text
+
+
+@functools.lru_cache(maxsize=None)
+def _terminal_supports_color() -> bool:
+    """检查 stdout 终端是否支持颜色输出（每个进程只检测一次）"""
+    return (
+        hasattr(sys.stdout, "isatty")
+        and sys.stdout.isatty()
+        and os.environ.get("TERM", "").lower() != "dumb"
+    )
+
+
 class InteractiveManager:
     """交互管理器，处理用户确认和反馈收集"""
 
@@ -39,65 +106,83 @@ class InteractiveManager:
         self.no_color = no_color
 
         # 从配置获取交互参数（与模板对齐，同时兼容旧键名）
-        # 读取并强制类型的配置项
-        timeout_primary = self.config.get("interaction_timeout_seconds", None)
-        timeout_fallback = self.config.get("interaction_timeout", 30)
-        default_timeout: int = 30
-        for candidate in (timeout_primary, timeout_fallback):
-            try:
-                if isinstance(candidate, (int, float, str)):
-                    default_timeout = int(candidate)
-                    break
-            except Exception:
-                continue
-        self.default_timeout = default_timeout
-        auto_confirm_raw = self.config.get("auto_confirm_on_timeout", True)
-        self.auto_confirm_on_timeout = (
-            bool(auto_confirm_raw)
-            if isinstance(auto_confirm_raw, (bool, int, str))
-            else True
+        self.default_timeout = self._get_int_config(
+            ("interaction_timeout_seconds", "interaction_timeout"), 30
         )
+        self.auto_confirm_on_timeout = self._get_bool_config(
+            "auto_confirm_on_timeout", True
+        )
+        # 终端中是否单键回答确认提示（无需回车）
+        self.single_key_confirm = bool(self.config.get("single_key_confirm", False))
+        # 自动复制阈值（初始化时读取一次）
+        self._auto_copy_threshold = self._get_float_config("auto_copy_threshold", 0.9)
         # 展示项
         self.show_detailed_info = self.config.get("show_detailed_info", True)
         colored_output = self.config.get("colored_output", None)
         if colored_output is None:
             colored_output = self.config.get("use_colors", True)
-        self.use_colors = bool(colored_output) and self._supports_color() and not self.no_color
+        self.use_colors = (
+            not self.no_color and bool(colored_output) and self._supports_color()
+        )
 
         # 交互统计
-        self.interaction_stats = {
-            "total_prompts": 0,
-            "confirmed": 0,
-            "rejected": 0,
-            "timeouts": 0,
-            "cancelled": 0,
-            "errors": 0,
-        }
+        self.interaction_stats = dict(_ZERO_STATS)
+
+    def _get_int_config(self, keys: Tuple[str, ...], default: int) -> int:
+        """按顺序读取整型配置，返回第一个可转换的值"""
+        for key in keys:
+            value = self.config.get(key)
+            if isinstance(value, (int, float, str)):
+                try:
+                    return int(value)
+                except (ValueError, OverflowError):
+                    continue
+        return default
+
+    def _get_bool_config(self, key: str, default: bool) -> bool:
+        """读取布尔型配置，类型无效时返回默认值"""
+        value = self.config.get(key, default)
+        return bool(value) if isinstance(value, (bool, int, str)) else default
+
+    def _get_float_config(self, key: str, default: float) -> float:
+        """读取浮点型配置，缺失或无效时返回默认值"""
+        try:
+            return float(self.config.get(key, default) or default)
+        except Exception:
+            return default
+
+    @property
+    def use_colors(self) -> bool:
+        """是否输出颜色"""
+        return self._use_colors
+
+    @use_colors.setter
+    def use_colors(self, value: bool) -> None:
+        self._use_colors = value
+        # 关闭颜色时将 _colorize 绑定为恒等函数，跳过方法调用内的分支
+        if value:
+            self.__dict__.pop("_colorize", None)
+        else:
+            self._colorize = _plain_text
+        # 重新生成预着色的固定文本
+        for attr, (text, color) in _STATIC_MESSAGES.items():
+            setattr(self, attr, self._colorize(text, color))
 
     def _supports_color(self) -> bool:
         """检查终端是否支持颜色输出"""
-        return (
-            hasattr(sys.stdout, "isatty")
-            and sys.stdout.isatty()
-            and os.environ.get("TERM", "").lower() != "dumb"
-        )
+        return _terminal_supports_color()
 
     def _colorize(self, text: str, color: str) -> str:
         """为文本添加颜色（如果支持）"""
-        if not self.use_colors:
+        if not self._use_colors:
             return text
 
-        colors = {
-            "green": "\033[92m",
-            "yellow": "\033[93m",
-            "red": "\033[91m",
-            "blue": "\033[94m",
-            "cyan": "\033[96m",
-            "bold": "\033[1m",
-            "reset": "\033[0m",
-        }
+        return f"{_ANSI.get(color, '')}{text}{_ANSI_RESET}"
 
-        return f"{colors.get(color, '')}{text}{colors.get('reset', '')}"
+    def _format_metric(self, label: str, value: float) -> str:
+        """格式化带颜色分级的百分比指标，如 "Confidence: 83.1%" """
+        color = "green" if value >= 0.8 else "yellow" if value >= 0.5 else "red"
+        return f"{label}: {self._colorize(f'{value:.1%}', color)}"
 
     def display_info(self, message: str, color: str = "blue") -> None:
         """显示一条普通信息（带颜色）"""
@@ -112,21 +197,12 @@ class InteractiveManager:
         """在交互流程前优先展示置信度与相似度信息"""
         parts = []
         if confidence is not None:
-            conf_color = (
-                "green" if confidence >= 0.8 else "yellow" if confidence >= 0.5 else "red"
-            )
-            parts.append(
-                f"Confidence: {self._colorize(f'{confidence*100:.1f}%', conf_color)}"
-            )
+            parts.append(self._format_metric("Confidence", confidence))
         if similarity is not None:
-            sim_color = (
-                "green" if similarity >= 0.8 else "yellow" if similarity >= 0.5 else "red"
-            )
-            parts.append(
-                f"Similarity: {self._colorize(f'{similarity*100:.1f}%', sim_color)}"
-            )
+            parts.append(self._format_metric("Similarity", similarity))
         if parts:
-            print(" | ".join(parts))
+            sys.stdout.write(" | ".join(parts) + "\n")
+            sys.stdout.flush()
 
     def prompt_user_confirmation(
         self,
@@ -152,6 +228,21 @@ class InteractiveManager:
         self.interaction_stats["total_prompts"] += 1
         timeout = timeout or self.default_timeout
 
+        # 置信度足够高时无需询问，直接确认
+        if confidence is not None and not self.should_prompt_for_confirmation(
+            confidence
+        ):
+            self.interaction_stats["confirmed"] += 1
+            return ConfirmationResult.CONFIRMED, {
+                "command": command,
+                "source": source,
+                "confidence": confidence,
+                "similarity": similarity,
+                "timeout_used": 0,
+                "result": ConfirmationResult.CONFIRMED.value,
+                "auto": True,
+            }
+
         try:
             # 显示命令信息
             self._display_command_info(command, source, confidence, similarity)
@@ -160,9 +251,7 @@ class InteractiveManager:
             result = self._get_user_input(timeout)
 
             # 更新统计
-            self.interaction_stats[result.value] = (
-                self.interaction_stats.get(result.value, 0) + 1
-            )
+            self.interaction_stats[_RESULT_TO_STAT[result]] += 1
 
             # 返回结果和详细信息
             details = {
@@ -193,13 +282,11 @@ class InteractiveManager:
         confidence: Optional[float] = None,
         similarity: Optional[float] = None,
     ):
-        """显示命令和相关信息"""
-        print()  # 空行分隔
-
-        # 显示命令
+        """显示命令和相关信息（整块文本一次写出）"""
+        # 空行分隔，随后显示命令
         command_display = self._colorize(command, "bold")
         source_display = self._colorize(f"[{source}]", "cyan")
-        print(f"> {command_display}  {source_display}")
+        lines = ["", f"> {command_display}  {source_display}"]
 
         # 显示详细信息（如果启用且有数据）
         if self.show_detailed_info and (
@@ -208,41 +295,36 @@ class InteractiveManager:
             info_parts = []
 
             if confidence is not None:
-                conf_color = (
-                    "green"
-                    if confidence >= 0.8
-                    else "yellow" if confidence >= 0.5 else "red"
-                )
-                conf_display = self._colorize(f"{confidence:.1%}", conf_color)
-                info_parts.append(f"Confidence: {conf_display}")
+                info_parts.append(self._format_metric("Confidence", confidence))
 
             if similarity is not None:
-                sim_color = (
-                    "green"
-                    if similarity >= 0.8
-                    else "yellow" if similarity >= 0.5 else "red"
-                )
-                sim_display = self._colorize(f"{similarity:.1%}", sim_color)
-                info_parts.append(f"Similarity: {sim_display}")
+                info_parts.append(self._format_metric("Similarity", similarity))
 
             if info_parts:
-                info_text = "  " + " | ".join(info_parts)
-                print(info_text)
+                lines.append("  " + " | ".join(info_parts))
+
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
+        sys.stdout.flush()
 
     def _get_user_input(self, timeout: int) -> ConfirmationResult:
         """获取用户输入，处理超时和异常（跨平台支持）"""
 
         try:
             # 获取用户输入（跨平台超时）
-            prompt = self._colorize("Copy to clipboard? [Y/n]: ", "blue")
-            response = universal_input.input_with_timeout(prompt, timeout).strip().lower()
+            read_input = (
+                universal_input.read_key_with_timeout
+                if self.single_key_confirm
+                else universal_input.input_with_timeout
+            )
+            response = read_input(self._prompt_str, timeout).strip().casefold()
             
             # 解析响应
             return self._parse_response(response)
 
         except (KeyboardInterrupt, EOFError):
             # Ctrl+C 或 Ctrl+D
-            print(self._colorize("\n✗ Cancelled", "red"))
+            print(self._cancelled_str)
             return ConfirmationResult.CANCELLED
 
         except InputTimeoutError:
@@ -266,14 +348,9 @@ class InteractiveManager:
 
     def _parse_response(self, response: str) -> ConfirmationResult:
         """解析用户响应"""
-        # 确认的响应
-        yes_responses = ["", "y", "yes", "ok", "sure", "是", "好", "确认", "1", "true"]
-        # 拒绝的响应
-        no_responses = ["n", "no", "nope", "cancel", "否", "不", "取消", "0", "false"]
-
-        if response in yes_responses:
+        if response in _YES_RESPONSES:
             return ConfirmationResult.CONFIRMED
-        elif response in no_responses:
+        elif response in _NO_RESPONSES:
             return ConfirmationResult.REJECTED
         else:
             # 未识别的响应，默认为确认
@@ -286,17 +363,11 @@ class InteractiveManager:
 
     def display_success_message(self, command: str, copied: bool = True):
         """显示成功消息"""
-        if copied:
-            message = self._colorize("✓ Copied to clipboard!", "green")
-        else:
-            message = self._colorize("✓ Command ready", "green")
-
-        print(message)
+        print(self._success_copied_str if copied else self._success_ready_str)
 
     def display_rejection_message(self, alternative_action: Optional[str] = None):
         """显示拒绝消息"""
-        message = self._colorize("✗ Not copied", "red")
-        print(message)
+        print(self._rejected_str)
 
         if alternative_action:
             alt_message = self._colorize(f"  {alternative_action}", "yellow")
@@ -311,12 +382,16 @@ class InteractiveManager:
             prompt = f"{message} {default_text}: "
 
             try:
-                response = universal_input.input_with_timeout(prompt, timeout).strip().lower()
+                response = (
+                    universal_input.input_with_timeout(prompt, timeout)
+                    .strip()
+                    .casefold()
+                )
 
                 if not response:
                     return default
 
-                return response in ["y", "yes", "是", "好"]
+                return response in _QUICK_YES_RESPONSES
 
             except (KeyboardInterrupt, EOFError, InputTimeoutError):
                 return default
@@ -342,58 +417,30 @@ Interactive Mode Help:
 
     def get_interaction_stats(self) -> Dict[str, Any]:
         """获取交互统计信息"""
-        total = int(self.interaction_stats.get("total_prompts", 0))
-        if total == 0:
+        total = self.interaction_stats["total_prompts"]
+        if not total:
             return {"message": "No interactions yet"}
 
         status_dict: Dict[str, Any] = dict(self.interaction_stats)
 
-        # 计算百分比
-        for key in ["confirmed", "rejected", "timeouts", "cancelled", "errors"]:
-            count = int(status_dict.get(key, 0))
-            percentage = round((count / total) * 100.0, 1)
-            status_dict[f"{key}_percentage"] = float(percentage)
+        # 计算百分比（倒数只算一次）
+        scale = 100.0 / total
+        for key in _RESULT_TO_STAT.values():
+            status_dict[f"{key}_percentage"] = round(status_dict[key] * scale, 1)
 
         return status_dict
 
     def reset_stats(self):
         """重置交互统计"""
-        for key in self.interaction_stats:
-            self.interaction_stats[key] = 0
+        self.interaction_stats = dict(_ZERO_STATS)
 
     def is_interactive_mode_enabled(self) -> bool:
         """检查是否启用交互模式"""
         return bool(self.config.get("interactive_mode", False) or False)
 
     def should_prompt_for_confirmation(self, confidence: float) -> bool:
-        """根据置信度判断是否需要用户确认"""
-        try:
-            confidence_threshold = float(self.config.get("confidence_threshold", 0.8) or 0.8)
-        except Exception:
-            confidence_threshold = 0.8
-        try:
-            auto_copy_threshold = float(self.config.get("auto_copy_threshold", 0.9) or 0.9)
-        except Exception:
-            auto_copy_threshold = 0.9
-        try:
-            manual_confirmation_threshold = float(self.config.get("manual_confirmation_threshold", 0.8) or 0.8)
-        except Exception:
-            manual_confirmation_threshold = 0.8
-
-        # 置信度很高，不需要确认
-        if confidence >= auto_copy_threshold:
-            return False
-
-        # 置信度高于手动确认阈值，需要确认
-        if confidence >= manual_confirmation_threshold:
-            return True
-
-        # 置信度中等，需要确认
-        if confidence >= confidence_threshold:
-            return True
-
-        # 置信度较低，需要确认
-        return True
+        """根据置信度判断是否需要用户确认：只有达到自动复制阈值时才免于确认"""
+        return confidence < self._auto_copy_threshold
 
 
 def create_simple_prompt_function(config_manager: Optional[ConfigManager] = None):
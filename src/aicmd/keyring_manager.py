@@ -4,11 +4,25 @@ Keyring Manager - 安全存储和管理 API Keys
 """
 
 import os
-import keyring
-from typing import Optional
+import time
+from typing import Dict, Optional, Tuple
 from .logger import logger
 
 
+def _keyring():
+    """延迟导入 keyring：首次导入会加载各平台后端，不使用 API Key 的命令无需承担该开销"""
+    import keyring
+
+    return keyring
+
+
+def __getattr__(name):
+    # 兼容通过 aicmd.keyring_manager.keyring 访问 keyring 模块的调用方
+    if name == "keyring":
+        return _keyring()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class KeyringManager:
     """Keyring 管理器，负责安全存储和检索 API Keys"""
 
@@ -17,6 +31,25 @@ class KeyringManager:
     _BASE_SERVICE_NAME = "com.aicmd.ww"
     SERVICE_NAME = os.getenv("AICMD_KEYRING_SERVICE", _BASE_SERVICE_NAME)
 
+    # 已知的提供商列表（keyring 无法枚举密钥，只能逐个检查）
+    KNOWN_PROVIDERS: Tuple[str, ...] = (
+        "openrouter",
+        "openai",
+        "deepseek",
+        "xai",
+        "gemini",
+        "qwen",
+    )
+
+    # get_api_key 结果缓存：provider -> (读取时间, API 密钥)，避免重复访问系统钥匙串
+    _cache: Dict[str, Tuple[float, Optional[str]]] = {}
+    _CACHE_TTL = 5.0
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """清空 API Key 缓存"""
+        cls._cache.clear()
+
     @classmethod
     def set_api_key(cls, provider: str, api_key: str) -> bool:
         """
@@ -30,17 +63,18 @@ class KeyringManager:
             bool: 是否成功设置
         """
         try:
-            keyring.set_password(cls.SERVICE_NAME, provider, api_key)
-            logger.info(f"API key set successfully for provider: {provider}")
+            _keyring().set_password(cls.SERVICE_NAME, provider, api_key)
+            cls._cache.pop(provider, None)
+            logger.info("API key set successfully for provider: %s", provider)
             return True
         except Exception as e:
-            logger.error(f"Failed to set API key for {provider}: {e}")
+            logger.error("Failed to set API key for %s: %s", provider, e)
             return False
 
     @classmethod
     def get_api_key(cls, provider: str) -> Optional[str]:
         """
-        获取指定提供商的 API Key
+        获取指定提供商的 API Key（结果缓存 _CACHE_TTL 秒）
 
         Args:
             provider: 提供商名称
@@ -48,11 +82,16 @@ class KeyringManager:
         Returns:
             Optional[str]: API 密钥，如果不存在则返回 None
         """
+        entry = cls._cache.get(provider)
+        if entry is not None and time.monotonic() - entry[0] < cls._CACHE_TTL:
+            return entry[1]
+
         try:
-            api_key = keyring.get_password(cls.SERVICE_NAME, provider)
+            api_key = _keyring().get_password(cls.SERVICE_NAME, provider)
+            cls._cache[provider] = (time.monotonic(), api_key)
             return api_key
         except Exception as e:
-            logger.error(f"Failed to get API key for {provider}: {e}")
+            logger.error("Failed to get API key for %s: %s", provider, e)
             return None
 
     @classmethod
@@ -66,15 +105,17 @@ class KeyringManager:
         Returns:
             bool: 是否成功删除
         """
+        keyring = _keyring()
         try:
             keyring.delete_password(cls.SERVICE_NAME, provider)
-            logger.info(f"API key deleted for provider: {provider}")
+            cls._cache.pop(provider, None)
+            logger.info("API key deleted for provider: %s", provider)
             return True
         except keyring.errors.PasswordDeleteError:
-            logger.warning(f"No API key found to delete for provider: {provider}")
+            logger.warning("No API key found to delete for provider: %s", provider)
             return False
         except Exception as e:
-            logger.error(f"Failed to delete API key for {provider}: {e}")
+            logger.error("Failed to delete API key for %s: %s", provider, e)
             return False
 
     @classmethod
@@ -88,15 +129,29 @@ class KeyringManager:
         Returns:
             list: 已设置 API Key 的提供商列表
         """
-        # 已知的提供商列表
-        known_providers = ["openrouter", "openai", "deepseek", "xai", "gemini", "qwen"]
-
-        providers_with_keys = []
-        for provider in known_providers:
-            if cls.get_api_key(provider):
-                providers_with_keys.append(provider)
-
-        return providers_with_keys
+        known_providers = cls.KNOWN_PROVIDERS
+
+        # 缓存未命中的提供商并发查询，重叠各次钥匙串 IPC 的等待时间
+        now = time.monotonic()
+        uncached = [
+            provider
+            for provider in known_providers
+            if provider not in cls._cache
+            or now - cls._cache[provider][0] >= cls._CACHE_TTL
+        ]
+        if len(uncached) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=len(uncached)) as executor:
+                fetched = dict(zip(uncached, executor.map(cls.get_api_key, uncached)))
+        else:
+            fetched = {}
+
+        return [
+            provider
+            for provider in known_providers
+            if (fetched[provider] if provider in fetched else cls.get_api_key(provider))
+        ]
 
     @classmethod
     def has_api_key(cls, provider: str) -> bool:
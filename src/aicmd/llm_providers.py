@@ -3,9 +3,14 @@ LLM Provider abstraction and implementations
 支持多个大语言模型提供商的抽象接口和具体实现
 """
 
-import requests
+import hashlib
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache, reduce
+from operator import getitem
+from typing import Optional, Dict, Any, List, ClassVar, Tuple, TYPE_CHECKING
 from .logger import logger
 from .api_client import (
     APIClientError,
@@ -16,29 +21,121 @@ from .api_client import (
 from .keyring_manager import KeyringManager
 from .prompts import get_system_prompt
 
+try:  # 可选依赖：orjson 解析大段响应文本更快
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - 未安装时回退到 requests 自带的解析
+    _orjson = None
+
+if TYPE_CHECKING:
+    import requests
+
+
+def _requests():
+    """延迟导入 requests：其依赖链导入耗时明显，命中缓存或无需联网的命令不必承担"""
+    import requests
+
+    return requests
+
+
+def __getattr__(name):
+    # 兼容通过 aicmd.llm_providers.requests 访问 requests 模块的调用方
+    if name == "requests":
+        return _requests()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# 每个提供商实例保留的响应缓存条目上限（LRU 淘汰）
+_RESPONSE_CACHE_SIZE = 512
+
+# send_chat_batch 默认的最大并发请求数
+_BATCH_MAX_WORKERS = 8
+
+# 有固定异常类型与提示的错误状态码
+_STATUS_ERRORS = {
+    401: (APIAuthError, "API key authentication failed"),
+    429: (APIRateLimitError, "API rate limit exceeded"),
+}
+
+# 所有请求共用的系统消息（导入时构建一次，各请求载荷只引用不修改）
+_SYSTEM_MESSAGE = {"role": "system", "content": get_system_prompt("default")}
+
+# Gemini 把系统提示词拼接在用户输入之前
+_GEMINI_PROMPT_PREFIX = f"{get_system_prompt('default')}\n\nUser: "
+
+
+@lru_cache(maxsize=None)
+def _shared_http_adapter(max_retries: int):
+    """
+    构建带重试策略的 HTTPAdapter（按重试次数缓存，所有提供商会话共享）
+
+    共享适配器同时共享其连接池，指向同一主机的提供商可以复用连接
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry_strategy = Retry(
+        total=max_retries,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"],
+    )
+    return HTTPAdapter(max_retries=retry_strategy)
+
 
 class LLMProvider(ABC):
     """大语言模型提供商抽象基类"""
 
+    # 子类同样声明空的 __slots__，实例不再创建 __dict__
+    __slots__ = (
+        "config",
+        "_session",
+        "_response_cache",
+        "_inflight",
+        "_cache_lock",
+    )
+
+    # 子类声明：keyring 中的提供商名、默认模型、默认接口地址
+    PROVIDER_NAME: ClassVar[str] = ""
+    DEFAULT_MODEL: ClassVar[str] = ""
+    DEFAULT_BASE_URL: ClassVar[str] = ""
+    # 响应 JSON 中命令文本所在的路径（依次取下标）
+    RESPONSE_PATH: ClassVar[Tuple[Any, ...]] = ()
+
     def __init__(self, config: Dict[str, Any] = None):
         """初始化提供商"""
         self.config = config or {}
         self._session = None
+        self._response_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._cache_lock = threading.RLock()
+
+    def get_provider_name(self) -> str:
+        """获取 keyring 中的提供商名称"""
+        return self.PROVIDER_NAME
+
+    def get_default_model(self) -> str:
+        """获取默认模型名称"""
+        return self.DEFAULT_MODEL
+
+    def get_default_base_url(self) -> str:
+        """获取默认API地址"""
+        return self.DEFAULT_BASE_URL
 
-    @abstractmethod
     def get_api_key(self) -> str:
-        """获取API密钥"""
-        pass
+        """获取API密钥（从 keyring 获取，配置文件中的 api_key 不再使用）"""
+        return KeyringManager.get_api_key(self.PROVIDER_NAME) or ""
 
-    @abstractmethod
     def get_model(self) -> str:
-        """获取模型名称"""
-        pass
+        """获取模型名称，优先使用配置"""
+        return self.config.get("model", self.DEFAULT_MODEL)
 
-    @abstractmethod
     def get_base_url(self) -> str:
-        """获取API基础URL"""
-        pass
+        """获取API基础URL，优先使用配置"""
+        return self.config.get("base_url") or self.DEFAULT_BASE_URL
+
+    def _endpoint(self, base_url: Optional[str] = None) -> str:
+        """获取请求地址；base_url 与配置项 base_url 含义相同，仅对本次请求生效"""
+        return base_url or self.get_base_url()
 
     @abstractmethod
     def build_request_payload(
@@ -47,45 +144,116 @@ class LLMProvider(ABC):
         """构建请求载荷"""
         pass
 
-    @abstractmethod
-    def parse_response(self, response: requests.Response) -> str:
-        """解析API响应"""
-        pass
+    def parse_response(self, response: "requests.Response") -> str:
+        """解析API响应：按 RESPONSE_PATH 逐级取出命令文本"""
+        try:
+            return reduce(getitem, self.RESPONSE_PATH, self._json(response)).strip()
+        except (KeyError, IndexError, ValueError) as e:
+            raise APIClientError(f"Invalid API response format: {e}")
 
-    def get_headers(self) -> Dict[str, str]:
-        """获取请求头，子类可以重写"""
-        api_key = self.get_api_key()
+    @staticmethod
+    def _post_json(
+        session: "requests.Session",
+        url: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        timeout: int,
+    ) -> "requests.Response":
+        """POST JSON 载荷，安装了 orjson 时预先编码为字节（请求头已声明 Content-Type）"""
+        if _orjson is not None:
+            return session.post(
+                url, data=_orjson.dumps(payload), headers=headers, timeout=timeout
+            )
+        return session.post(url, json=payload, headers=headers, timeout=timeout)
+
+    @staticmethod
+    def _json(response: "requests.Response") -> Any:
+        """解析响应 JSON，安装了 orjson 时直接解析原始字节"""
+        if _orjson is not None:
+            return _orjson.loads(response.content)
+        return response.json()
+
+    def get_headers(self, api_key: Optional[str] = None) -> Dict[str, str]:
+        """获取请求头，子类可以重写；传入已获取的 api_key 可省去重复的 keyring 查询"""
+        if api_key is None:
+            api_key = self.get_api_key()
         return {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
 
-    def _get_session(self, max_retries: int = 3) -> requests.Session:
+    def _get_session(self, max_retries: int = 3) -> "requests.Session":
         """获取或创建HTTP会话"""
         if self._session is None:
-            self._session = requests.Session()
+            self._session = _requests().Session()
             try:
-                from requests.adapters import HTTPAdapter
-                from urllib3.util.retry import Retry
-
-                retry_strategy = Retry(
-                    total=max_retries,
-                    backoff_factor=0.5,
-                    status_forcelist=[429, 500, 502, 503, 504],
-                    allowed_methods=["POST"],
-                )
-                adapter = HTTPAdapter(max_retries=retry_strategy)
+                adapter = _shared_http_adapter(max_retries)
                 self._session.mount("https://", adapter)
                 self._session.mount("http://", adapter)
             except Exception as e:
-                logger.warning(f"Failed to setup retry strategy: {e}")
+                logger.warning("Failed to setup retry strategy: %s", e)
 
         return self._session
 
+    def _response_cache_key(
+        self, prompt: str, model: Optional[str], endpoint: Optional[str] = None
+    ) -> str:
+        """根据提供商、模型、地址和提示词计算响应缓存键"""
+        raw = "\0".join(
+            (
+                self.__class__.__name__,
+                model or "",
+                endpoint or self.get_base_url(),
+                prompt,
+            )
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _get_cached_response(self, key: str) -> Optional[str]:
+        """读取缓存的响应，命中时刷新其 LRU 位置"""
+        with self._cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                self._response_cache.move_to_end(key)
+            return cached
+
+    def _store_cached_response(self, key: str, text: str) -> None:
+        """保存成功的响应，超出上限时淘汰最久未使用的条目"""
+        with self._cache_lock:
+            self._response_cache[key] = text
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+
+    def clear_response_cache(self) -> None:
+        """清空响应缓存"""
+        with self._cache_lock:
+            self._response_cache.clear()
+
+    def _handle_response(self, response: "requests.Response", cache_key: str) -> str:
+        """按状态码解析响应或抛出对应异常，成功结果写入响应缓存"""
+        status = response.status_code
+        if status == 200:
+            text = self.parse_response(response)
+            self._store_cached_response(cache_key, text)
+            return text
+
+        error = _STATUS_ERRORS.get(status)
+        if error is not None:
+            error_cls, message = error
+            raise error_cls(message)
+        if status >= 500:
+            raise APIClientError(f"API server error: {status}")
+        raise APIClientError(f"API request failed: {status} - {response.text}")
+
     def send_chat(
-        self, prompt: str, model: Optional[str] = None, timeout: int = 30
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        timeout: int = 30,
+        base_url: Optional[str] = None,
     ) -> str:
-        """发送聊天请求"""
+        """发送聊天请求；base_url 仅覆盖本次请求的地址，不修改配置"""
         api_key = self.get_api_key()
         if not api_key:
             raise APIAuthError(f"API key not found for {self.__class__.__name__}")
@@ -94,31 +262,92 @@ class LLMProvider(ABC):
         if not model:
             raise APIClientError(f"Model not specified for {self.__class__.__name__}")
 
+        endpoint = self._endpoint(base_url)
+        cache_key = self._response_cache_key(prompt, model, endpoint)
+        return self._single_flight(
+            cache_key,
+            lambda: self._request(endpoint, prompt, model, api_key, timeout, cache_key),
+        )
+
+    def _request(
+        self,
+        url: str,
+        prompt: str,
+        model: Optional[str],
+        api_key: str,
+        timeout: int,
+        cache_key: str,
+    ) -> str:
+        """构建载荷并发送请求，返回解析后的响应文本"""
         session = self._get_session()
-        headers = self.get_headers()
+        headers = self.get_headers(api_key)
         payload = self.build_request_payload(prompt, model)
 
         try:
-            response = session.post(
-                self.get_base_url(), json=payload, headers=headers, timeout=timeout
-            )
+            response = self._post_json(session, url, payload, headers, timeout)
 
-            if response.status_code == 200:
-                return self.parse_response(response)
-            elif response.status_code == 401:
-                raise APIAuthError("API key authentication failed")
-            elif response.status_code == 429:
-                raise APIRateLimitError("API rate limit exceeded")
-            elif response.status_code >= 500:
-                raise APIClientError(f"API server error: {response.status_code}")
-            else:
-                raise APIClientError(
-                    f"API request failed: {response.status_code} - {response.text}"
-                )
-
-        except requests.exceptions.Timeout:
+            return self._handle_response(response, cache_key)
+        except _requests().exceptions.Timeout:
             raise APITimeoutError(f"API request timed out after {timeout}s")
 
+    def _single_flight(self, cache_key: str, fetch) -> str:
+        """
+        命中缓存时直接返回；相同请求正在进行时等待其结果，否则调用 fetch 发起请求
+        """
+        with self._cache_lock:
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached
+            future = self._inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = self._inflight[cache_key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            text = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(text)
+            return text
+        finally:
+            with self._cache_lock:
+                self._inflight.pop(cache_key, None)
+
+    def send_chat_batch(
+        self,
+        prompts: List[str],
+        model: Optional[str] = None,
+        timeout: int = 30,
+        max_workers: int = _BATCH_MAX_WORKERS,
+    ) -> List[str]:
+        """
+        并发发送多个聊天请求，结果顺序与 prompts 一致
+
+        重复的提示词只请求一次；任一请求失败时抛出其异常
+        """
+        unique_prompts = list(dict.fromkeys(prompts))
+        if not unique_prompts:
+            return []
+
+        # 先在当前线程创建会话，避免工作线程并发初始化
+        self._get_session()
+        workers = max(1, min(max_workers, len(unique_prompts)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(
+                zip(
+                    unique_prompts,
+                    executor.map(
+                        lambda p: self.send_chat(p, model, timeout), unique_prompts
+                    ),
+                )
+            )
+        return [results[p] for p in prompts]
+
     def close(self):
         """关闭HTTP会话"""
         if self._session:
@@ -135,34 +364,13 @@ class OpenAICompatibleProvider(LLMProvider):
     - OpenAI
     - DeepSeek
     - xAI (Grok)
+
+    Subclasses only declare PROVIDER_NAME, DEFAULT_MODEL and DEFAULT_BASE_URL.
     """
-    
-    @abstractmethod
-    def get_provider_name(self) -> str:
-        """Return the provider name for keyring lookup"""
-        pass
-    
-    @abstractmethod
-    def get_default_model(self) -> str:
-        """Return the default model name"""
-        pass
-    
-    @abstractmethod
-    def get_default_base_url(self) -> str:
-        """Return the default base URL"""
-        pass
-    
-    def get_api_key(self) -> str:
-        """Get API key from keyring"""
-        return KeyringManager.get_api_key(self.get_provider_name()) or ""
-    
-    def get_model(self) -> str:
-        """Get model from config or use default"""
-        return self.config.get("model", self.get_default_model())
-    
-    def get_base_url(self) -> str:
-        """Get base URL from config or use default"""
-        return self.config.get("base_url") or self.get_default_base_url()
+
+    __slots__ = ()
+
+    RESPONSE_PATH = ("choices", 0, "message", "content")
     
     def build_request_payload(
         self, prompt: str, model: Optional[str] = None
@@ -171,94 +379,70 @@ class OpenAICompatibleProvider(LLMProvider):
         return {
             "model": model or self.get_model(),
             "messages": [
-                {
-                    "role": "system",
-                    "content": get_system_prompt("default"),
-                },
+                _SYSTEM_MESSAGE,
                 {"role": "user", "content": prompt},
             ],
         }
-    
-    def parse_response(self, response: requests.Response) -> str:
-        """Parse standard OpenAI-format response"""
-        try:
-            result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
-        except (KeyError, IndexError, ValueError) as e:
-            raise APIClientError(f"Invalid API response format: {e}")
 
 
 class OpenRouterProvider(OpenAICompatibleProvider):
     """OpenRouter 提供商实现"""
-    
-    def get_provider_name(self) -> str:
-        return "openrouter"
-    
-    def get_default_model(self) -> str:
-        return ""
-    
-    def get_default_base_url(self) -> str:
-        return "https://openrouter.ai/api/v1/chat/completions"
+
+    __slots__ = ()
+
+    PROVIDER_NAME = "openrouter"
+    DEFAULT_BASE_URL = "https://openrouter.ai/api/v1/chat/completions"
 
 
 class OpenAIProvider(OpenAICompatibleProvider):
     """OpenAI 提供商实现"""
-    
-    def get_provider_name(self) -> str:
-        return "openai"
-    
-    def get_default_model(self) -> str:
-        return "gpt-3.5-turbo"
-    
-    def get_default_base_url(self) -> str:
-        return "https://api.openai.com/v1/chat/completions"
+
+    __slots__ = ()
+
+    PROVIDER_NAME = "openai"
+    DEFAULT_MODEL = "gpt-3.5-turbo"
+    DEFAULT_BASE_URL = "https://api.openai.com/v1/chat/completions"
 
 
 class DeepSeekProvider(OpenAICompatibleProvider):
     """DeepSeek 提供商实现"""
-    
-    def get_provider_name(self) -> str:
-        return "deepseek"
-    
-    def get_default_model(self) -> str:
-        return "deepseek-chat"
-    
-    def get_default_base_url(self) -> str:
-        return "https://api.deepseek.com/v1/chat/completions"
+
+    __slots__ = ()
+
+    PROVIDER_NAME = "deepseek"
+    DEFAULT_MODEL = "deepseek-chat"
+    DEFAULT_BASE_URL = "https://api.deepseek.com/v1/chat/completions"
 
 
 class XAIProvider(OpenAICompatibleProvider):
     """xAI (Grok) 提供商实现"""
-    
-    def get_provider_name(self) -> str:
-        return "xai"
-    
-    def get_default_model(self) -> str:
-        return "grok-beta"
-    
-    def get_default_base_url(self) -> str:
-        return "https://api.x.ai/v1/chat/completions"
+
+    __slots__ = ()
+
+    PROVIDER_NAME = "xai"
+    DEFAULT_MODEL = "grok-beta"
+    DEFAULT_BASE_URL = "https://api.x.ai/v1/chat/completions"
 
 
 class GeminiProvider(LLMProvider):
     """Google Gemini 提供商实现"""
 
-    def get_api_key(self) -> str:
-        # 从 keyring 获取 API key，配置文件中的 api_key 不再使用
-        return KeyringManager.get_api_key("gemini") or ""
+    __slots__ = ()
 
-    def get_model(self) -> str:
-        return self.config.get("model", "gemini-pro")
+    PROVIDER_NAME = "gemini"
+    DEFAULT_MODEL = "gemini-pro"
+    DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+    RESPONSE_PATH = ("candidates", 0, "content", "parts", 0, "text")
 
     def get_base_url(self) -> str:
-        base_url = (
-            self.config.get("base_url")
-            or "https://generativelanguage.googleapis.com/v1beta/models"
-        )
-        model = self.get_model()
-        return f"{base_url}/{model}:generateContent"
+        return self._endpoint(super().get_base_url())
 
-    def get_headers(self) -> Dict[str, str]:
+    def _endpoint(self, base_url: Optional[str] = None) -> str:
+        if not base_url:
+            return self.get_base_url()
+        return f"{base_url}/{self.get_model()}:generateContent"
+
+    def get_headers(self, api_key: Optional[str] = None) -> Dict[str, str]:
         """Gemini使用查询参数而不是Authorization头"""
         return {
             "Content-Type": "application/json",
@@ -267,73 +451,50 @@ class GeminiProvider(LLMProvider):
     def build_request_payload(
         self, prompt: str, model: Optional[str] = None
     ) -> Dict[str, Any]:
-        system_prompt = get_system_prompt("default")
-
-        return {
-            "contents": [{"parts": [{"text": f"{system_prompt}\n\nUser: {prompt}"}]}]
-        }
+        return {"contents": [{"parts": [{"text": _GEMINI_PROMPT_PREFIX + prompt}]}]}
 
     def send_chat(
-        self, prompt: str, model: Optional[str] = None, timeout: int = 30
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        timeout: int = 30,
+        base_url: Optional[str] = None,
     ) -> str:
         """重写发送方法以支持Gemini的API密钥传递方式"""
         api_key = self.get_api_key()
         if not api_key:
             raise APIAuthError(f"API key not found for {self.__class__.__name__}")
 
-        session = self._get_session()
-        headers = self.get_headers()
-        payload = self.build_request_payload(prompt, model)
+        endpoint = self._endpoint(base_url)
+        cache_key = self._response_cache_key(
+            prompt, model or self.get_model(), endpoint
+        )
 
         # Gemini使用查询参数传递API密钥
-        url = f"{self.get_base_url()}?key={api_key}"
+        url = f"{endpoint}?key={api_key}"
 
-        try:
-            response = session.post(url, json=payload, headers=headers, timeout=timeout)
-
-            if response.status_code == 200:
-                return self.parse_response(response)
-            elif response.status_code == 401:
-                raise APIAuthError("API key authentication failed")
-            elif response.status_code == 429:
-                raise APIRateLimitError("API rate limit exceeded")
-            elif response.status_code >= 500:
-                raise APIClientError(f"API server error: {response.status_code}")
-            else:
-                raise APIClientError(
-                    f"API request failed: {response.status_code} - {response.text}"
-                )
-
-        except requests.exceptions.Timeout:
-            raise APITimeoutError(f"API request timed out after {timeout}s")
-
-    def parse_response(self, response: requests.Response) -> str:
-        try:
-            result = response.json()
-            return result["candidates"][0]["content"]["parts"][0]["text"].strip()
-        except (KeyError, IndexError, ValueError) as e:
-            raise APIClientError(f"Invalid API response format: {e}")
+        return self._single_flight(
+            cache_key,
+            lambda: self._request(url, prompt, model, api_key, timeout, cache_key),
+        )
 
 
 class QwenProvider(LLMProvider):
     """通义千问 Qwen 提供商实现"""
 
-    def get_api_key(self) -> str:
-        # 从 keyring 获取 API key，配置文件中的 api_key 不再使用
-        return KeyringManager.get_api_key("qwen") or ""
+    __slots__ = ()
 
-    def get_model(self) -> str:
-        return self.config.get("model", "qwen-turbo")
+    PROVIDER_NAME = "qwen"
+    DEFAULT_MODEL = "qwen-turbo"
+    DEFAULT_BASE_URL = (
+        "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation"
+    )
+    RESPONSE_PATH = ("output", "choices", 0, "message", "content")
 
-    def get_base_url(self) -> str:
-        return (
-            self.config.get("base_url")
-            or "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation"
-        )
-
-    def get_headers(self) -> Dict[str, str]:
+    def get_headers(self, api_key: Optional[str] = None) -> Dict[str, str]:
         """千问使用X-DashScope-SSE和Authorization头"""
-        api_key = self.get_api_key()
+        if api_key is None:
+            api_key = self.get_api_key()
         return {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
@@ -347,18 +508,8 @@ class QwenProvider(LLMProvider):
             "model": model or self.get_model(),
             "input": {
                 "messages": [
-                    {
-                        "role": "system",
-                        "content": get_system_prompt("default"),
-                    },
+                    _SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt},
                 ]
             },
         }
-
-    def parse_response(self, response: requests.Response) -> str:
-        try:
-            result = response.json()
-            return result["output"]["choices"][0]["message"]["content"].strip()
-        except (KeyError, IndexError, ValueError) as e:
-            raise APIClientError(f"Invalid API response format: {e}")
@@ -3,7 +3,8 @@ API Router - 负责路由到不同的LLM提供商
 Manages routing to different LLM providers based on configuration
 """
 
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Tuple
 from .llm_providers import (
     LLMProvider,
     OpenRouterProvider,
@@ -22,15 +23,15 @@ from .api_client import APIClientError, APIAuthError
 class LLMRouter:
     """LLM路由器，负责管理和路由到不同的LLM提供商"""
     
-    # 支持的提供商映射
-    PROVIDERS = {
+    # 支持的提供商映射（只读）
+    PROVIDERS = MappingProxyType({
         "openrouter": OpenRouterProvider,
         "openai": OpenAIProvider,
         "deepseek": DeepSeekProvider,
         "xai": XAIProvider,
         "gemini": GeminiProvider,
         "qwen": QwenProvider,
-    }
+    })
     
     def __init__(
         self,
@@ -41,60 +42,100 @@ class LLMRouter:
         self.config = config_manager or ConfigManager()
         self.degradation_manager = degradation_manager or GracefulDegradationManager()
         self._providers: Dict[str, LLMProvider] = {}
+        # 按配置修订号缓存的派生值：(revision, value)
+        self._default_provider_cache: Optional[Tuple[int, str]] = None
+        self._providers_config_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+    
+    def invalidate(self):
+        """清除从配置派生的缓存，下次访问时重新读取"""
+        self._default_provider_cache = None
+        self._providers_config_cache = None
     
     def _get_default_provider(self) -> str:
         """获取默认提供商名称，优先从配置读取，否则使用openrouter"""
+        revision = getattr(self.config, "revision", 0)
+        cached = self._default_provider_cache
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+        
         provider_name = self.config.get("default_provider", "")
         
         # 如果配置中没有指定默认提供商或为空字符串，使用openrouter
         if not provider_name:
             provider_name = "openrouter"
         
-        return provider_name.lower()
+        provider_name = provider_name.lower()
+        self._default_provider_cache = (revision, provider_name)
+        return provider_name
     
     def _get_provider_config(self, provider_name: str) -> Dict[str, Any]:
         """获取指定提供商的配置"""
-        # 从配置中获取提供商特定配置
-        providers_config = self.config.get("providers", {})
+        revision = getattr(self.config, "revision", 0)
+        cached = self._providers_config_cache
+        if cached is not None and cached[0] == revision:
+            providers_config = cached[1]
+        else:
+            # 从配置中获取提供商特定配置
+            providers_config = self.config.get("providers", {})
+            self._providers_config_cache = (revision, providers_config)
         return providers_config.get(provider_name, {})
     
     def _create_provider(self, provider_name: str) -> LLMProvider:
         """创建指定的提供商实例"""
-        if provider_name not in self.PROVIDERS:
+        provider_class = self.PROVIDERS.get(provider_name)
+        if provider_class is None:
             raise APIClientError(f"Unsupported provider: {provider_name}")
         
-        provider_class = self.PROVIDERS[provider_name]
         provider_config = self._get_provider_config(provider_name)
         
         return provider_class(provider_config)
     
     def _get_provider(self, provider_name: Optional[str] = None) -> LLMProvider:
         """获取提供商实例，如果不存在则创建"""
-        if provider_name is None:
+        # 默认提供商名称已是小写，只有调用方传入的名称需要转换
+        if provider_name:
+            provider_name = provider_name.lower()
+        else:
             provider_name = self._get_default_provider()
         
-        provider_name = provider_name.lower()
-        
-        if provider_name not in self._providers:
-            self._providers[provider_name] = self._create_provider(provider_name)
-        
-        return self._providers[provider_name]
+        provider = self._providers.get(provider_name)
+        if provider is None:
+            provider = self._providers[provider_name] = self._create_provider(
+                provider_name
+            )
+        return provider
     
     def send_chat(
         self, 
         prompt: str, 
         provider_name: Optional[str] = None,
         model: Optional[str] = None,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        base_url: Optional[str] = None
     ) -> str:
-        """发送聊天请求到指定或默认提供商"""
+        """发送聊天请求到指定或默认提供商；base_url 仅覆盖本次请求的地址"""
         provider = self._get_provider(provider_name)
         
         # 使用配置中的超时时间如果没有指定
         if timeout is None:
             timeout = self.config.get("api_timeout_seconds", 30)
         
-        return provider.send_chat(prompt, model, timeout)
+        return provider.send_chat(prompt, model, timeout, base_url=base_url)
+    
+    def send_chat_batch(
+        self,
+        prompts: List[str],
+        provider_name: Optional[str] = None,
+        model: Optional[str] = None,
+        timeout: Optional[int] = None
+    ) -> List[str]:
+        """批量发送聊天请求到指定或默认提供商，结果顺序与 prompts 一致"""
+        provider = self._get_provider(provider_name)
+        
+        if timeout is None:
+            timeout = self.config.get("api_timeout_seconds", 30)
+        
+        return provider.send_chat_batch(prompts, model, timeout)
     
     def send_chat_with_fallback(
         self, 
@@ -111,10 +152,14 @@ class LLMRouter:
                 # 如果指定了提供商且失败，尝试回退到默认提供商
                 if provider_name and provider_name.lower() != self._get_default_provider():
                     try:
-                        logger.warning(f"Provider {provider_name} failed ({e}), trying default provider")
+                        logger.warning(
+                            "Provider %s failed (%s), trying default provider",
+                            provider_name,
+                            e,
+                        )
                         return self.send_chat(prompt)  # 使用默认提供商
                     except Exception as backup_e:
-                        logger.error(f"Default provider also failed: {backup_e}")
+                        logger.error("Default provider also failed: %s", backup_e)
                         return f"Error: {backup_e}"
                 else:
                     return f"Error: {e}"
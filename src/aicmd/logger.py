@@ -173,9 +173,33 @@ class JSONFormatter(logging.Formatter):
         return json.dumps(log_data, ensure_ascii=False)
 
 
+class _LazyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """首次写入时才创建日志目录并打开文件的轮转处理器"""
+
+    def __init__(self, filename, **kwargs):
+        kwargs.setdefault("delay", True)
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class _RequestIdFilter(logging.Filter):
+    """为未携带 request_id 的记录补上当前请求 ID"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = AICommandLogger._current_request_id
+        if request_id and not hasattr(record, "request_id"):
+            record.request_id = request_id
+        return True
+
+
 class AICommandLogger:
     """AI Command工具的增强日志管理器"""
     
+    __slots__ = ("logger", "log_dir", "max_bytes", "backup_count", "_metrics")
+
     # 类级别的请求 ID（用于跟踪）
     _current_request_id: Optional[str] = None
     
@@ -209,6 +233,12 @@ class AICommandLogger:
         
         # 清除现有handlers
         self.logger.handlers.clear()
+        # 直接调用 logging.Logger 方法的记录也能带上请求 ID
+        for existing in [
+            f for f in self.logger.filters if isinstance(f, _RequestIdFilter)
+        ]:
+            self.logger.removeFilter(existing)
+        self.logger.addFilter(_RequestIdFilter())
         
         # 按优先级解析日志配置
         resolved = resolve_log_config(
@@ -220,8 +250,8 @@ class AICommandLogger:
         console_level = resolved["console_level"]
         file_level = resolved["file_level"]
         log_dir = resolved["log_dir"]
+        # 日志目录在文件处理器首次写入时才创建，避免 --help 等命令产生文件系统操作
         self.log_dir = Path(log_dir).expanduser()
-        self.log_dir.mkdir(parents=True, exist_ok=True)
         
         # 保存配置
         self.max_bytes = max_bytes
@@ -266,7 +296,7 @@ class AICommandLogger:
         log_file = self.log_dir / "aicmd.log"
         
         # 使用RotatingFileHandler支持文件轮转
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = _LazyRotatingFileHandler(
             log_file,
             maxBytes=self.max_bytes,
             backupCount=self.backup_count,
@@ -286,7 +316,7 @@ class AICommandLogger:
         """设置 JSON 格式的日志文件处理器"""
         json_log_file = self.log_dir / "aicmd.json.log"
         
-        json_handler = logging.handlers.RotatingFileHandler(
+        json_handler = _LazyRotatingFileHandler(
             json_log_file,
             maxBytes=self.max_bytes,
             backupCount=self.backup_count,
@@ -324,35 +354,35 @@ class AICommandLogger:
         finally:
             cls.clear_request_id()
     
-    def info(self, msg: str, **kwargs):
+    def info(self, msg: str, *args, **kwargs):
         """信息日志"""
         extra = self._add_request_id(kwargs.get("extra"))
-        self.logger.info(msg, extra=extra)
+        self.logger.info(msg, *args, extra=extra)
     
-    def success(self, msg: str, **kwargs):
+    def success(self, msg: str, *args, **kwargs):
         """成功日志（以INFO级别记录）"""
         extra = self._add_request_id(kwargs.get("extra"))
-        self.logger.info(f"✓ {msg}", extra=extra)
+        self.logger.info(f"✓ {msg}", *args, extra=extra)
     
-    def warning(self, msg: str, **kwargs):
+    def warning(self, msg: str, *args, **kwargs):
         """警告日志"""
         extra = self._add_request_id(kwargs.get("extra"))
-        self.logger.warning(msg, extra=extra)
+        self.logger.warning(msg, *args, extra=extra)
     
-    def error(self, msg: str, **kwargs):
+    def error(self, msg: str, *args, **kwargs):
         """错误日志"""
         extra = self._add_request_id(kwargs.get("extra"))
-        self.logger.error(msg, extra=extra)
+        self.logger.error(msg, *args, extra=extra)
     
-    def debug(self, msg: str, **kwargs):
+    def debug(self, msg: str, *args, **kwargs):
         """调试日志"""
         extra = self._add_request_id(kwargs.get("extra"))
-        self.logger.debug(msg, extra=extra)
+        self.logger.debug(msg, *args, extra=extra)
     
-    def critical(self, msg: str, **kwargs):
+    def critical(self, msg: str, *args, **kwargs):
         """严重错误日志"""
         extra = self._add_request_id(kwargs.get("extra"))
-        self.logger.critical(msg, extra=extra)
+        self.logger.critical(msg, *args, extra=extra)
     
     def print(self, msg: str):
         """普通打印（不经过日志系统）"""
@@ -522,9 +552,20 @@ class AICommandLogger:
 # 为了保持向后兼容，创建一个兼容的Logger类
 class Logger:
     """向后兼容的Logger类，内部使用AICommandLogger"""
+
+    __slots__ = ("_enhanced_logger", "info", "warning", "error", "_info")
     
     def __init__(self, use_color: bool = True):
-        self._enhanced_logger = AICommandLogger(use_color=use_color)
+        self._bind(AICommandLogger(use_color=use_color))
+
+    def _bind(self, enhanced_logger: AICommandLogger):
+        """将日志方法直接绑定到底层 logging.Logger，省去逐层转发"""
+        self._enhanced_logger = enhanced_logger
+        base = enhanced_logger.logger
+        self.info = base.info
+        self.warning = base.warning
+        self.error = base.error
+        self._info = base.info
 
     def configure(
         self,
@@ -539,7 +580,7 @@ class Logger:
         enable_json_file: bool = False
     ):
         """重新配置日志器（用于 CLI 覆盖）"""
-        self._enhanced_logger = AICommandLogger(
+        self._bind(AICommandLogger(
             log_dir=log_dir,
             use_color=use_color,
             console_level=console_level,
@@ -548,30 +589,27 @@ class Logger:
             max_bytes=max_bytes,
             backup_count=backup_count,
             enable_json_file=enable_json_file,
-        )
-    
-    def info(self, msg: str):
-        self._enhanced_logger.info(msg)
+        ))
     
-    def success(self, msg: str):
-        self._enhanced_logger.success(msg)
-    
-    def warning(self, msg: str):
-        self._enhanced_logger.warning(msg)
-    
-    def error(self, msg: str):
-        self._enhanced_logger.error(msg)
+    def success(self, msg: str, *args):
+        self._info("✓ " + msg, *args)
     
     def bold(self, msg: str):
         # bold被映射为info，因为标准logging没有bold级别
-        self._enhanced_logger.info(f"**{msg}**")
+        self._info("**" + msg + "**")
     
     def print(self, msg: str):
-        self._enhanced_logger.print(msg)
-
+        print(msg)
 
-# 创建全局logger实例（向后兼容）
-logger = Logger()
 
-# 创建增强的logger实例
-enhanced_logger = AICommandLogger()
+# 全局实例在首次访问时创建（PEP 562），导入本模块不做任何处理器初始化
+def __getattr__(name: str):
+    if name == "logger":
+        instance = globals()["logger"] = Logger()
+        return instance
+    if name == "enhanced_logger":
+        # 返回 logger 包装器当前绑定的实例：新建 AICommandLogger 会清空共享的
+        # "aicmd" logger 的处理器，覆盖 configure() 设置的日志目录与级别
+        wrapper = globals().get("logger") or __getattr__("logger")
+        return wrapper._enhanced_logger
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
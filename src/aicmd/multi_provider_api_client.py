@@ -20,14 +20,13 @@ class MultiProviderAPIClient:
         base_url: Optional[str] = None,
     ):
         """初始化多提供商API客户端"""
-        self.config = config_manager or ConfigManager()
-        self.degradation_manager = degradation_manager or GracefulDegradationManager()
-        
-        # 初始化路由器
+        # 默认依赖由路由器创建，客户端直接复用，避免重复构造
         self.router = LLMRouter(
-            config_manager=self.config,
-            degradation_manager=self.degradation_manager
+            config_manager=config_manager,
+            degradation_manager=degradation_manager
         )
+        self.config = self.router.config
+        self.degradation_manager = self.router.degradation_manager
         
         # 向后兼容：如果指定了base_url，可能是为了覆盖OpenRouter的URL
         self.override_base_url = base_url
@@ -45,43 +44,22 @@ class MultiProviderAPIClient:
         """发送聊天请求，兼容原OpenRouterAPIClient接口"""
         request_timeout = timeout or self.timeout
         
-        # 如果有base_url覆盖，我们需要特殊处理
+        # 向后兼容：base_url 覆盖只作用于 OpenRouter，按请求传递而不修改共享配置
         if self.override_base_url:
-            # 临时设置OpenRouter提供商的base_url
-            providers_config = self.config.get("providers", {})
-            openrouter_config = providers_config.get("openrouter", {})
-            original_base_url = openrouter_config.get("base_url")
-            
-            # 临时修改配置
-            openrouter_config["base_url"] = self.override_base_url
-            providers_config["openrouter"] = openrouter_config
-            self.config.set("providers", providers_config)
-            
-            try:
-                # 使用openrouter提供商
-                result = self.router.send_chat(
-                    prompt, 
-                    provider_name="openrouter",
-                    model=model,
-                    timeout=request_timeout
-                )
-            finally:
-                # 恢复原始配置
-                if original_base_url:
-                    openrouter_config["base_url"] = original_base_url
-                else:
-                    openrouter_config.pop("base_url", None)
-                providers_config["openrouter"] = openrouter_config
-                self.config.set("providers", providers_config)
-            
-            return result
-        else:
-            # 使用默认提供商
             return self.router.send_chat(
-                prompt, 
+                prompt,
+                provider_name="openrouter",
                 model=model,
-                timeout=request_timeout
+                timeout=request_timeout,
+                base_url=self.override_base_url,
             )
+        
+        # 使用默认提供商
+        return self.router.send_chat(
+            prompt, 
+            model=model,
+            timeout=request_timeout
+        )
     
     def send_chat_with_fallback(self, prompt: str) -> str:
         """发送聊天请求，支持回退机制"""
@@ -13,6 +13,14 @@ AICMD_DEF_SYSTEM_PROMPT = (
     "like so: <parameter_name>."
 )
 
+# 提示词类型映射（导入时构建一次）
+_PROMPTS = {
+    "default": AICMD_DEF_SYSTEM_PROMPT,
+    # 未来可以在这里添加更多类型的提示词
+    # "explain": EXPLAIN_PROMPT,
+    # "debug": DEBUG_PROMPT,
+}
+
 
 def get_system_prompt(prompt_type: str = "default") -> str:
     """
@@ -24,11 +32,4 @@ def get_system_prompt(prompt_type: str = "default") -> str:
     Returns:
         对应的系统提示词字符串
     """
-    prompts = {
-        "default": AICMD_DEF_SYSTEM_PROMPT,
-        # 未来可以在这里添加更多类型的提示词
-        # "explain": EXPLAIN_PROMPT,
-        # "debug": DEBUG_PROMPT,
-    }
-    
-    return prompts.get(prompt_type, AICMD_DEF_SYSTEM_PROMPT)
+    return _PROMPTS.get(prompt_type, AICMD_DEF_SYSTEM_PROMPT)
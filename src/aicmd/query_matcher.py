@@ -4,143 +4,191 @@
 """
 
 import re
-from .hash_utils import hash_query
+from .hash_utils import hash_query, _normalize_simple
 from typing import List, Dict, Set, Tuple
 from difflib import SequenceMatcher
+from types import MappingProxyType
+
+# 预编译的正则（导入时编译一次）
+_WORD_RE = re.compile(r"[\w\u4e00-\u9fff]+")  # 词汇（支持中英文和数字）
+_PATH_RE = re.compile(r"[/~][\w/.-]*|[\w.-]+\.[\w]+")  # 文件路径
+_PORT_RE = re.compile(r":(\d{2,5})\b")  # 端口号
+_IP_RE = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")  # IP 地址
+_FLAG_RE = re.compile(r"-+[\w-]+")  # 选项标志
+
+# 标准化词集缓存的条目上限，超出时整体清空
+_NORMALIZED_CACHE_LIMIT = 4096
+
+# 综合相似度中 Jaccard 与序列相似度的权重
+_JACCARD_WEIGHT = 0.7
+_SEQUENCE_WEIGHT = 0.3
+# 相似度保留 3 位小数，剪枝时留出舍入余量
+_ROUNDING_SLACK = 0.001
+
+# 基于关键词识别的特定类别（按子串匹配，如 "logs" 归入 text_processing）
+_CATEGORY_KEYWORDS = (
+    ("git", ("git", "repository", "repo", "commit")),
+    ("docker", ("docker", "container", "image")),
+    ("nodejs", ("npm", "node", "package.json")),
+    ("python", ("python", "pip", "requirements")),
+    ("network", ("ssh", "scp", "rsync")),
+    ("text_processing", ("log", "grep", "awk", "sed")),
+)
+# 展平为 (关键词, 类别) 对，识别时单层循环即可，省去每个类别一次 any() 生成器
+_KEYWORD_CATEGORIES = tuple(
+    (keyword, category)
+    for category, keywords in _CATEGORY_KEYWORDS
+    for keyword in keywords
+)
+
+
+# 基础同义词映射 - 可扩展（实例通过 add_synonym 扩展时写时复制）
+_DEFAULT_SYNONYMS = MappingProxyType(
+    {
+        # 文件操作
+        "list": ("show", "display", "ls", "dir", "列出", "显示", "查看"),
+        "create": ("make", "new", "mkdir", "touch", "创建", "新建"),
+        "delete": ("remove", "rm", "del", "unlink", "删除", "移除"),
+        "copy": ("cp", "duplicate", "复制", "拷贝"),
+        "move": ("mv", "rename", "移动", "重命名"),
+        "find": ("search", "locate", "grep", "查找", "搜索"),
+        # 系统操作
+        "install": ("add", "setup", "安装", "添加"),
+        "update": ("upgrade", "refresh", "更新", "升级"),
+        "start": ("run", "execute", "launch", "启动", "运行"),
+        "stop": ("kill", "terminate", "halt", "停止", "终止"),
+        "status": ("check", "info", "state", "状态", "检查"),
+        # 网络操作
+        "download": ("fetch", "get", "pull", "下载", "获取"),
+        "upload": ("push", "send", "上传", "发送"),
+        "connect": ("link", "join", "连接", "链接"),
+        # 通用词汇
+        "all": ("everything", "total", "全部", "所有"),
+        "current": ("now", "present", "当前", "现在"),
+        "recursive": ("r", "deep", "递归", "深度"),
+        "force": ("f", "overwrite", "强制", "覆盖"),
+    }
+)
+
+# 常见停用词
+_STOP_WORDS = frozenset(
+    {
+        "a",
+        "an",
+        "the",
+        "is",
+        "are",
+        "was",
+        "were",
+        "be",
+        "been",
+        "being",
+        "have",
+        "has",
+        "had",
+        "do",
+        "does",
+        "did",
+        "will",
+        "would",
+        "could",
+        "should",
+        "may",
+        "might",
+        "can",
+        "must",
+        "shall",
+        "to",
+        "of",
+        "in",
+        "on",
+        "at",
+        "by",
+        "for",
+        "with",
+        "from",
+        "up",
+        "about",
+        "into",
+        "through",
+        "during",
+        "before",
+        "after",
+        "above",
+        "below",
+        "between",
+        "among",
+        "under",
+        "over",
+        "out",
+        "off",
+        "down",
+        "so",
+        "but",
+        "and",
+        "or",
+        "not",
+        "no",
+        "nor",
+        "as",
+        "if",
+        "than",
+        "then",
+        "now",
+        "here",
+        "there",
+        "when",
+        "where",
+        "why",
+        "how",
+        "what",
+        "which",
+        "who",
+        "whom",
+        "this",
+        "that",
+        "these",
+        "those",
+        "my",
+        "your",
+        "his",
+        "her",
+        "its",
+        "our",
+        "their",
+    }
+)
+
+
+def _build_reverse_synonyms(synonyms) -> Dict[str, str]:
+    """构建反向同义词索引：同义词及标准词 -> 标准词"""
+    reverse_synonyms = {}
+    for canonical, words in synonyms.items():
+        reverse_synonyms[canonical] = canonical
+        for synonym in words:
+            reverse_synonyms[synonym] = canonical
+    return reverse_synonyms
+
+
+# 默认的反向索引（导入时构建一次，未扩展同义词的实例共享）
+_DEFAULT_REVERSE_SYNONYMS = MappingProxyType(_build_reverse_synonyms(_DEFAULT_SYNONYMS))
 
 
 class QueryMatcher:
     """基础查询匹配器，提供查询标准化和相似度计算功能"""
 
-    def __init__(self):
-        """初始化查询匹配器，包含基础同义词映射"""
-        # 基础同义词映射 - 可扩展
-        self.synonyms = {
-            # 文件操作
-            "list": ["show", "display", "ls", "dir", "列出", "显示", "查看"],
-            "create": ["make", "new", "mkdir", "touch", "创建", "新建"],
-            "delete": ["remove", "rm", "del", "unlink", "删除", "移除"],
-            "copy": ["cp", "duplicate", "复制", "拷贝"],
-            "move": ["mv", "rename", "移动", "重命名"],
-            "find": ["search", "locate", "grep", "查找", "搜索"],
-            # 系统操作
-            "install": ["add", "setup", "安装", "添加"],
-            "update": ["upgrade", "refresh", "更新", "升级"],
-            "start": ["run", "execute", "launch", "启动", "运行"],
-            "stop": ["kill", "terminate", "halt", "停止", "终止"],
-            "status": ["check", "info", "state", "状态", "检查"],
-            # 网络操作
-            "download": ["fetch", "get", "pull", "下载", "获取"],
-            "upload": ["push", "send", "上传", "发送"],
-            "connect": ["link", "join", "连接", "链接"],
-            # 通用词汇
-            "all": ["everything", "total", "全部", "所有"],
-            "current": ["now", "present", "当前", "现在"],
-            "recursive": ["r", "deep", "递归", "深度"],
-            "force": ["f", "overwrite", "强制", "覆盖"],
-        }
+    __slots__ = ("synonyms", "reverse_synonyms", "stop_words", "_normalized_cache")
 
+    def __init__(self):
+        """初始化查询匹配器，默认共享模块级的同义词与停用词表"""
+        self.synonyms = _DEFAULT_SYNONYMS
         # 反向索引，提高查找效率
-        self._build_reverse_synonyms()
-        
+        self.reverse_synonyms = _DEFAULT_REVERSE_SYNONYMS
+        self.stop_words = _STOP_WORDS
+
         # 预计算缓存：存储标准化后的查询词集
         self._normalized_cache: Dict[str, Set[str]] = {}
 
-        # 常见停用词
-        self.stop_words = {
-            "a",
-            "an",
-            "the",
-            "is",
-            "are",
-            "was",
-            "were",
-            "be",
-            "been",
-            "being",
-            "have",
-            "has",
-            "had",
-            "do",
-            "does",
-            "did",
-            "will",
-            "would",
-            "could",
-            "should",
-            "may",
-            "might",
-            "can",
-            "must",
-            "shall",
-            "to",
-            "of",
-            "in",
-            "on",
-            "at",
-            "by",
-            "for",
-            "with",
-            "from",
-            "up",
-            "about",
-            "into",
-            "through",
-            "during",
-            "before",
-            "after",
-            "above",
-            "below",
-            "between",
-            "among",
-            "under",
-            "over",
-            "out",
-            "off",
-            "down",
-            "so",
-            "but",
-            "and",
-            "or",
-            "not",
-            "no",
-            "nor",
-            "as",
-            "if",
-            "than",
-            "then",
-            "now",
-            "here",
-            "there",
-            "when",
-            "where",
-            "why",
-            "how",
-            "what",
-            "which",
-            "who",
-            "whom",
-            "this",
-            "that",
-            "these",
-            "those",
-            "my",
-            "your",
-            "his",
-            "her",
-            "its",
-            "our",
-            "their",
-        }
-
-    def _build_reverse_synonyms(self):
-        """构建反向同义词索引"""
-        self.reverse_synonyms = {}
-        for canonical, synonyms in self.synonyms.items():
-            self.reverse_synonyms[canonical] = canonical
-            for synonym in synonyms:
-                self.reverse_synonyms[synonym] = canonical
-
     def normalize_query(self, query: str) -> List[str]:
         """
         标准化查询字符串
@@ -154,19 +202,14 @@ class QueryMatcher:
         if not query:
             return []
 
-        # 提取词汇（支持中英文和数字）
-        words = re.findall(r"[\w\u4e00-\u9fff]+", query.lower())
-
-        # 过滤停用词
-        words = [word for word in words if word not in self.stop_words]
-
-        # 应用同义词替换
-        normalized_words = []
-        for word in words:
-            canonical = self.reverse_synonyms.get(word, word)
-            normalized_words.append(canonical)
-
-        return normalized_words
+        # 提取词汇，过滤停用词并应用同义词替换
+        stop_words = self.stop_words
+        canonical = self.reverse_synonyms.get
+        return [
+            canonical(word, word)
+            for word in _WORD_RE.findall(query.lower())
+            if word not in stop_words
+        ]
 
     def calculate_similarity(self, query1: str, query2: str) -> float:
         """
@@ -179,9 +222,22 @@ class QueryMatcher:
         Returns:
             相似度分数 (0.0 - 1.0)
         """
-        words1 = set(self.normalize_query(query1))
-        words2 = set(self.normalize_query(query2))
-
+        return self._similarity_from_sets(
+            self._get_word_set(query1), self._get_word_set(query2)
+        )
+
+    def _get_word_set(self, query: str) -> Set[str]:
+        """获取查询的标准化词集，优先读取预计算缓存（调用方不得修改返回的集合）"""
+        words = self._normalized_cache.get(query)
+        if words is None:
+            if len(self._normalized_cache) >= _NORMALIZED_CACHE_LIMIT:
+                self._normalized_cache.clear()
+            words = self._normalized_cache[query] = set(self.normalize_query(query))
+        return words
+
+    @staticmethod
+    def _similarity_from_sets(words1: Set[str], words2: Set[str]) -> float:
+        """根据两个标准化词集计算相似度"""
         if not words1 and not words2:
             return 1.0
         if not words1 or not words2:
@@ -198,7 +254,9 @@ class QueryMatcher:
         sequence_similarity = SequenceMatcher(None, seq1, seq2).ratio()
 
         # 综合相似度（Jaccard 权重更高）
-        combined_similarity = 0.7 * jaccard + 0.3 * sequence_similarity
+        combined_similarity = (
+            _JACCARD_WEIGHT * jaccard + _SEQUENCE_WEIGHT * sequence_similarity
+        )
 
         return round(combined_similarity, 3)
 
@@ -210,8 +268,7 @@ class QueryMatcher:
             queries: 查询字符串列表
         """
         for query in queries:
-            if query not in self._normalized_cache:
-                self._normalized_cache[query] = set(self.normalize_query(query))
+            self._get_word_set(query)
     
     def clear_normalized_cache(self):
         """清空预计算缓存"""
@@ -239,9 +296,12 @@ class QueryMatcher:
         """
         从缓存查询中找到相似的查询（优化版本）
         
-        使用两阶段过滤策略：
-        1. 快速过滤：通过词集交集判断是否可能匹配
-        2. 精确计算：对候选项计算完整相似度
+        单次遍历，逐级过滤：
+        1. 词数相差过大的直接跳过（Jaccard 不超过较小词数 / 较大词数），无需求交集
+        2. 词集无交集的直接跳过
+        3. Jaccard 过低、即使序列相似度为 1 也达不到阈值的直接跳过
+        4. 其余候选项先用 difflib 的快速上界估算，仍可能达到阈值时才计算完整的
+           序列相似度（复用同一个 SequenceMatcher）
 
         Args:
             target_query: 目标查询
@@ -251,32 +311,49 @@ class QueryMatcher:
         Returns:
             相似查询列表 [(query, command, similarity), ...] 按相似度降序排列
         """
-        # 标准化目标查询
-        target_words = set(self.normalize_query(target_query))
+        # 标准化目标查询（只计算一次）
+        target_words = self._get_word_set(target_query)
         
         # 如果目标查询为空，无法匹配
         if not target_words:
             return []
-        
-        # 预计算所有缓存查询的标准化结果
-        self.precompute_normalized_queries([q for q, _ in cached_queries])
-        
-        # 阶段1: 快速过滤 - 至少有一个词匹配的候选项
-        candidates = []
+
+        target_len = len(target_words)
+        sequence_matcher = SequenceMatcher(None, " ".join(sorted(target_words)))
+        # 综合分 = 0.7 * jaccard + 0.3 * 序列相似度（<= 1），再保留 3 位小数
+        min_score = threshold - _ROUNDING_SLACK
+        min_jaccard = (min_score - _SEQUENCE_WEIGHT) / _JACCARD_WEIGHT
+
+        similar_queries = []
         for cached_query, command in cached_queries:
-            cached_words = self._normalized_cache.get(
-                cached_query, 
-                set(self.normalize_query(cached_query))
+            cached_words = self._get_word_set(cached_query)
+            cached_len = len(cached_words)
+            if cached_len < target_len:
+                if cached_len < min_jaccard * target_len:
+                    continue
+            elif target_len < min_jaccard * cached_len:
+                continue
+
+            overlap = len(target_words & cached_words)
+            if not overlap:
+                continue
+            jaccard = overlap / (target_len + cached_len - overlap)
+            if jaccard < min_jaccard:
+                continue
+
+            # real_quick_ratio/quick_ratio 是 ratio 的上界，达不到阈值时跳过完整比较
+            sequence_matcher.set_seq2(" ".join(sorted(cached_words)))
+            base_score = _JACCARD_WEIGHT * jaccard
+            if (
+                base_score + _SEQUENCE_WEIGHT * sequence_matcher.real_quick_ratio()
+                < min_score
+                or base_score + _SEQUENCE_WEIGHT * sequence_matcher.quick_ratio()
+                < min_score
+            ):
+                continue
+            similarity = round(
+                base_score + _SEQUENCE_WEIGHT * sequence_matcher.ratio(), 3
             )
-            
-            # 快速过滤：检查是否有词交集
-            if cached_words & target_words:  # 集合交集操作，O(min(len(a), len(b)))
-                candidates.append((cached_query, command))
-        
-        # 阶段2: 精确计算 - 对候选项计算完整相似度
-        similar_queries = []
-        for cached_query, command in candidates:
-            similarity = self.calculate_similarity(target_query, cached_query)
             if similarity >= threshold:
                 similar_queries.append((cached_query, command, similarity))
 
@@ -295,7 +372,8 @@ class QueryMatcher:
         Returns:
             是否完全匹配
         """
-        return self.get_query_hash(query1) == self.get_query_hash(query2)
+        # 哈希相等等价于 simple 标准化结果相等，直接比较字符串省去两次 sha256
+        return _normalize_simple(query1) == _normalize_simple(query2)
 
     def get_query_categories(self, query: str) -> Set[str]:
         """
@@ -318,22 +396,11 @@ class QueryMatcher:
 
         # 基于关键词模式识别特定类别
         query_lower = query.lower()
-
-        if any(
-            pattern in query_lower
-            for pattern in ["git", "repository", "repo", "commit"]
-        ):
-            categories.add("git")
-        if any(pattern in query_lower for pattern in ["docker", "container", "image"]):
-            categories.add("docker")
-        if any(pattern in query_lower for pattern in ["npm", "node", "package.json"]):
-            categories.add("nodejs")
-        if any(pattern in query_lower for pattern in ["python", "pip", "requirements"]):
-            categories.add("python")
-        if any(pattern in query_lower for pattern in ["ssh", "scp", "rsync"]):
-            categories.add("network")
-        if any(pattern in query_lower for pattern in ["log", "grep", "awk", "sed"]):
-            categories.add("text_processing")
+        categories.update(
+            category
+            for keyword, category in _KEYWORD_CATEGORIES
+            if keyword in query_lower
+        )
 
         return categories
 
@@ -350,26 +417,22 @@ class QueryMatcher:
         parameters = {}
 
         # 提取文件路径
-        path_pattern = r"[/~][\w/.-]*|[\w.-]+\.[\w]+"
-        paths = re.findall(path_pattern, query)
+        paths = _PATH_RE.findall(query)
         if paths:
             parameters["paths"] = paths
 
         # 提取端口号
-        port_pattern = r":(\d{2,5})\b"
-        ports = re.findall(port_pattern, query)
+        ports = _PORT_RE.findall(query)
         if ports:
             parameters["ports"] = ports
 
         # 提取 IP 地址
-        ip_pattern = r"\b(?:\d{1,3}\.){3}\d{1,3}\b"
-        ips = re.findall(ip_pattern, query)
+        ips = _IP_RE.findall(query)
         if ips:
             parameters["ips"] = ips
 
         # 提取选项标志
-        flag_pattern = r"-+[\w-]+"
-        flags = re.findall(flag_pattern, query)
+        flags = _FLAG_RE.findall(query)
         if flags:
             parameters["flags"] = flags
 
@@ -383,11 +446,13 @@ class QueryMatcher:
             canonical: 标准词汇
             synonyms: 同义词列表
         """
-        if canonical not in self.synonyms:
-            self.synonyms[canonical] = []
+        if self.synonyms is _DEFAULT_SYNONYMS:
+            # 首次扩展时复制共享的默认映射
+            self.synonyms = {key: list(words) for key, words in self.synonyms.items()}
+        self.synonyms.setdefault(canonical, []).extend(synonyms)
 
-        self.synonyms[canonical].extend(synonyms)
-        self._build_reverse_synonyms()  # 重建反向索引
+        self.reverse_synonyms = _build_reverse_synonyms(self.synonyms)  # 重建反向索引
+        self._normalized_cache.clear()  # 同义词变化后已缓存的词集失效
 
     def get_matching_stats(self) -> Dict[str, int]:
         """
@@ -4,13 +4,112 @@
 """
 
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from .config_manager import ConfigManager
+from .logger import logger
+
+try:  # 可选依赖：RE2 保证线性时间匹配，回溯引擎在 ".*X.*Y" 类模式上遇到病态输入会超线性增长
+    import re2 as _re2
+except ImportError:  # pragma: no cover - 未安装时使用标准库 re
+    _re2 = None
+
+
+def _compile(pattern: str, ignore_case: bool = True):
+    """
+    编译模式（默认忽略大小写）；安装了 google-re2 时优先使用 RE2，
+    RE2 不支持的语法（如反向引用、环视）回退到标准库 re。
+    区分大小写的版本只用于 _is_plain_ascii 的命令，同时加 re.ASCII，
+    单词边界与空白类无需查询 Unicode 属性表
+    """
+    if _re2 is not None:
+        try:
+            return _re2.compile("(?i)" + pattern if ignore_case else pattern)
+        except Exception:
+            pass
+    return re.compile(pattern, re.IGNORECASE if ignore_case else re.ASCII)
+
+
+def _fuse(patterns: List[str]) -> str:
+    """将不含分组引用的模式合并为一个交替正则"""
+    return "|".join(f"(?:{p})" for p in patterns)
+
+
+# get_safety_info 结果缓存的条目上限，超出时整体清空
+_SAFETY_INFO_CACHE_LIMIT = 256
+
+# 每个默认危险模式都必然包含其中至少一个字面量（小写），不含任何一个的命令
+# 不可能匹配默认模式，可跳过正则扫描
+_DANGER_KEYWORDS = (
+    "rm", "/dev/", "mkfs", "format", "del", "chmod", "chown", "kill",
+    "shutdown", "reboot", "halt", "remove", "uninstall",
+)
+
+
+def _has_danger_keyword(command: str) -> bool:
+    """快速预筛：命令是否可能匹配默认危险模式"""
+    # 非 ASCII 字符在 IGNORECASE 下可能匹配 ASCII 字母（如 "ſ" 匹配 "s"），
+    # lower() 无法覆盖这类情况，直接交给正则判断
+    if not command.isascii():
+        return True
+    return _contains_keyword(command.lower())
+
+
+def _contains_keyword(lowered: str) -> bool:
+    """已小写的 ASCII 命令中是否含有任一危险关键字"""
+    for keyword in _DANGER_KEYWORDS:
+        if keyword in lowered:
+            return True
+    return False
+
+
+def _is_plain_ascii(command: str) -> bool:
+    """
+    命令能否走小写 + re.ASCII 的快速路径：
+    Unicode 模式下空白类还包含 0x1c-0x1f 控制字符，含这些字符时走忽略大小写的 Unicode 版本
+    """
+    return command.isascii() and not (
+        "\x1c" in command or "\x1d" in command or "\x1e" in command or "\x1f" in command
+    )
+
+
+# 各危险等级对应的警告信息
+_LEVEL_WARNINGS = {
+    "critical": (
+        "⚠️  CRITICAL: This command could cause irreversible system damage!",
+        "🚨 This command may delete system files or damage your system",
+        "💡 Please double-check before proceeding",
+    ),
+    "dangerous": (
+        "⚠️  WARNING: This command could delete files or modify system settings",
+        "💡 Make sure you understand what this command does",
+    ),
+    "warning": ("⚠️  CAUTION: This command requires careful consideration",),
+}
+
+# 安全命令的安全信息与策略无关，所有安全命令共用这一份（只读，对外返回副本）
+_SAFE_INFO: Dict[str, Any] = {
+    "is_dangerous": False,
+    "danger_level": "safe",
+    "warnings": (),
+    "force_confirmation": False,
+    "disable_auto_copy": False,
+}
 
 
 class CommandSafetyChecker:
     """命令安全检查器"""
     
+    __slots__ = (
+        "config",
+        "dangerous_patterns",
+        "compiled_patterns",
+        "_custom_compiled",
+        "_info_cache",
+        "_config_revision",
+        "_force_confirm",
+        "_disable_auto_copy_dangerous",
+    )
+    
     # 默认危险命令模式
     DEFAULT_DANGEROUS_PATTERNS = [
         # 文件系统删除操作
@@ -46,6 +145,43 @@ class CommandSafetyChecker:
         r'\bpip\s+.*uninstall.*-y.*\*',  # pip uninstall with wildcards
     ]
     
+    # 默认模式合并为一个交替正则，由正则引擎单次扫描命令。
+    # 默认模式只含小写字面量，ASCII 命令先 lower() 再用区分大小写的版本匹配，
+    # 省去 IGNORECASE 逐字符的大小写折叠；非 ASCII 命令仍用忽略大小写的版本
+    _DEFAULT_FUSED = _compile(_fuse(DEFAULT_DANGEROUS_PATTERNS))
+    _DEFAULT_FUSED_LOWER = _compile(
+        _fuse(DEFAULT_DANGEROUS_PATTERNS), ignore_case=False
+    )
+    
+    # 逐条编译的默认模式，所有实例共享，实例只需编译用户自定义模式
+    _DEFAULT_COMPILED = tuple(_compile(p) for p in DEFAULT_DANGEROUS_PATTERNS)
+    
+    # 关键系统操作（危险等级 critical）
+    CRITICAL_PATTERNS = [
+        r'\brm\s+-[rf]+\s+/',
+        r'\bdd\s+.*of=/dev/',
+        r'\bformat\s+[a-zA-Z]:',
+        r'\bmkfs\.',
+        r'\bkill\s+-9\s+1',
+        r'\bshutdown\s+.*',
+        r'\breboot\b',
+        r'\bhalt\b',
+    ]
+    
+    # 高危操作（危险等级 dangerous）
+    HIGH_DANGER_PATTERNS = [
+        r'\brm\s+.*-[rf]',
+        r'\bchmod\s+777',
+        r'\bkillall\s+.*',
+        r'\bsudo\s+rm\s+.*',
+    ]
+    
+    # 每个等级的模式同样合并为一个正则，分级最多两次扫描
+    _CRITICAL_FUSED = _compile(_fuse(CRITICAL_PATTERNS))
+    _HIGH_DANGER_FUSED = _compile(_fuse(HIGH_DANGER_PATTERNS))
+    _CRITICAL_FUSED_LOWER = _compile(_fuse(CRITICAL_PATTERNS), ignore_case=False)
+    _HIGH_DANGER_FUSED_LOWER = _compile(_fuse(HIGH_DANGER_PATTERNS), ignore_case=False)
+    
     def __init__(self, config_manager: Optional[ConfigManager] = None):
         """初始化安全检查器"""
         self.config = config_manager or ConfigManager()
@@ -56,14 +192,43 @@ class CommandSafetyChecker:
         # 合并默认和自定义模式
         self.dangerous_patterns = self.DEFAULT_DANGEROUS_PATTERNS + custom_patterns
         
-        # 编译正则表达式
-        self.compiled_patterns = []
-        for pattern in self.dangerous_patterns:
+        # 编译自定义正则表达式（默认模式已在类定义时编译）
+        custom_compiled = []
+        for pattern in custom_patterns:
             try:
-                self.compiled_patterns.append(re.compile(pattern, re.IGNORECASE))
+                custom_compiled.append(_compile(pattern))
             except re.error as e:
-                # 忽略无效的正则表达式
+                # 忽略无效的正则表达式，初始化时提示一次便于发现配置错误
+                logger.warning(
+                    "Ignoring invalid dangerous command pattern %r: %s", pattern, e
+                )
                 continue
+        
+        self.compiled_patterns = list(self._DEFAULT_COMPILED) + custom_compiled
+        
+        # 默认模式已合并进 _DEFAULT_FUSED，自定义模式逐个匹配（可能含分组或内联标志，
+        # 合并后语义会改变）
+        self._custom_compiled = tuple(custom_compiled)
+        
+        # get_safety_info 结果缓存与策略开关，配置修订号变化时一并刷新
+        self._info_cache: Dict[str, Dict[str, Any]] = {}
+        self._load_policy()
+    
+    def _load_policy(self):
+        """读取危险命令处理策略，并清空依赖它的结果缓存"""
+        self._config_revision = getattr(self.config, "revision", 0)
+        self._force_confirm = bool(
+            self.config.get("force_confirm_dangerous_commands", True)
+        )
+        self._disable_auto_copy_dangerous = bool(
+            self.config.get("disable_auto_copy_dangerous", True)
+        )
+        self._info_cache.clear()
+    
+    def _sync_policy(self):
+        """配置在运行时被修改过时重新读取策略"""
+        if getattr(self.config, "revision", 0) != self._config_revision:
+            self._load_policy()
     
     def is_dangerous_command(self, command: str) -> bool:
         """
@@ -78,13 +243,28 @@ class CommandSafetyChecker:
         if not command or not command.strip():
             return False
         
-        # 检查是否匹配任何危险模式
-        for pattern in self.compiled_patterns:
+        # 检查是否匹配任何危险模式（先用关键字预筛，多数普通命令无需正则扫描）
+        if self._matches_default(command):
+            return True
+        for pattern in self._custom_compiled:
             if pattern.search(command):
                 return True
         
         return False
     
+    def _matches_default(self, command: str) -> bool:
+        """命令是否匹配任一默认危险模式"""
+        if _is_plain_ascii(command):
+            lowered = command.lower()
+            return _contains_keyword(lowered) and bool(
+                self._DEFAULT_FUSED_LOWER.search(lowered)
+            )
+        # 非 ASCII 字符在 IGNORECASE 下可能匹配 ASCII 字母（如 "ſ" 匹配 "s"），
+        # \x1c-\x1f 在 Unicode 模式下属于 \s，均交给 Unicode 版本判断
+        return _has_danger_keyword(command) and bool(
+            self._DEFAULT_FUSED.search(command)
+        )
+    
     def get_danger_level(self, command: str) -> str:
         """
         获取命令的危险等级
@@ -95,44 +275,32 @@ class CommandSafetyChecker:
         Returns:
             危险等级: "safe", "warning", "dangerous", "critical"
         """
+        return self._cached_info(command)["danger_level"]
+    
+    def _scan(self, command: str) -> Tuple[bool, str]:
+        """一次扫描得到 (是否危险, 危险等级)，分级模式只对危险命令执行"""
         if not self.is_dangerous_command(command):
-            return "safe"
+            return False, "safe"
+        return True, self._classify_dangerous(command)
+    
+    def _classify_dangerous(self, command: str) -> str:
+        """对已判定为危险的命令分级"""
+        if _is_plain_ascii(command):
+            command = command.lower()
+            critical, high_danger = (
+                self._CRITICAL_FUSED_LOWER,
+                self._HIGH_DANGER_FUSED_LOWER,
+            )
+        else:
+            critical, high_danger = self._CRITICAL_FUSED, self._HIGH_DANGER_FUSED
         
         # 关键系统操作
-        critical_patterns = [
-            r'\brm\s+-[rf]+\s+/',
-            r'\bdd\s+.*of=/dev/',
-            r'\bformat\s+[a-zA-Z]:',
-            r'\bmkfs\.',
-            r'\bkill\s+-9\s+1',
-            r'\bshutdown\s+.*',
-            r'\breboot\b',
-            r'\bhalt\b',
-        ]
-        
-        for pattern_str in critical_patterns:
-            try:
-                pattern = re.compile(pattern_str, re.IGNORECASE)
-                if pattern.search(command):
-                    return "critical"
-            except re.error:
-                continue
+        if critical.search(command):
+            return "critical"
         
         # 高危操作
-        dangerous_patterns = [
-            r'\brm\s+.*-[rf]',
-            r'\bchmod\s+777',
-            r'\bkillall\s+.*',
-            r'\bsudo\s+rm\s+.*',
-        ]
-        
-        for pattern_str in dangerous_patterns:
-            try:
-                pattern = re.compile(pattern_str, re.IGNORECASE)
-                if pattern.search(command):
-                    return "dangerous"
-            except re.error:
-                continue
+        if high_danger.search(command):
+            return "dangerous"
         
         return "warning"
     
@@ -146,23 +314,7 @@ class CommandSafetyChecker:
         Returns:
             警告信息列表
         """
-        if not self.is_dangerous_command(command):
-            return []
-        
-        warnings = []
-        danger_level = self.get_danger_level(command)
-        
-        if danger_level == "critical":
-            warnings.append("⚠️  CRITICAL: This command could cause irreversible system damage!")
-            warnings.append("🚨 This command may delete system files or damage your system")
-            warnings.append("💡 Please double-check before proceeding")
-        elif danger_level == "dangerous":
-            warnings.append("⚠️  WARNING: This command could delete files or modify system settings")
-            warnings.append("💡 Make sure you understand what this command does")
-        elif danger_level == "warning":
-            warnings.append("⚠️  CAUTION: This command requires careful consideration")
-        
-        return warnings
+        return list(self._cached_info(command)["warnings"])
     
     def should_force_confirmation(self, command: str) -> bool:
         """
@@ -174,12 +326,7 @@ class CommandSafetyChecker:
         Returns:
             True if confirmation should be forced, False otherwise
         """
-        if not self.is_dangerous_command(command):
-            return False
-        
-        # 从配置获取危险命令处理策略
-        force_confirm_dangerous = self.config.get("force_confirm_dangerous_commands", True)
-        return force_confirm_dangerous
+        return self._cached_info(command)["force_confirmation"]
     
     def should_disable_auto_copy(self, command: str) -> bool:
         """
@@ -191,12 +338,7 @@ class CommandSafetyChecker:
         Returns:
             True if auto-copy should be disabled, False otherwise
         """
-        if not self.is_dangerous_command(command):
-            return False
-        
-        # 从配置获取自动复制策略
-        disable_auto_copy_dangerous = self.config.get("disable_auto_copy_dangerous", True)
-        return disable_auto_copy_dangerous
+        return self._cached_info(command)["disable_auto_copy"]
     
     def get_safety_info(self, command: str) -> Dict[str, Any]:
         """
@@ -208,12 +350,51 @@ class CommandSafetyChecker:
         Returns:
             包含安全信息的字典
         """
-        is_dangerous = self.is_dangerous_command(command)
+        info = self._cached_info(command)
+        # 返回副本，调用方修改结果不会污染缓存
+        return dict(info, warnings=list(info["warnings"]))
+    
+    def get_safety_info_batch(self, commands: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        批量获取命令的安全信息，结果与逐条调用 get_safety_info 一致
+        
+        Args:
+            commands: 命令字符串序列
+            
+        Returns:
+            与输入顺序对应的安全信息列表
+        """
+        self._sync_policy()
+        # 批内去重但不写入实例缓存，避免大批量扫描冲掉交互场景的缓存条目
+        seen: Dict[str, Dict[str, Any]] = {}
+        results = []
+        for command in commands:
+            info = seen.get(command)
+            if info is None:
+                info = seen[command] = self._compute_safety_info(command)
+            results.append(dict(info, warnings=list(info["warnings"])))
+        return results
+    
+    def _cached_info(self, command: str) -> Dict[str, Any]:
+        """读取或计算安全信息（返回缓存对象本身，调用方不得修改）"""
+        self._sync_policy()
+        info = self._info_cache.get(command)
+        if info is None:
+            if len(self._info_cache) >= _SAFETY_INFO_CACHE_LIMIT:
+                self._info_cache.clear()
+            info = self._info_cache[command] = self._compute_safety_info(command)
+        return info
+    
+    def _compute_safety_info(self, command: str) -> Dict[str, Any]:
+        """只扫描一次危险模式，计算完整安全信息"""
+        is_dangerous, danger_level = self._scan(command)
+        if not is_dangerous:
+            return _SAFE_INFO
         
         return {
             "is_dangerous": is_dangerous,
-            "danger_level": self.get_danger_level(command),
-            "warnings": self.get_safety_warnings(command),
-            "force_confirmation": self.should_force_confirmation(command),
-            "disable_auto_copy": self.should_disable_auto_copy(command),
+            "danger_level": danger_level,
+            "warnings": _LEVEL_WARNINGS.get(danger_level, ()),
+            "force_confirmation": is_dangerous and self._force_confirm,
+            "disable_auto_copy": is_dangerous and self._disable_auto_copy_dangerous,
         }
\ No newline at end of file
@@ -141,6 +141,23 @@ class TestCacheManager:
             assert entry.query == query
             assert entry.command == command
 
+    def test_blake2_strategy_migrates_legacy_hash(self, mock_cache_manager):
+        """测试切换到 blake2 策略后旧哈希记录在读取时迁移"""
+        from aicmd.hash_utils import hash_query
+
+        query = "list legacy files"
+        legacy_hash = mock_cache_manager.save_cache_entry(query, "ls -la")
+
+        if mock_cache_manager.db.is_available and legacy_hash:
+            mock_cache_manager.config.set("hash_strategy", "blake2")
+
+            entry = mock_cache_manager.find_exact_match(query)
+
+            assert entry is not None
+            assert entry.command == "ls -la"
+            assert entry.query_hash == hash_query(query, strategy="blake2")
+            assert entry.query_hash != legacy_hash
+
     def test_update_last_used(self, mock_cache_manager):
         """测试更新最后使用时间"""
         # 先保存一个条目
@@ -135,6 +135,20 @@ class TestConfigManager:
             # 应该使用默认值
             assert config.get("cache_enabled") is True
 
+    def test_non_object_json_config(self, temp_config_dir):
+        """测试顶层不是对象的 JSON 配置被忽略，使用默认配置"""
+        from aicmd.config_manager import ConfigManager
+
+        config_file = temp_config_dir / "settings.json"
+        with open(config_file, "w") as f:
+            json.dump([1, 2], f)
+
+        with patch.object(Path, "home", return_value=temp_config_dir.parent):
+            config = ConfigManager()
+
+            assert config.get("cache_enabled") is True
+            assert config.get("max_retries") == 3
+
     def test_is_valid_config_key(self):
         """测试配置键有效性检查"""
         from aicmd.config_manager import ConfigManager
@@ -203,6 +217,73 @@ class TestConfigManager:
                 data = json.load(f)
             assert "version" in data
 
+    def test_set_config_reuses_cached_json(self, temp_config_dir):
+        """测试 set_config 复用内存中的 JSON 配置并自动创建中间层级"""
+        from aicmd.config_manager import ConfigManager
+
+        config_file = temp_config_dir / "settings.json"
+        with open(config_file, "w") as f:
+            json.dump({"basic": {"cache_enabled": True}}, f)
+
+        with patch.object(Path, "home", return_value=temp_config_dir.parent):
+            config = ConfigManager()
+
+            with patch.object(
+                config, "_load_json_config", side_effect=AssertionError
+            ):
+                assert config.set_config("cache_enabled", False) is True
+                assert config.set_config("providers.custom.model", "m1") is True
+
+        with open(config_file) as f:
+            data = json.load(f)
+        assert data["basic"]["cache_enabled"] is False
+        assert data["providers"]["custom"]["model"] == "m1"
+        assert config.get("cache_enabled") is False
+        assert config.get("providers")["custom"]["model"] == "m1"
+
+    def test_set_config_failed_write_does_not_leak(self, temp_config_dir):
+        """测试写入失败时缓存不保留被拒绝的值，后续写入不会把它落盘"""
+        from aicmd import config_manager
+        from aicmd.config_manager import ConfigManager
+
+        config_file = temp_config_dir / "settings.json"
+        with open(config_file, "w") as f:
+            json.dump({"basic": {"cache_enabled": True}}, f)
+
+        with patch.object(Path, "home", return_value=temp_config_dir.parent):
+            config = ConfigManager()
+
+            with patch.object(
+                config_manager, "_json_dump_file", side_effect=OSError("disk full")
+            ):
+                assert config.set_config("providers.custom.model", "rejected") is False
+
+            assert config.set_config("cache_enabled", False) is True
+
+        with open(config_file) as f:
+            data = json.load(f)
+        assert data == {"basic": {"cache_enabled": False}}
+        assert "providers" not in config._get_json_config()
+
+    def test_flat_json_config_is_loaded(self, temp_config_dir):
+        """测试扁平写法的配置文件可直接生效"""
+        from aicmd.config_manager import ConfigManager
+
+        config_file = temp_config_dir / "settings.json"
+        with open(config_file, "w") as f:
+            json.dump({"auto_copy_threshold": 0.95, "cache_enabled": False}, f)
+
+        with patch.object(Path, "home", return_value=temp_config_dir.parent):
+            config = ConfigManager()
+            assert config.get("auto_copy_threshold") == 0.95
+            assert config.get("cache_enabled") is False
+
+            assert config.set_config("auto_copy_threshold", 0.85) is True
+            assert config.get("auto_copy_threshold") == 0.85
+
+        with open(config_file) as f:
+            assert json.load(f) == {"auto_copy_threshold": 0.85, "cache_enabled": False}
+
 
 class TestConfigValidation:
     """配置验证测试"""
@@ -219,6 +300,36 @@ class TestConfigValidation:
         validation = config.is_valid_config_key("confidence_threshold")
         # 键是有效的，但值的验证应该在 validate_config 中处理
 
+    def test_validate_config_reports_range_errors(self):
+        """测试 validate_config 的数值范围校验"""
+        from aicmd.config_manager import ConfigManager
+
+        config = ConfigManager()
+        config.set("confidence_threshold", 1.5)
+        config.set("max_retries", 2.5)
+
+        errors = config.validate_config()["errors"]
+
+        assert any(e.startswith("confidence_threshold") for e in errors)
+        assert any("max_retries" in e and "integer" in e for e in errors)
+        assert config.is_config_valid() is False
+
+    def test_validate_relative_cache_directory(self, tmp_path, monkeypatch):
+        """测试相对路径的 cache_directory 以当前目录为父目录，不产生警告"""
+        from aicmd.config_manager import ConfigManager
+
+        monkeypatch.chdir(tmp_path)
+        config = ConfigManager()
+
+        for cache_directory in ("cache", ".ai-cmd"):
+            config.set("cache_directory", cache_directory)
+            warnings = config.validate_config()["warnings"]
+            assert not any("cache_directory" in w for w in warnings)
+
+        config.set("cache_directory", "missing/cache")
+        warnings = config.validate_config()["warnings"]
+        assert any("cache_directory" in w for w in warnings)
+
     def test_validate_integer_range(self):
         """测试整数范围验证"""
         from aicmd.config_manager import ConfigManager
@@ -258,3 +369,29 @@ class TestConfigSource:
             
             # 应该包含配置文件路径
             assert "JSON" in source
+
+    def test_compute_sources_single_lookup(self):
+        """测试批量计算配置来源只查找一次配置文件"""
+        from aicmd.config_manager import ConfigManager
+
+        config = ConfigManager()
+        with patch.object(
+            config, "_get_config_file_path", return_value=None
+        ) as mock_path:
+            sources = config._compute_sources(["cache_enabled", "max_retries"])
+
+        assert mock_path.call_count == 1
+        assert sources == {"cache_enabled": "Default", "max_retries": "Default"}
+
+    def test_print_config_summary_single_write(self, capsys):
+        """测试配置摘要一次性输出"""
+        from aicmd.config_manager import ConfigManager
+
+        config = ConfigManager()
+        with patch("aicmd.keyring_manager.KeyringManager.has_api_key", return_value=False):
+            config.print_config_summary()
+
+        out = capsys.readouterr().out
+        assert out.startswith("=== Configuration Summary ===\n")
+        assert "\nBasic Configuration:\n  interactive_mode:" in out
+        assert out.endswith("\n")
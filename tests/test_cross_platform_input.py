@@ -0,0 +1,75 @@
+"""
+跨平台输入单元测试
+测试带超时的终端输入
+"""
+
+import os
+import sys
+import pytest
+
+
+@pytest.fixture
+def pty_stdin(monkeypatch):
+    """
+    使用伪终端替换 sys.stdin，返回可写入输入的主端描述符
+    """
+    if not hasattr(os, "openpty"):
+        pytest.skip("pty not available on this platform")
+
+    master, slave = os.openpty()
+    stdin = os.fdopen(slave, "r")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    yield master
+    stdin.close()
+    os.close(master)
+
+
+class TestUniversalInputTimeout:
+    """UniversalInputTimeout 测试类"""
+
+    def test_selector_method_on_posix(self):
+        """测试非 Windows 平台使用 selectors 方法"""
+        from aicmd.cross_platform_input import get_best_input_method
+
+        if sys.platform == "win32":
+            assert get_best_input_method() == "threading"
+        else:
+            assert get_best_input_method() == "selector"
+
+    def test_selector_reads_terminal_line(self, pty_stdin, capsys):
+        """测试终端输入通过 selector 读取一行"""
+        from aicmd.cross_platform_input import UniversalInputTimeout
+
+        os.write(pty_stdin, b"yes\n")
+        reader = UniversalInputTimeout()
+
+        assert reader.input_with_timeout("Confirm? ", 5) == "yes"
+        assert capsys.readouterr().out == "Confirm? "
+
+    def test_selector_timeout(self, pty_stdin):
+        """测试终端无输入时超时"""
+        from aicmd.cross_platform_input import UniversalInputTimeout, InputTimeoutError
+
+        reader = UniversalInputTimeout()
+
+        with pytest.raises(InputTimeoutError):
+            reader.input_with_timeout("", 0)
+
+    def test_read_key_without_enter(self, pty_stdin, capsys):
+        """测试单键读取无需回车并回显按键"""
+        from aicmd.cross_platform_input import UniversalInputTimeout
+
+        os.write(pty_stdin, b"n")
+        reader = UniversalInputTimeout()
+
+        assert reader.read_key_with_timeout("Copy? ", 5) == "n"
+        assert capsys.readouterr().out == "Copy? n\n"
+
+    def test_read_key_enter_returns_empty(self, pty_stdin):
+        """测试单键读取时直接回车返回空字符串"""
+        from aicmd.cross_platform_input import UniversalInputTimeout
+
+        os.write(pty_stdin, b"\n")
+        reader = UniversalInputTimeout()
+
+        assert reader.read_key_with_timeout("", 5) == ""
@@ -74,6 +74,47 @@ class TestSafeDatabaseManager:
             result = db._verify_tables()
             assert result is True
 
+    def test_database_path_resolution_cached(self, tmp_path, mock_config_manager):
+        """测试数据库路径解析结果被缓存且只创建一次目录"""
+        from aicmd.database_manager import SafeDatabaseManager, _resolve_db_path
+
+        cache_dir = tmp_path / "nested" / "cache"
+        mock_config_manager.set("cache_directory", str(cache_dir))
+        mock_config_manager.set("database_file", "test.db")
+
+        db = SafeDatabaseManager.__new__(SafeDatabaseManager)
+        db.config = mock_config_manager
+
+        expected = str(cache_dir / "test.db")
+        assert db._get_database_path() == expected
+        assert cache_dir.is_dir()
+
+        with patch.object(Path, "mkdir", side_effect=AssertionError):
+            assert db._get_database_path() == expected
+        assert _resolve_db_path.cache_info().hits >= 1
+
+    def test_verify_tables_records_schema_version(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试校验通过后写入 schema 版本，后续校验直接跳过"""
+        from aicmd.database_manager import SafeDatabaseManager, SCHEMA_VERSION
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+
+        version = db.execute_query("PRAGMA user_version", fetch=True)[0][0]
+        assert version == SCHEMA_VERSION
+
+        # 版本匹配时即使表被删除也不会再次检查
+        db.execute_query("DROP TABLE feedback_history")
+        assert db._verify_tables() is True
+
+        db.execute_query("PRAGMA user_version = 0")
+        assert db._verify_tables() is False
+
     def test_execute_query_insert(self, temp_db_path, mock_config_manager, monkeypatch):
         """测试插入查询"""
         from aicmd.database_manager import SafeDatabaseManager
@@ -170,6 +211,34 @@ class TestSafeDatabaseManager:
             assert "feedback_entries" in stats
             assert "db_path" in stats
 
+    def test_get_database_stats_single_query(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试数据库统计的两项计数通过一次查询获取"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        db.execute_query(
+            "INSERT INTO enhanced_cache (query, query_hash, command) VALUES (?, ?, ?)",
+            ("q", "h", "c"),
+        )
+        db.execute_query(
+            "INSERT INTO feedback_history (query_hash, command, action) VALUES (?, ?, ?)",
+            ("h", "c", "accept"),
+        )
+
+        with patch.object(db, "execute_query", wraps=db.execute_query) as spy:
+            stats = db.get_database_stats()
+
+        assert spy.call_count == 1
+        assert stats["cache_entries"] == 1
+        assert stats["feedback_entries"] == 1
+        db.close()
+
     def test_cleanup_old_entries(self, temp_db_path, mock_config_manager, monkeypatch):
         """测试清理旧条目"""
         from aicmd.database_manager import SafeDatabaseManager
@@ -187,6 +256,209 @@ class TestSafeDatabaseManager:
             # 结果应该 >= 0
             assert result >= 0
 
+    def test_connection_pragmas(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试连接启用 WAL 及 PRAGMA 调优"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+
+        conn = db.get_connection()
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        finally:
+            conn.close()
+
+    def test_connection_reused_per_thread(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试同一线程内复用数据库连接"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        conn = db._get_conn()
+
+        with patch.object(db, "_connect", side_effect=AssertionError):
+            db.execute_query("SELECT COUNT(*) FROM enhanced_cache", fetch=True)
+            assert db._get_conn() is conn
+
+        db.close()
+        assert db._open_conns == []
+
+    def test_select_does_not_wait_for_write_lock(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试只读查询不受写锁阻塞"""
+        import threading
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        results = []
+
+        with db.lock:
+            reader = threading.Thread(
+                target=lambda: results.append(
+                    db.execute_query("SELECT COUNT(*) FROM enhanced_cache", fetch=True)
+                )
+            )
+            reader.start()
+            reader.join(timeout=5)
+            assert not reader.is_alive()
+
+        assert results == [[(0,)]]
+        db.close()
+
+    def test_query_failure_logged_lazily(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试查询失败通过日志记录并延迟格式化参数"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        with patch("aicmd.database_manager.logger") as mock_logger:
+            assert db.execute_query("SELECT * FROM missing_table", fetch=True) is None
+
+        msg, err = mock_logger.warning.call_args[0]
+        assert msg == "Database query failed: %s"
+        assert isinstance(err, sqlite3.OperationalError)
+        db.close()
+
+    def test_cursor_reused_for_same_query(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试同一 SQL 在线程连接上复用游标"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        query = "SELECT COUNT(*) FROM enhanced_cache"
+
+        assert db.execute_query(query, fetch=True) == [(0,)]
+        cursor = db._tls.cursors[query]
+        assert db.execute_query(query, fetch=True) == [(0,)]
+        assert db._tls.cursors[query] is cursor
+
+        db.close()
+
+    def test_execute_batch_single_transaction(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试批量写入复用线程连接并在同一事务中完成"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        entries = [{"query": f"query {i}", "command": f"cmd {i}"} for i in range(25)]
+
+        with patch.object(db, "_connect", side_effect=AssertionError):
+            assert db.bulk_insert_cache_entries(entries) == 25
+            ids = [row[0] for row in db.execute_query(
+                "SELECT id FROM enhanced_cache ORDER BY id LIMIT 10", fetch=True
+            )]
+            assert db.bulk_delete_by_ids(ids) == 10
+
+        count = db.execute_query("SELECT COUNT(*) FROM enhanced_cache", fetch=True)
+        assert count[0][0] == 15
+        db.close()
+
+    def test_cache_count_maintained_by_triggers(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试触发器维护的缓存计数与实际行数一致"""
+        from aicmd.database_manager import SafeDatabaseManager, CACHE_COUNT_SQL
+
+        # 已有数据但没有计数表的旧数据库
+        conn = sqlite3.connect(str(temp_db_path))
+        conn.execute(
+            "CREATE TABLE enhanced_cache (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "query TEXT NOT NULL, query_hash TEXT NOT NULL UNIQUE, command TEXT NOT NULL, "
+            "confidence_score REAL DEFAULT 0.0, confirmation_count INTEGER DEFAULT 0, "
+            "rejection_count INTEGER DEFAULT 0, last_used DATETIME DEFAULT CURRENT_TIMESTAMP, "
+            "created_at DATETIME DEFAULT CURRENT_TIMESTAMP, os_type TEXT, shell_type TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO enhanced_cache (query, query_hash, command) VALUES ('q0', 'h0', 'c0')"
+        )
+        conn.commit()
+        conn.close()
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        assert db.execute_query(CACHE_COUNT_SQL, fetch=True) == [(1,)]
+
+        insert_sql = (
+            "INSERT OR REPLACE INTO enhanced_cache (query, query_hash, command) "
+            "VALUES (?, ?, ?)"
+        )
+        db.execute_query(insert_sql, ("q1", "h1", "c1"))
+        db.execute_query(insert_sql, ("q1", "h1", "c1-new"))
+        db.execute_query("DELETE FROM enhanced_cache WHERE query_hash = ?", ("h0",))
+
+        actual = db.execute_query("SELECT COUNT(*) FROM enhanced_cache", fetch=True)
+        assert db.execute_query(CACHE_COUNT_SQL, fetch=True) == actual == [(1,)]
+        db.close()
+
+    def test_cleanup_ttl_and_size_limit(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试 TTL 清理与容量裁剪"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        mock_config_manager.set("max_cache_age_days", 30)
+        mock_config_manager.set("cache_size_limit", 120)
+
+        db.execute_batch(
+            "INSERT INTO enhanced_cache (query, query_hash, command, created_at) "
+            "VALUES (?, ?, ?, datetime('now', '-60 days'))",
+            [("old", "old_hash", "cmd")],
+        )
+        db.execute_batch(
+            "INSERT INTO enhanced_cache (query, query_hash, command, last_used) "
+            "VALUES (?, ?, ?, datetime('now', ?))",
+            [(f"q{i}", f"h{i}", "cmd", f"-{i} minutes") for i in range(150)],
+        )
+
+        assert db.cleanup_old_entries() == 1 + 130
+
+        remaining = db.execute_query(
+            "SELECT query FROM enhanced_cache ORDER BY last_used DESC", fetch=True
+        )
+        # 超出上限时保留最近使用的 (limit - 100) 条
+        assert [row[0] for row in remaining] == [f"q{i}" for i in range(20)]
+
 
 class TestDatabaseIndexes:
     """数据库索引测试"""
@@ -217,6 +489,27 @@ class TestDatabaseIndexes:
                 assert "idx_query_hash" in indexes
                 assert "idx_last_used" in indexes
                 assert "idx_confidence_score" in indexes
+                assert "idx_created_at" in indexes
+
+    def test_cleanup_subquery_uses_covering_index(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试容量裁剪子查询使用覆盖索引，无需回表"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+
+        plan = db.execute_query(
+            "EXPLAIN QUERY PLAN SELECT id FROM enhanced_cache "
+            "ORDER BY last_used DESC LIMIT -1 OFFSET 10",
+            fetch=True,
+        )
+        details = " ".join(row[-1] for row in plan)
+        assert "COVERING INDEX idx_last_used" in details
 
 
 class TestDatabaseGracefulDegradation:
@@ -277,3 +570,32 @@ class TestDatabaseBackup:
             
             assert result is True
             assert Path(backup_path).exists()
+
+    def test_backup_includes_wal_data(self, temp_db_path, mock_config_manager, monkeypatch):
+        """测试在线备份包含仍在 WAL 中的已提交数据"""
+        from aicmd.database_manager import SafeDatabaseManager
+
+        monkeypatch.setattr(
+            SafeDatabaseManager,
+            "_get_database_path",
+            lambda self: str(temp_db_path)
+        )
+
+        db = SafeDatabaseManager(mock_config_manager)
+        db.execute_query(
+            "INSERT INTO enhanced_cache (query, query_hash, command) VALUES (?, ?, ?)",
+            ("list files", "hash_wal", "ls"),
+        )
+
+        backup_path = str(temp_db_path) + ".backup"
+        assert db.backup_database(backup_path) is True
+        db.close()
+
+        conn = sqlite3.connect(backup_path)
+        try:
+            rows = conn.execute(
+                "SELECT command FROM enhanced_cache WHERE query_hash = ?", ("hash_wal",)
+            ).fetchall()
+        finally:
+            conn.close()
+        assert rows == [("ls",)]
@@ -144,3 +144,47 @@ class TestHashUtils:
         
         assert isinstance(hash1, str)
         assert isinstance(hash2, str)
+
+    def test_hash_query_batch_matches_single(self):
+        """测试批量哈希与逐条哈希结果一致"""
+        from aicmd.hash_utils import hash_query, hash_query_batch
+
+        queries = ["List All Files", "show  disk usage", "", 123]
+
+        for strategy in ("simple", "normalized", "blake2"):
+            assert hash_query_batch(queries, strategy=strategy) == [
+                hash_query(q, strategy=strategy) for q in queries
+            ]
+
+    def test_hash_query_blake2_strategy(self):
+        """测试 blake2 哈希策略"""
+        from aicmd.hash_utils import hash_query, hash_query_simple
+
+        hash1 = hash_query("List  All Files", strategy="blake2")
+
+        assert len(hash1) == 16
+        assert hash1 == hash_query("list all files", strategy="blake2")
+        assert hash1 != hash_query_simple("list all files")
+
+    def test_hash_query_normalized_whole_words_only(self):
+        """测试同义词只替换以空白分隔的完整单词"""
+        from aicmd.hash_utils import hash_query_normalized
+
+        assert hash_query_normalized("show  files") == hash_query_normalized("list files")
+        assert hash_query_normalized("show-all files") != hash_query_normalized(
+            "list-all files"
+        )
+
+    def test_hash_query_normalized_unicode_whitespace(self):
+        """测试 normalized 策略同样折叠 Unicode 空白"""
+        from aicmd.hash_utils import hash_query_normalized
+
+        assert hash_query_normalized("show　all files\n") == hash_query_normalized(
+            "list all files"
+        )
+
+    def test_hash_query_simple_ascii_separators(self):
+        """测试 ASCII 分隔控制符与普通空白一样被折叠"""
+        from aicmd.hash_utils import hash_query_simple
+
+        assert hash_query_simple("list\x1cfiles") == hash_query_simple("list files")
@@ -313,6 +313,7 @@ class TestMultiProviderIntegration:
         mock_resp.json.return_value = {
             "choices": [{"message": {"content": "ls -la"}}]
         }
+        mock_resp.content = json.dumps(mock_resp.json.return_value).encode()
         mock_session_instance.post.return_value = mock_resp
         
         # 创建配置文件，包含所有提供商的模型配置
@@ -359,6 +360,124 @@ class TestMultiProviderIntegration:
         assert "gemini" in router.PROVIDERS
         assert "qwen" in router.PROVIDERS
 
+    def test_provider_registry_is_read_only(self):
+        """测试提供商映射只读，且同名提供商实例只创建一次"""
+        from aicmd.llm_router import LLMRouter
+        from aicmd.api_client import APIClientError
+
+        with pytest.raises(TypeError):
+            LLMRouter.PROVIDERS["custom"] = object
+
+        router = LLMRouter()
+        assert router._get_provider("OpenAI") is router._get_provider("openai")
+        assert router._get_provider("") is router._get_provider(None)
+        with pytest.raises(APIClientError):
+            router._get_provider("unknown")
+
+    def test_default_provider_cached_until_config_changes(self):
+        """测试默认提供商按配置修订号缓存，配置修改后重新读取"""
+        from aicmd.llm_router import LLMRouter
+        from aicmd.config_manager import ConfigManager
+
+        config = ConfigManager()
+        config.set("default_provider", "OpenAI")
+        router = LLMRouter(config_manager=config)
+
+        assert router._get_default_provider() == "openai"
+        assert router._get_provider_config("openai") == {}
+        with patch.object(config, "get", side_effect=AssertionError):
+            assert router._get_default_provider() == "openai"
+            assert router._get_provider_config("deepseek") == {}
+
+        config.set("default_provider", "deepseek")
+        assert router.get_current_provider() == "deepseek"
+
+    def test_router_send_chat_batch(self):
+        """测试路由器批量请求委托给提供商并使用配置的超时"""
+        from aicmd.llm_router import LLMRouter
+        from aicmd.config_manager import ConfigManager
+
+        config = ConfigManager()
+        config.set("api_timeout_seconds", 12)
+        router = LLMRouter(config_manager=config)
+        provider = MagicMock()
+        provider.send_chat_batch.return_value = ["ls", "pwd"]
+
+        with patch.object(router, "_get_provider", return_value=provider) as mock_get:
+            result = router.send_chat_batch(["list", "where"], provider_name="openai")
+
+        assert result == ["ls", "pwd"]
+        mock_get.assert_called_once_with("openai")
+        provider.send_chat_batch.assert_called_once_with(["list", "where"], None, 12)
+
+    def test_router_providers_share_connection_pool(self):
+        """测试路由器创建的不同提供商共享同一个连接池，回退时可复用连接"""
+        from aicmd.llm_router import LLMRouter
+
+        with LLMRouter() as router:
+            primary = router._get_provider("openai")._get_session()
+            fallback = router._get_provider("openrouter")._get_session()
+
+            assert primary is not fallback
+            adapter = primary.get_adapter("https://api.openai.com")
+            assert fallback.get_adapter("https://openrouter.ai") is adapter
+            assert adapter.poolmanager is fallback.get_adapter("https://x.ai").poolmanager
+
+    def test_client_reuses_router_dependencies(self):
+        """测试客户端复用路由器创建的默认依赖，降级管理器只构造一次"""
+        from aicmd.multi_provider_api_client import MultiProviderAPIClient
+        from aicmd.error_handler import GracefulDegradationManager
+
+        with patch(
+            "aicmd.llm_router.GracefulDegradationManager",
+            wraps=GracefulDegradationManager,
+        ) as mock_cls:
+            client = MultiProviderAPIClient()
+
+        assert mock_cls.call_count == 1
+        assert client.degradation_manager is client.router.degradation_manager
+        assert client.config is client.router.config
+
+    def test_client_base_url_override_keeps_config(self):
+        """测试 base_url 覆盖按请求传给路由器，不再临时改写共享配置"""
+        from aicmd.multi_provider_api_client import MultiProviderAPIClient
+        from aicmd.config_manager import ConfigManager
+
+        config = ConfigManager()
+        client = MultiProviderAPIClient(config_manager=config, base_url="https://proxy.local")
+        revision = config.revision
+
+        with patch.object(client.router, "send_chat", return_value="ls") as mock_send:
+            assert client.send_chat("list files") == "ls"
+
+        mock_send.assert_called_once_with(
+            "list files",
+            provider_name="openrouter",
+            model=None,
+            timeout=client.timeout,
+            base_url="https://proxy.local",
+        )
+        assert config.revision == revision
+        assert "openrouter" not in config.get("providers", {})
+
+    def test_fallback_logs_with_lazy_args(self):
+        """测试回退日志使用 %-style 参数而非预先格式化的字符串"""
+        from aicmd.llm_router import LLMRouter
+        from aicmd.api_client import APIClientError
+
+        router = LLMRouter()
+        error = APIClientError("boom")
+
+        with patch.object(router, "send_chat", side_effect=[error, "ls -la"]), \
+                patch.object(router, "_get_default_provider", return_value="openrouter"), \
+                patch("aicmd.llm_router.logger") as mock_logger:
+            result = router.send_chat_with_fallback("list files", provider_name="openai")
+
+        assert result == "ls -la"
+        mock_logger.warning.assert_called_once_with(
+            "Provider %s failed (%s), trying default provider", "openai", error
+        )
+
 
 class TestCacheHitMissIntegration:
     """缓存命中/未命中集成测试"""
@@ -67,6 +67,20 @@ class TestInteractiveManagerInit:
         assert manager.default_timeout == 30
         assert manager.show_detailed_info is True
 
+    def test_init_timeout_falls_back_to_legacy_key(self):
+        """测试主超时键无效时回退到旧键名"""
+        config = Mock()
+        config.get.side_effect = lambda key, default=None: {
+            "interaction_timeout_seconds": "soon",
+            "interaction_timeout": "45",
+            "auto_confirm_on_timeout": None,
+        }.get(key, default)
+
+        manager = InteractiveManager(config_manager=config)
+
+        assert manager.default_timeout == 45
+        assert manager.auto_confirm_on_timeout is True
+
     def test_init_no_color_parameter(self, mock_config_manager):
         """测试 no_color 参数"""
         manager_color = InteractiveManager(
@@ -125,6 +139,26 @@ class TestInteractiveManagerColorization:
         # 应该返回文本加 reset 代码
         assert "test" in colored_text
 
+    def test_colorize_identity_when_disabled(self, interactive_manager):
+        """测试禁用颜色时 _colorize 绑定为恒等函数，重新启用后恢复"""
+        from aicmd.interactive_manager import _plain_text
+
+        interactive_manager.use_colors = False
+        assert interactive_manager._colorize is _plain_text
+
+        interactive_manager.use_colors = True
+        assert interactive_manager._colorize("ok", "green") == "\033[92mok\033[0m"
+
+    def test_static_messages_follow_color_setting(self, interactive_manager, capsys):
+        """测试预着色的固定文本随颜色设置更新"""
+        interactive_manager.use_colors = True
+        interactive_manager.display_success_message("ls", copied=True)
+        assert capsys.readouterr().out == "\033[92m✓ Copied to clipboard!\033[0m\n"
+
+        interactive_manager.use_colors = False
+        interactive_manager.display_rejection_message()
+        assert capsys.readouterr().out == "✗ Not copied\n"
+
 
 class TestInteractiveManagerConfirmation:
     """测试用户确认功能"""
@@ -149,6 +183,44 @@ class TestInteractiveManagerConfirmation:
         assert interactive_manager.interaction_stats["total_prompts"] == 1
         assert interactive_manager.interaction_stats["confirmed"] == 1
 
+    @patch("aicmd.interactive_manager.universal_input.input_with_timeout")
+    def test_prompt_user_confirmation_high_confidence_skips_prompt(
+        self, mock_input, interactive_manager
+    ):
+        """测试置信度达到自动复制阈值时不提示用户"""
+        result, details = interactive_manager.prompt_user_confirmation(
+            command="ls -la",
+            source="Cache",
+            confidence=0.95
+        )
+
+        assert result == ConfirmationResult.CONFIRMED
+        assert details["auto"] is True
+        mock_input.assert_not_called()
+        assert interactive_manager.interaction_stats["confirmed"] == 1
+
+    def test_response_sets_are_casefolded(self):
+        """测试响应集合已是 casefold 形式，可直接与规范化后的输入比较"""
+        from aicmd.interactive_manager import (
+            _YES_RESPONSES,
+            _NO_RESPONSES,
+            _QUICK_YES_RESPONSES,
+        )
+
+        for response in _YES_RESPONSES | _NO_RESPONSES | _QUICK_YES_RESPONSES:
+            assert response == response.casefold()
+
+    @patch("aicmd.interactive_manager.universal_input.read_key_with_timeout")
+    def test_single_key_confirm_reads_one_key(self, mock_read_key, interactive_manager):
+        """测试启用单键确认时使用单键读取"""
+        interactive_manager.single_key_confirm = True
+        mock_read_key.return_value = "N"
+
+        result, _ = interactive_manager.prompt_user_confirmation("rm -rf build", "API")
+
+        assert result == ConfirmationResult.REJECTED
+        mock_read_key.assert_called_once()
+
     @patch("aicmd.interactive_manager.universal_input.input_with_timeout")
     def test_prompt_user_confirmation_no(self, mock_input, interactive_manager):
         """测试用户拒绝（No）"""
@@ -189,7 +261,8 @@ class TestInteractiveManagerConfirmation:
         
         # 默认超时自动确认
         assert result == ConfirmationResult.TIMEOUT
-        assert interactive_manager.interaction_stats.get("timeout", 0) >= 1
+        assert interactive_manager.interaction_stats["timeouts"] == 1
+        assert "timeout" not in interactive_manager.interaction_stats
 
     @patch("aicmd.interactive_manager.universal_input.input_with_timeout")
     def test_prompt_user_confirmation_timeout_no_auto_confirm(self, mock_input, mock_config_manager):
@@ -295,6 +368,16 @@ class TestInteractiveManagerDisplay:
         assert "85" in captured.out
         assert "75" in captured.out
 
+    def test_format_metric_color_buckets(self, interactive_manager):
+        """测试指标按阈值分级着色"""
+        interactive_manager.use_colors = True
+
+        assert interactive_manager._format_metric("Confidence", 0.85) == (
+            "Confidence: \033[92m85.0%\033[0m"
+        )
+        assert "\033[93m50.0%" in interactive_manager._format_metric("Similarity", 0.5)
+        assert "\033[91m12.5%" in interactive_manager._format_metric("Similarity", 0.125)
+
     def test_display_metrics_none_values(self, interactive_manager, capsys):
         """测试显示空指标"""
         interactive_manager.display_metrics(confidence=None, similarity=None)
@@ -303,6 +386,18 @@ class TestInteractiveManagerDisplay:
         # 不应该有输出
         assert captured.out == ""
 
+    def test_display_command_info_single_write(self, interactive_manager_no_color):
+        """测试命令信息整块一次写出"""
+        with patch("sys.stdout") as mock_stdout:
+            interactive_manager_no_color._display_command_info(
+                "ls -la", "Cache", confidence=0.9, similarity=None
+            )
+
+        mock_stdout.write.assert_called_once_with(
+            "\n> ls -la  [Cache]\n  Confidence: 90.0%\n"
+        )
+        mock_stdout.flush.assert_called_once()
+
     def test_display_success_message(self, interactive_manager, capsys):
         """测试显示成功消息"""
         interactive_manager.display_success_message("ls -la", copied=True)
@@ -392,8 +487,9 @@ class TestInteractiveManagerStats:
         assert stats["total_prompts"] == 2
         assert stats["confirmed"] == 1
         assert stats["rejected"] == 1
-        assert "confirmed_percentage" in stats
-        assert "rejected_percentage" in stats
+        assert stats["confirmed_percentage"] == 50.0
+        assert stats["rejected_percentage"] == 50.0
+        assert stats["timeouts_percentage"] == 0.0
 
     def test_reset_stats(self, interactive_manager):
         """测试重置统计"""
@@ -476,6 +572,21 @@ class TestInteractiveManagerHelpers:
         
         assert isinstance(result, bool)
 
+    def test_supports_color_checked_once(self, mock_config_manager):
+        """测试终端颜色支持只检测一次"""
+        from aicmd.interactive_manager import InteractiveManager, _terminal_supports_color
+
+        _terminal_supports_color.cache_clear()
+        try:
+            with patch("sys.stdout") as mock_stdout:
+                mock_stdout.isatty.return_value = True
+                InteractiveManager(config_manager=mock_config_manager)
+                InteractiveManager(config_manager=mock_config_manager)
+
+            assert mock_stdout.isatty.call_count == 1
+        finally:
+            _terminal_supports_color.cache_clear()
+
 
 class TestCreateSimplePromptFunction:
     """测试简化提示函数创建"""
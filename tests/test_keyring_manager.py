@@ -52,6 +52,7 @@ def clean_keyring():
             keyring.delete_password(KeyringManager.SERVICE_NAME, provider)
         except Exception:
             pass  # 忽略不存在的密钥
+    KeyringManager.clear_cache()
     
     yield
     
@@ -61,6 +62,7 @@ def clean_keyring():
             keyring.delete_password(KeyringManager.SERVICE_NAME, provider)
         except Exception:
             pass
+    KeyringManager.clear_cache()
 
 
 @skip_if_no_keyring
@@ -239,6 +241,28 @@ class TestKeyringManagerEdgeCases:
         assert key2 == "key2"
 
 
+class TestKeyringManagerLazyImport:
+    """测试 keyring 延迟导入"""
+
+    def test_import_does_not_load_keyring(self):
+        """测试导入 keyring_manager 时不加载 keyring 后端"""
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        src = Path(__file__).parent.parent / "src"
+        code = (
+            "import sys; sys.path.insert(0, %r); "
+            "import aicmd.keyring_manager; "
+            "print('keyring' in sys.modules)" % str(src)
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        assert output == "False"
+
+
 class TestKeyringManagerErrorHandling:
     """测试错误处理"""
 
@@ -262,6 +286,35 @@ class TestKeyringManagerErrorHandling:
         # 应该捕获异常并返回 None
         assert api_key is None
 
+    @patch("aicmd.keyring_manager.keyring.get_password")
+    def test_get_api_key_cached(self, mock_get_password, clean_keyring):
+        """测试 API Key 查询结果在有效期内被缓存"""
+        mock_get_password.return_value = None
+
+        assert KeyringManager.has_api_key("test_provider") is False
+        assert KeyringManager.get_api_key("test_provider") is None
+        assert mock_get_password.call_count == 1
+
+        with patch("aicmd.keyring_manager.keyring.set_password"):
+            assert KeyringManager.set_api_key("test_provider", "new-key") is True
+
+        mock_get_password.return_value = "new-key"
+        assert KeyringManager.get_api_key("test_provider") == "new-key"
+        assert mock_get_password.call_count == 2
+
+    @patch("aicmd.keyring_manager.keyring.get_password")
+    def test_list_providers_with_keys_concurrent(self, mock_get_password, clean_keyring):
+        """测试并发查询提供商时保持原有顺序"""
+        keys = {"openai": "sk-openai", "qwen": "sk-qwen"}
+        mock_get_password.side_effect = lambda service, provider: keys.get(provider)
+
+        assert KeyringManager.list_providers_with_keys() == ["openai", "qwen"]
+        assert mock_get_password.call_count == 6
+
+        # 第二次列出全部命中缓存
+        assert KeyringManager.list_providers_with_keys() == ["openai", "qwen"]
+        assert mock_get_password.call_count == 6
+
     @patch("aicmd.keyring_manager.keyring.delete_password")
     def test_delete_api_key_general_exception(self, mock_delete_password, clean_keyring):
         """测试删除密钥时的一般异常处理"""
@@ -3,6 +3,7 @@ LLM Providers 测试
 测试所有 6 个 LLM 提供商的基本功能，使用 Mock HTTP 请求
 """
 
+import json
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import requests
@@ -55,6 +56,7 @@ def mock_successful_response():
             }
         ]
     }
+    mock_resp.content = json.dumps(mock_resp.json.return_value).encode()
     return mock_resp
 
 
@@ -76,6 +78,7 @@ def mock_gemini_response():
             }
         ]
     }
+    mock_resp.content = json.dumps(mock_resp.json.return_value).encode()
     return mock_resp
 
 
@@ -95,6 +98,7 @@ def mock_qwen_response():
             ]
         }
     }
+    mock_resp.content = json.dumps(mock_resp.json.return_value).encode()
     return mock_resp
 
 
@@ -193,6 +197,21 @@ class TestOpenRouterProvider:
         with pytest.raises(APITimeoutError):
             provider.send_chat("list files")
 
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_send_chat_base_url_override(self, mock_session, mock_keyring, provider_config, mock_successful_response):
+        """测试按请求覆盖地址，不修改配置且与默认地址分开缓存"""
+        provider = OpenRouterProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+        mock_session_instance.post.return_value = mock_successful_response
+
+        provider.send_chat("list files", base_url="https://proxy.local/v1/chat")
+        provider.send_chat("list files")
+
+        urls = [c.args[0] for c in mock_session_instance.post.call_args_list]
+        assert urls == ["https://proxy.local/v1/chat", provider_config["base_url"]]
+        assert provider.get_base_url() == provider_config["base_url"]
+
     def test_no_api_key(self, provider_config):
         """测试没有 API Key 的情况"""
         with patch("aicmd.llm_providers.KeyringManager") as mock_keyring:
@@ -320,6 +339,22 @@ class TestGeminiProvider:
         assert "test-model" in base_url
         assert "generateContent" in base_url
 
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_send_chat_base_url_override(self, mock_session, mock_keyring, provider_config):
+        """测试 Gemini 覆盖地址时仍追加模型路径和 key 参数"""
+        provider = GeminiProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+        body = {"candidates": [{"content": {"parts": [{"text": "ls"}]}}]}
+        mock_resp = Mock(status_code=200, content=json.dumps(body).encode())
+        mock_resp.json.return_value = body
+        mock_session_instance.post.return_value = mock_resp
+
+        assert provider.send_chat("list", base_url="https://proxy.local/models") == "ls"
+        assert mock_session_instance.post.call_args.args[0] == (
+            "https://proxy.local/models/test-model:generateContent?key=test-api-key-123"
+        )
+
     def test_get_headers_no_auth(self, mock_keyring, provider_config):
         """测试 Gemini 特殊的请求头（不使用 Authorization）"""
         provider = GeminiProvider(provider_config)
@@ -364,6 +399,7 @@ class TestGeminiProvider:
                 {"content": {"parts": [{"text": "pwd"}]}}
             ]
         }
+        mock_resp.content = json.dumps(mock_resp.json.return_value).encode()
         
         result = provider.parse_response(mock_resp)
         assert result == "pwd"
@@ -427,6 +463,7 @@ class TestQwenProvider:
                 ]
             }
         }
+        mock_resp.content = json.dumps(mock_resp.json.return_value).encode()
         
         result = provider.parse_response(mock_resp)
         assert result == "echo hello"
@@ -447,6 +484,18 @@ class TestLLMProviderBase:
         session2 = provider._get_session()
         assert session1 is session2
 
+    @pytest.mark.parametrize(
+        "provider_cls",
+        [OpenRouterProvider, OpenAIProvider, DeepSeekProvider, XAIProvider, GeminiProvider, QwenProvider],
+    )
+    def test_providers_use_slots(self, provider_cls, mock_keyring):
+        """测试提供商实例使用 __slots__，不创建 __dict__"""
+        provider = provider_cls({})
+
+        assert not hasattr(provider, "__dict__")
+        with pytest.raises(AttributeError):
+            provider.unexpected = 1
+
     def test_close_session(self, mock_keyring, provider_config):
         """测试关闭会话"""
         provider = OpenRouterProvider(provider_config)
@@ -486,6 +535,7 @@ class TestLLMProviderBase:
         mock_resp = Mock()
         mock_resp.status_code = 200
         mock_resp.json.return_value = {"invalid": "format"}
+        mock_resp.content = json.dumps(mock_resp.json.return_value).encode()
         mock_session_instance.post.return_value = mock_resp
         
         with pytest.raises(APIClientError) as exc_info:
@@ -501,3 +551,297 @@ class TestLLMProviderBase:
             provider.send_chat("list files")
         
         assert "Model not specified" in str(exc_info.value)
+
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_repeated_prompt_served_from_cache(self, mock_session, mock_keyring, provider_config, mock_successful_response):
+        """测试相同提示词第二次请求直接返回缓存响应"""
+        provider = OpenRouterProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+        mock_session_instance.post.return_value = mock_successful_response
+
+        assert provider.send_chat("list files") == "ls -la"
+        assert provider.send_chat("list files") == "ls -la"
+        mock_session_instance.post.assert_called_once()
+
+        # 不同模型不共享缓存
+        provider.send_chat("list files", model="other-model")
+        assert mock_session_instance.post.call_count == 2
+
+        provider.clear_response_cache()
+        provider.send_chat("list files")
+        assert mock_session_instance.post.call_count == 3
+
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_failed_response_not_cached(self, mock_session, mock_keyring, provider_config, mock_successful_response):
+        """测试失败响应不会写入缓存"""
+        provider = OpenRouterProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+
+        mock_resp = Mock()
+        mock_resp.status_code = 500
+        mock_resp.text = "Internal Server Error"
+        mock_session_instance.post.side_effect = [mock_resp, mock_successful_response]
+
+        with pytest.raises(APIClientError):
+            provider.send_chat("list files")
+        assert provider.send_chat("list files") == "ls -la"
+
+    @patch("aicmd.llm_providers._RESPONSE_CACHE_SIZE", 2)
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_response_cache_evicts_least_recent(self, mock_session, mock_keyring, provider_config, mock_gemini_response):
+        """测试响应缓存按 LRU 淘汰（Gemini 重写的 send_chat 同样使用缓存）"""
+        provider = GeminiProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+        mock_session_instance.post.return_value = mock_gemini_response
+
+        provider.send_chat("a")
+        provider.send_chat("b")
+        provider.send_chat("a")  # 命中，a 变为最近使用
+        provider.send_chat("c")  # 淘汰 b
+        assert mock_session_instance.post.call_count == 3
+
+        provider.send_chat("a")
+        assert mock_session_instance.post.call_count == 3
+        provider.send_chat("b")
+        assert mock_session_instance.post.call_count == 4
+
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_send_chat_batch_preserves_order(self, mock_session, mock_keyring, provider_config):
+        """测试批量请求按输入顺序返回结果且重复提示词只请求一次"""
+        provider = OpenRouterProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+
+        def fake_post(url, data=None, json=None, headers=None, timeout=None):
+            resp = Mock()
+            resp.status_code = 200
+            prompt = _loads(data)["messages"][1]["content"] if data else json["messages"][1]["content"]
+            resp.json.return_value = {"choices": [{"message": {"content": f"echo {prompt}"}}]}
+            resp.content = _dumps(resp.json.return_value).encode()
+            return resp
+
+        _loads, _dumps = json.loads, json.dumps
+        mock_session_instance.post.side_effect = fake_post
+
+        results = provider.send_chat_batch(["a", "b", "a", "c"], max_workers=3)
+
+        assert results == ["echo a", "echo b", "echo a", "echo c"]
+        assert mock_session_instance.post.call_count == 3
+        assert mock_session.call_count == 1
+        assert provider.send_chat_batch([]) == []
+
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_send_chat_batch_propagates_errors(self, mock_session, mock_keyring, provider_config):
+        """测试批量请求中的失败会抛出对应异常"""
+        provider = OpenRouterProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+
+        mock_resp = Mock()
+        mock_resp.status_code = 429
+        mock_session_instance.post.return_value = mock_resp
+
+        with pytest.raises(APIRateLimitError):
+            provider.send_chat_batch(["a", "b"])
+
+    def test_system_message_built_once(self, mock_keyring, provider_config):
+        """测试各提供商载荷复用同一个系统消息对象"""
+        from aicmd.prompts import get_system_prompt
+
+        openai_payload = OpenAIProvider(provider_config).build_request_payload("a")
+        qwen_payload = QwenProvider(provider_config).build_request_payload("b")
+
+        system_message = openai_payload["messages"][0]
+        assert system_message is qwen_payload["input"]["messages"][0]
+        assert system_message == {"role": "system", "content": get_system_prompt("default")}
+
+    def test_json_parsing_with_and_without_orjson(self, mock_keyring, provider_config):
+        """测试 orjson 可用与不可用时解析结果一致，非法 JSON 抛出 APIClientError"""
+        provider = OpenAIProvider(provider_config)
+        body = {"choices": [{"message": {"content": " echo 'a\\tb' "}}]}
+
+        mock_resp = Mock()
+        mock_resp.content = json.dumps(body).encode()
+        mock_resp.json.return_value = body
+
+        assert provider.parse_response(mock_resp) == "echo 'a\\tb'"
+        with patch("aicmd.llm_providers._orjson", None):
+            assert provider.parse_response(mock_resp) == "echo 'a\\tb'"
+
+        bad_resp = Mock()
+        bad_resp.content = b"not json"
+        bad_resp.json.side_effect = ValueError("not json")
+        with pytest.raises(APIClientError):
+            provider.parse_response(bad_resp)
+        with patch("aicmd.llm_providers._orjson", None):
+            with pytest.raises(APIClientError):
+                provider.parse_response(bad_resp)
+
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_payload_encoding_with_and_without_orjson(self, mock_session, mock_keyring, provider_config, mock_successful_response):
+        """测试 orjson 可用时请求体预编码为字节，否则使用 requests 的 json 参数"""
+        provider = OpenAIProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+        mock_session_instance.post.return_value = mock_successful_response
+
+        provider.send_chat("list files")
+        kwargs = mock_session_instance.post.call_args.kwargs
+        assert json.loads(kwargs["data"])["messages"][1]["content"] == "list files"
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+
+        with patch("aicmd.llm_providers._orjson", None):
+            provider.send_chat("list dirs")
+        kwargs = mock_session_instance.post.call_args.kwargs
+        assert kwargs["json"]["messages"][1]["content"] == "list dirs"
+
+    def test_http_adapter_shared_across_providers(self, mock_keyring, provider_config):
+        """测试不同提供商的会话共享同一个重试适配器"""
+        first = OpenAIProvider(provider_config)._get_session()
+        second = DeepSeekProvider(provider_config)._get_session()
+
+        assert first is not second
+        adapter = first.get_adapter("https://api.openai.com")
+        assert adapter is second.get_adapter("https://api.deepseek.com")
+        assert adapter.max_retries.total == 3
+        assert "POST" in adapter.max_retries.allowed_methods
+
+
+class TestLLMProvidersLazyImport:
+    """测试 requests 延迟导入"""
+
+    def test_import_does_not_load_requests(self):
+        """测试导入 aicmd 时不加载 requests，首次创建会话时才导入"""
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        src = Path(__file__).parent.parent / "src"
+        code = (
+            "import sys; sys.path.insert(0, %r); "
+            "import aicmd; "
+            "print('requests' in sys.modules); "
+            "from aicmd.llm_providers import OpenAIProvider; "
+            "OpenAIProvider({})._get_session(); "
+            "print('requests' in sys.modules)" % str(src)
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout.split()
+
+        assert output == ["False", "True"]
+
+
+class TestAPIKeyLookup:
+    """测试 API Key 查询次数"""
+
+    @pytest.mark.parametrize("provider_cls", [OpenAIProvider, QwenProvider, GeminiProvider])
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_send_chat_reads_key_once(self, mock_session, provider_cls, mock_keyring, provider_config):
+        """测试每次请求只查询一次 keyring，且请求头使用同一个密钥"""
+        provider = provider_cls(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+        mock_resp = Mock()
+        mock_resp.status_code = 401
+        mock_session_instance.post.return_value = mock_resp
+
+        with pytest.raises(APIAuthError):
+            provider.send_chat("list files")
+
+        assert mock_keyring.get_api_key.call_count == 1
+        headers = mock_session_instance.post.call_args.kwargs["headers"]
+        if provider_cls is not GeminiProvider:
+            assert headers["Authorization"] == "Bearer test-api-key-123"
+
+
+class TestStatusHandling:
+    """测试响应状态码到异常的映射"""
+
+    @pytest.mark.parametrize(
+        "status, error_cls, message",
+        [
+            (401, APIAuthError, "authentication failed"),
+            (429, APIRateLimitError, "rate limit"),
+            (503, APIClientError, "server error: 503"),
+            (404, APIClientError, "404 - Not Found"),
+        ],
+    )
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_status_maps_to_error(self, mock_session, status, error_cls, message, mock_keyring, provider_config):
+        """测试各错误状态码抛出对应异常"""
+        provider = OpenAIProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+        mock_resp = Mock()
+        mock_resp.status_code = status
+        mock_resp.text = "Not Found"
+        mock_session_instance.post.return_value = mock_resp
+
+        with pytest.raises(error_cls, match=message) as exc_info:
+            provider.send_chat("list files")
+        assert type(exc_info.value) is error_cls
+
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_non_ascii_prompt_encoded_as_utf8(self, mock_session, mock_keyring, provider_config, mock_successful_response):
+        """测试中文提示词按 UTF-8 原样编码进请求体"""
+        from aicmd import llm_providers
+
+        if llm_providers._orjson is None:
+            pytest.skip("orjson not installed")
+
+        provider = QwenProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+        mock_session_instance.post.return_value = mock_successful_response
+
+        with pytest.raises(APIClientError):  # Qwen 无法解析 OpenAI 格式的响应
+            provider.send_chat("列出所有文件")
+
+        body = mock_session_instance.post.call_args.kwargs["data"]
+        assert "列出所有文件".encode("utf-8") in body
+        assert json.loads(body)["input"]["messages"][1]["content"] == "列出所有文件"
+
+
+class TestInflightCoalescing:
+    """测试并发相同请求合并"""
+
+    @pytest.mark.parametrize("status", [200, 500])
+    @patch("aicmd.llm_providers.requests.Session")
+    def test_concurrent_duplicates_share_one_request(self, mock_session, status, mock_keyring, provider_config, mock_successful_response):
+        """测试相同请求并发时只发送一次，结果或异常由所有调用方共享"""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        provider = OpenAIProvider(provider_config)
+        mock_session_instance = MagicMock()
+        mock_session.return_value = mock_session_instance
+
+        error_resp = Mock()
+        error_resp.status_code = 500
+        release = threading.Event()
+
+        def slow_post(*args, **kwargs):
+            release.wait(5)
+            return mock_successful_response if status == 200 else error_resp
+
+        mock_session_instance.post.side_effect = slow_post
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(provider.send_chat, "list files") for _ in range(4)]
+            # 留出时间让其余线程进入等待，再放行唯一的请求
+            time.sleep(0.2)
+            release.set()
+
+        assert mock_session_instance.post.call_count == 1
+        for future in futures:
+            if status == 200:
+                assert future.result() == "ls -la"
+            else:
+                with pytest.raises(APIClientError):
+                    future.result()
+        assert provider._inflight == {}
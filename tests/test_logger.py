@@ -121,9 +121,22 @@ class TestAICommandLogger:
         log_dir = temp_dir / "logs"
         logger = AICommandLogger(log_dir=str(log_dir))
         
-        assert log_dir.exists()
         assert len(logger.logger.handlers) >= 2  # 控制台和文件
 
+    def test_log_dir_created_on_first_write(self, temp_dir):
+        """测试日志目录与文件延迟到首次写入时创建"""
+        from aicmd.logger import AICommandLogger
+
+        log_dir = temp_dir / "lazy" / "logs"
+        logger = AICommandLogger(log_dir=str(log_dir), enable_json_file=True)
+
+        assert not log_dir.exists()
+
+        logger.info("first message")
+
+        assert (log_dir / "aicmd.log").exists()
+        assert (log_dir / "aicmd.json.log").exists()
+
     def test_logger_methods(self, temp_dir):
         """测试日志方法"""
         from aicmd.logger import AICommandLogger
@@ -139,6 +152,19 @@ class TestAICommandLogger:
         logger.debug("Debug message")
         logger.critical("Critical message")
 
+    def test_logger_lazy_format_args(self, temp_dir):
+        """测试日志方法支持 %-style 延迟格式化参数"""
+        from aicmd.logger import AICommandLogger
+
+        log_dir = temp_dir / "logs"
+        logger = AICommandLogger(log_dir=str(log_dir))
+        logger.warning("Invalid value for %s: %r", "key", "raw")
+
+        for handler in logger.logger.handlers:
+            handler.flush()
+        content = (log_dir / "aicmd.log").read_text(encoding="utf-8")
+        assert "Invalid value for key: 'raw'" in content
+
     def test_logger_set_level(self, temp_dir):
         """测试设置日志级别"""
         from aicmd.logger import AICommandLogger
@@ -300,6 +326,100 @@ class TestLoggerCompatibility:
         logger.bold("test")
         logger.print("test")
 
+    def test_logger_classes_use_slots(self, temp_dir):
+        """测试 Logger 与 AICommandLogger 实例不创建 __dict__"""
+        from aicmd.logger import Logger, AICommandLogger
+
+        assert not hasattr(Logger(use_color=False), "__dict__")
+        assert not hasattr(AICommandLogger(log_dir=str(temp_dir / "logs")), "__dict__")
+
+    def test_legacy_logger_binds_stdlib_methods(self, temp_dir):
+        """测试旧版 Logger 直接绑定 logging.Logger 方法且保留请求 ID"""
+        import json
+        from aicmd.logger import Logger, AICommandLogger
+
+        log_dir = temp_dir / "logs"
+        logger = Logger(use_color=False)
+        logger.configure(log_dir=str(log_dir), enable_json_file=True)
+
+        base = logger._enhanced_logger.logger
+        assert logger.info == base.info
+        assert logger.warning == base.warning
+
+        with AICommandLogger.request_context("req12345"):
+            logger.warning("bound %s", "call")
+            logger.success("done")
+
+        for handler in base.handlers:
+            handler.flush()
+        records = [
+            json.loads(line)
+            for line in (log_dir / "aicmd.json.log").read_text(encoding="utf-8").splitlines()
+        ]
+        assert [r["message"] for r in records] == ["bound call", "✓ done"]
+        assert all(r["request_id"] == "req12345" for r in records)
+
+
+class TestLazyModuleInstances:
+    """模块级实例延迟创建测试"""
+
+    def test_import_does_not_create_log_dir(self, temp_dir):
+        """测试导入整个包不会创建日志目录"""
+        import subprocess
+        import sys
+
+        src = Path(__file__).parent.parent / "src"
+        log_dir = temp_dir / "logs"
+        code = (
+            "import sys; sys.path.insert(0, %r); "
+            "import aicmd.logger as m; "
+            "print('enhanced_logger' in vars(m))" % str(src)
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "AICMD_LOG_DIR": str(log_dir)},
+        ).stdout.split()
+
+        assert output == ["False"]
+        assert not log_dir.exists()
+
+    def test_enhanced_logger_keeps_configure_settings(self, temp_dir):
+        """测试先 configure 再访问 enhanced_logger 不会重置日志目录与级别"""
+        import subprocess
+        import sys
+
+        src = Path(__file__).parent.parent / "src"
+        log_dir = temp_dir / "custom-logs"
+        code = (
+            "import sys, logging; sys.path.insert(0, %r); "
+            "import aicmd.logger as m; "
+            "m.logger.configure(log_dir=%r, console_level='ERROR'); "
+            "enhanced = m.enhanced_logger; "
+            "print(enhanced is m.logger._enhanced_logger); "
+            "print(enhanced.log_dir); "
+            "print([h.level for h in enhanced.logger.handlers "
+            "if type(h) is logging.StreamHandler])"
+        ) % (str(src), str(log_dir))
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "AICMD_LOG_DIR": str(temp_dir / "default-logs")},
+        ).stdout.splitlines()
+
+        assert output == ["True", str(log_dir), "[40]"]
+
+    def test_unknown_attribute_raises(self):
+        """测试未知模块属性仍抛出 AttributeError"""
+        import aicmd.logger as module
+
+        with pytest.raises(AttributeError):
+            module.no_such_logger
+
 
 class TestLogConfigPrecedence:
     """日志配置优先级测试"""
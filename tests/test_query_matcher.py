@@ -208,6 +208,27 @@ class TestQueryMatcher:
         assert "ips" in params
         assert "192.168.1.1" in params["ips"]
 
+    def test_get_query_categories_substring_keywords(self):
+        """测试分类关键词按子串匹配"""
+        from aicmd.query_matcher import QueryMatcher
+
+        matcher = QueryMatcher()
+
+        assert "text_processing" in matcher.get_query_categories("tail nginx logs")
+        assert "git" in matcher.get_query_categories("clone github project")
+        assert "nodejs" in matcher.get_query_categories("edit package.json")
+        assert matcher.get_query_categories("list files") == {"list"}
+
+    def test_extract_key_parameters_flags(self):
+        """测试提取选项标志，无参数时返回空字典"""
+        from aicmd.query_matcher import QueryMatcher
+
+        matcher = QueryMatcher()
+
+        params = matcher.extract_key_parameters("ls -la --color=auto")
+        assert params["flags"] == ["-la", "--color"]
+        assert matcher.extract_key_parameters("hello world") == {}
+
     def test_add_synonym(self):
         """测试添加同义词"""
         from aicmd.query_matcher import QueryMatcher
@@ -224,6 +245,20 @@ class TestQueryMatcher:
         
         assert set(words1) == set(words2) == set(words3)
 
+    def test_add_synonym_copies_shared_defaults(self):
+        """测试扩展同义词只影响当前实例，不修改共享的默认映射"""
+        from aicmd.query_matcher import QueryMatcher
+
+        matcher = QueryMatcher()
+        other = QueryMatcher()
+        assert matcher.synonyms is other.synonyms
+
+        matcher.add_synonym("list", ["enumerate"])
+
+        assert matcher.normalize_query("enumerate files") == ["list", "files"]
+        assert other.normalize_query("enumerate files") == ["enumerate", "files"]
+        assert "enumerate" not in QueryMatcher().reverse_synonyms
+
     def test_get_matching_stats(self):
         """测试获取匹配器统计"""
         from aicmd.query_matcher import QueryMatcher
@@ -344,3 +379,87 @@ class TestQueryMatcherPerformance:
         
         # 验证预计算缓存被使用
         assert len(matcher._normalized_cache) > 0
+
+    def test_find_similar_queries_normalizes_each_query_once(self):
+        """测试相似查询查找中每个查询只标准化一次"""
+        from unittest.mock import patch
+        from aicmd.query_matcher import QueryMatcher
+
+        matcher = QueryMatcher()
+        cached_queries = [(f"list files {i}", f"ls {i}") for i in range(20)]
+
+        with patch.object(
+            QueryMatcher,
+            "normalize_query",
+            autospec=True,
+            side_effect=QueryMatcher.normalize_query,
+        ) as mock_normalize:
+            matcher.find_similar_queries("list files", cached_queries, threshold=0.1)
+            matcher.find_similar_queries("list files", cached_queries, threshold=0.1)
+
+        assert mock_normalize.call_count == 21
+
+    def test_matcher_uses_slots(self):
+        """测试 QueryMatcher 实例不创建 __dict__"""
+        from aicmd.query_matcher import QueryMatcher
+
+        matcher = QueryMatcher()
+
+        assert not hasattr(matcher, "__dict__")
+        with pytest.raises(AttributeError):
+            matcher.unexpected = 1
+
+    def test_add_synonym_invalidates_normalized_cache(self):
+        """测试添加同义词后重新计算缓存的词集"""
+        from aicmd.query_matcher import QueryMatcher
+
+        matcher = QueryMatcher()
+        assert matcher.calculate_similarity("fetch repo", "clone repo") < 1.0
+
+        matcher.add_synonym("download", ["clone"])
+
+        assert matcher.calculate_similarity("fetch repo", "clone repo") == 1.0
+
+    @pytest.mark.parametrize("threshold", [0.0, 0.5, 0.7, 0.9])
+    def test_find_similar_queries_matches_pairwise_similarity(self, threshold):
+        """测试剪枝后的结果与逐条 calculate_similarity 一致"""
+        from aicmd.query_matcher import QueryMatcher
+
+        matcher = QueryMatcher()
+        target = "show all python files"
+        cached_queries = [
+            ("list python files", "a"),
+            ("show all files", "b"),
+            ("find python files in home", "c"),
+            ("python", "d"),
+            ("git commit all", "e"),
+            ("docker image list", "f"),
+            ("show python files sorted by size with owner group and mtime", "g"),
+        ]
+
+        expected = [
+            (query, command, matcher.calculate_similarity(target, query))
+            for query, command in cached_queries
+            if set(matcher.normalize_query(query)) & set(matcher.normalize_query(target))
+        ]
+        expected = [item for item in expected if item[2] >= threshold]
+        expected.sort(key=lambda x: x[2], reverse=True)
+
+        assert matcher.find_similar_queries(target, cached_queries, threshold) == expected
+
+    def test_is_exact_match_agrees_with_query_hash(self):
+        """测试精确匹配与数据库哈希的判定保持一致"""
+        from aicmd.query_matcher import QueryMatcher
+
+        matcher = QueryMatcher()
+        pairs = [
+            ("list files", "  LIST\tfiles\n"),
+            ("list files", "list  file"),
+            ("显示 文件", "显示　文件"),
+            ("", "   "),
+        ]
+
+        for query1, query2 in pairs:
+            assert matcher.is_exact_match(query1, query2) is (
+                matcher.get_query_hash(query1) == matcher.get_query_hash(query2)
+            )
@@ -172,6 +172,271 @@ class TestCommandSafetyChecker:
         assert len(info["warnings"]) == 0
 
 
+    def test_danger_level_does_not_compile_patterns(self):
+        """测试分级判断复用预编译的模式，不再逐次调用 re.compile"""
+        from unittest.mock import patch
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        checker = CommandSafetyChecker()
+
+        with patch("aicmd.safety_checker.re.compile", side_effect=AssertionError):
+            assert checker.get_danger_level("rm -rf /") == "critical"
+            assert checker.get_danger_level("sudo rm -f tmp/x") == "dangerous"
+            assert checker.get_danger_level("killall -r") == "dangerous"
+            assert checker.get_danger_level("del *.txt") == "warning"
+
+
+    def test_init_compiles_only_custom_patterns(self, mock_config_manager):
+        """测试实例化时只编译自定义模式，默认模式在各实例间共享"""
+        from unittest.mock import patch
+        from aicmd import safety_checker
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        mock_config_manager.set("dangerous_command_patterns", [r"\bterraform\s+destroy"])
+
+        with patch.object(safety_checker, "_compile", wraps=safety_checker._compile) as mock_compile:
+            first = CommandSafetyChecker(config_manager=mock_config_manager)
+            second = CommandSafetyChecker(config_manager=mock_config_manager)
+
+        assert mock_compile.call_count == 2
+        assert first.compiled_patterns[0] is second.compiled_patterns[0]
+        assert len(first.compiled_patterns) == len(CommandSafetyChecker.DEFAULT_DANGEROUS_PATTERNS) + 1
+        assert first.is_dangerous_command("terraform destroy -auto-approve") is True
+
+    def test_instances_have_no_dict(self):
+        """测试实例使用 __slots__，不携带 __dict__"""
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        checker = CommandSafetyChecker()
+
+        assert not hasattr(checker, "__dict__")
+        with pytest.raises(AttributeError):
+            checker.unexpected = True
+
+    def test_invalid_custom_pattern_logged_and_skipped(self, mock_config_manager):
+        """测试无效的自定义模式在初始化时记录警告并跳过"""
+        from unittest.mock import patch
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        mock_config_manager.set("dangerous_command_patterns", ["(unclosed", r"\bnuke\b"])
+
+        with patch("aicmd.safety_checker.logger") as mock_logger:
+            checker = CommandSafetyChecker(config_manager=mock_config_manager)
+
+        assert mock_logger.warning.call_count == 1
+        assert "(unclosed" in mock_logger.warning.call_args[0][1]
+        assert checker.is_dangerous_command("nuke it") is True
+
+    def test_fused_tiers_match_individual_patterns(self):
+        """测试合并后的分级正则与逐条匹配的结果一致"""
+        import re
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        commands = [
+            "rm -rf /", "sudo rm -f tmp/x", "rmdir a/; rm -f x", "dd if=/dev/zero of=/dev/sda",
+            "chmod -R 777 /", "killall -r", "shutdown now", "del *.txt", "ls -la",
+        ]
+        for tier, fused in (
+            (CommandSafetyChecker.CRITICAL_PATTERNS, CommandSafetyChecker._CRITICAL_FUSED),
+            (CommandSafetyChecker.HIGH_DANGER_PATTERNS, CommandSafetyChecker._HIGH_DANGER_FUSED),
+        ):
+            for command in commands:
+                expected = any(re.search(p, command, re.IGNORECASE) for p in tier)
+                assert bool(fused.search(command)) is expected, command
+
+
+    def test_safety_info_cached_per_command(self):
+        """测试相同命令的安全信息只计算一次，且返回结果互不影响"""
+        from unittest.mock import patch
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        checker = CommandSafetyChecker()
+        first = checker.get_safety_info("rm -rf /")
+
+        with patch.object(
+            CommandSafetyChecker, "is_dangerous_command", side_effect=AssertionError
+        ):
+            second = checker.get_safety_info("rm -rf /")
+
+        assert second == first
+        second["warnings"].clear()
+        assert checker.get_safety_info("rm -rf /")["warnings"] == first["warnings"]
+
+    def test_safety_info_scans_once_and_tracks_config(self):
+        """测试缓存未命中时只判定一次危险，配置修改后缓存失效"""
+        from unittest.mock import patch
+        from aicmd.safety_checker import CommandSafetyChecker
+        from aicmd.config_manager import ConfigManager
+
+        config = ConfigManager()
+        checker = CommandSafetyChecker(config_manager=config)
+
+        with patch.object(
+            CommandSafetyChecker,
+            "is_dangerous_command",
+            autospec=True,
+            side_effect=CommandSafetyChecker.is_dangerous_command,
+        ) as mock_check:
+            info = checker.get_safety_info("chmod 777 /etc")
+        assert mock_check.call_count == 1
+        assert info["danger_level"] == "dangerous"
+        assert info["force_confirmation"] is True
+
+        config.set("force_confirm_dangerous_commands", False)
+        assert checker.get_safety_info("chmod 777 /etc")["force_confirmation"] is False
+
+
+    @pytest.mark.parametrize("command", [
+        "ls -la",
+        "rm -rf /tmp/build",
+        "rm temp.txt",
+        "dd if=/dev/zero of=/dev/sda",
+        "echo data > /dev/sda",
+        "chown root:root /etc",
+        "git commit -m 'fix reboot handling'",
+        "pip uninstall -y pkg*",
+        "FORMAT C:",
+    ])
+    def test_fused_pattern_matches_individual_patterns(self, command):
+        """测试合并后的默认模式与逐个匹配的结果一致"""
+        import re
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        checker = CommandSafetyChecker()
+        expected = any(
+            re.search(p, command, re.IGNORECASE)
+            for p in CommandSafetyChecker.DEFAULT_DANGEROUS_PATTERNS
+        )
+
+        assert checker.is_dangerous_command(command) is expected
+
+
+    @pytest.mark.parametrize("command", [
+        "rm -rf /", "rmdir old/dir", "dd if=x of=/dev/sda", "mkfs.ext4 /dev/sdb",
+        "format c:", "del *.log", "chmod 777 x", "chown a:b /etc", "cat x>/dev/sda",
+        "mv a /dev/null", "kill -9 1", "killall node", "shutdown now", "reboot",
+        "halt", "apt remove --purge lib*", "yum remove pkg*", "pip uninstall -y a*",
+    ])
+    def test_keyword_prefilter_never_hides_default_match(self, command):
+        """测试关键字预筛不会漏掉任何默认模式能匹配的命令"""
+        from aicmd.safety_checker import CommandSafetyChecker, _has_danger_keyword
+
+        for variant in (command, command.upper()):
+            assert CommandSafetyChecker._DEFAULT_FUSED.search(variant)
+            assert _has_danger_keyword(variant) is True
+
+    def test_keyword_prefilter_skips_regex_for_plain_commands(self):
+        """测试普通命令被预筛排除，非 ASCII 命令仍交给正则判断"""
+        from aicmd.safety_checker import CommandSafetyChecker, _has_danger_keyword
+
+        assert _has_danger_keyword("git status") is False
+        assert _has_danger_keyword("find . -name '*.py'") is False
+        assert CommandSafetyChecker().is_dangerous_command("\u017fhutdown now") is True
+
+    def test_lowercased_match_agrees_with_ignorecase(self):
+        """测试 ASCII 命令小写后区分大小写匹配，与忽略大小写匹配结果一致"""
+        import re
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        checker = CommandSafetyChecker()
+        commands = [
+            "RM -RF /", "Sudo Rm -F tmp/x", "FORMAT C:", "MkFs.ext4 /dev/sdb",
+            "KillAll node", "Del *.LOG", "git log --FORMAT=%H", "ls -la",
+        ]
+        for command in commands:
+            expected = any(
+                re.search(p, command, re.IGNORECASE)
+                for p in CommandSafetyChecker.DEFAULT_DANGEROUS_PATTERNS
+            )
+            assert checker.is_dangerous_command(command) is expected, command
+        assert checker.get_danger_level("SHUTDOWN now") == "critical"
+        assert checker.get_danger_level("CHMOD 777 x") == "dangerous"
+        assert checker.get_danger_level("\u017fudo rm -f x/") == "dangerous"
+
+    def test_ascii_fast_path_keeps_unicode_whitespace(self):
+        """测试 re.ASCII 快速路径不改变 0x1c-0x1f 控制字符作为空白的匹配结果"""
+        import re
+        from aicmd import safety_checker
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        checker = CommandSafetyChecker()
+
+        if safety_checker._re2 is None:
+            assert CommandSafetyChecker._DEFAULT_FUSED_LOWER.flags & re.ASCII
+        assert checker.is_dangerous_command("chmod\x1c777 x") is True
+        assert checker.get_danger_level("rm\x1f-rf /") == "critical"
+
+
+    def test_policy_flags_read_once_until_config_changes(self):
+        """测试策略开关只在初始化和配置修改后读取，且返回布尔值"""
+        from unittest.mock import patch
+        from aicmd.safety_checker import CommandSafetyChecker
+        from aicmd.config_manager import ConfigManager
+
+        config = ConfigManager()
+        checker = CommandSafetyChecker(config_manager=config)
+
+        with patch.object(config, "get", side_effect=AssertionError):
+            assert checker.should_force_confirmation("reboot") is True
+            assert checker.should_disable_auto_copy("reboot") is True
+            assert checker.should_force_confirmation("ls") is False
+
+        config.set("disable_auto_copy_dangerous", 0)
+        assert checker.should_disable_auto_copy("reboot") is False
+
+
+    def test_safe_commands_share_constant_info(self):
+        """测试安全命令共用同一份安全信息，调用方拿到的是独立副本"""
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        checker = CommandSafetyChecker()
+        info = checker.get_safety_info("ls -la")
+        info["warnings"].append("mutated")
+
+        assert checker._cached_info("ls -la") is checker._cached_info("git status")
+        assert checker.get_safety_info("ls -la") == {
+            "is_dangerous": False,
+            "danger_level": "safe",
+            "warnings": [],
+            "force_confirmation": False,
+            "disable_auto_copy": False,
+        }
+
+    def test_safety_info_batch_matches_single_calls(self):
+        """测试批量安全检查与逐条调用结果一致，且不写入实例缓存"""
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        commands = ["ls -la", "rm -rf /", "chmod 777 x", "del *.txt", "ls -la"]
+        checker = CommandSafetyChecker()
+
+        results = checker.get_safety_info_batch(iter(commands))
+
+        assert checker._info_cache == {}
+        assert results == [checker.get_safety_info(c) for c in commands]
+        assert results[0] is not results[4]
+
+    def test_public_checks_share_one_scan(self):
+        """测试同一命令的分级、警告与完整信息共用一次扫描"""
+        from unittest.mock import patch
+        from aicmd.safety_checker import CommandSafetyChecker
+
+        checker = CommandSafetyChecker()
+
+        with patch.object(
+            CommandSafetyChecker,
+            "_scan",
+            autospec=True,
+            side_effect=CommandSafetyChecker._scan,
+        ) as mock_scan:
+            assert checker.get_danger_level("killall node") == "dangerous"
+            assert len(checker.get_safety_warnings("killall node")) == 2
+            assert checker.get_safety_info("killall node")["is_dangerous"] is True
+            assert checker.should_force_confirmation("killall node") is True
+            assert checker.should_disable_auto_copy("killall node") is True
+
+        assert mock_scan.call_count == 1
+
+
 class TestCustomDangerousPatterns:
     """自定义危险模式测试"""
 
@@ -189,3 +454,56 @@ class TestCustomDangerousPatterns:
         
         # 自定义模式应该被检测
         assert checker.is_dangerous_command("mycustomcmd --force") is True
+
+    def test_custom_pattern_with_backreference(self):
+        """测试含分组与反向引用的自定义模式保持原有语义"""
+        from aicmd.safety_checker import CommandSafetyChecker
+        from aicmd.config_manager import ConfigManager
+        from unittest.mock import MagicMock
+
+        mock_config = MagicMock(spec=ConfigManager)
+        mock_config.get.return_value = [r"\bcp\s+(\S+)\s+\1\b"]
+
+        checker = CommandSafetyChecker(config_manager=mock_config)
+
+        assert checker.is_dangerous_command("cp data data") is True
+        assert checker.is_dangerous_command("cp data other") is False
+
+
+class TestRegexEngine:
+    """正则引擎选择测试"""
+
+    def test_compile_prefers_re2_and_falls_back(self, monkeypatch):
+        """测试安装 RE2 时优先使用，RE2 不支持的模式回退到标准库 re"""
+        import re
+        from types import SimpleNamespace
+        from aicmd import safety_checker
+
+        compiled = []
+
+        def fake_re2_compile(pattern):
+            if "\\1" in pattern:
+                raise ValueError("backreferences are not supported")
+            compiled.append(pattern)
+            return re.compile(pattern)
+
+        monkeypatch.setattr(safety_checker, "_re2", SimpleNamespace(compile=fake_re2_compile))
+
+        plain = safety_checker._compile(r"\breboot\b")
+        backref = safety_checker._compile(r"(\w+) \1")
+
+        assert compiled == [r"(?i)\breboot\b"]
+        assert plain.search("REBOOT now")
+        assert backref.flags & re.IGNORECASE
+        assert backref.search("Go go")
+
+    def test_compile_without_re2(self, monkeypatch):
+        """测试未安装 RE2 时使用标准库 re，无效模式抛出 re.error"""
+        import re
+        from aicmd import safety_checker
+
+        monkeypatch.setattr(safety_checker, "_re2", None)
+
+        assert safety_checker._compile(r"\bhalt\b").search("HALT")
+        with pytest.raises(re.error):
+            safety_checker._compile(r"(unclosed")